@@ -0,0 +1,259 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+import threading
+import time
+from Framework.account.AccountLibraryManager import reserve_generic_usernames
+from Framework.account.CreateAccount import GENERIC_PHRASE, _Region, create_new_account
+from Framework.account.Mailbox import Mailbox
+from Framework.utility.Constants import Server, Tribe, get_projectLogger
+from Framework.utility.SeleniumWebScraper import SWS
+
+
+# Project constants
+logger = get_projectLogger()
+# Driver pool of the current process
+DRIVER_POOL_Instance = None
+# Account to create
+FarmJob = namedtuple(typename='FarmJob', field_names=['username', 'password', 'server', 'tribe', 'region', 'doTasks',
+    'headless'])
+# Outcome of a job, stageTimes links stage name to elapsed seconds
+FarmResult = namedtuple(typename='FarmResult', field_names=['username', 'success', 'error', 'stageTimes', 'duration'])
+# Outcome of a run, stageLatencies links stage name to (mean, max) seconds
+FarmReport = namedtuple(typename='FarmReport', field_names=['results', 'created', 'failed', 'duration',
+    'stageLatencies'])
+
+
+# Browsers shared by the workers of a process, opening a driver costs more than creating an account step
+class DriverPool:
+    def __init__(self, size : int, headless : bool = True, driverFactory=SWS):
+        """
+        Parameters:
+            - size (int): Max drivers open at once.
+            - headless (bool): If True browsers are not shown, True by default.
+            - driverFactory (callable): Called with headless, returns a new driver, SWS by default.
+        """
+        self.size = size
+        self.headless = headless
+        self.driverFactory = driverFactory
+        # Clean drivers, the last returned is lent first
+        self.idle = []
+        self.opened = 0
+        # Guards idle and opened, notified whenever a driver is returned or discarded
+        self.condition = threading.Condition()
+
+    @contextmanager
+    def driver(self):
+        """
+        Lends a clean driver, waiting for one if all are in use.
+
+        Returns:
+            - SWS.
+        """
+        sws = None
+        with self.condition:
+            # Discarded drivers make room for a new one
+            self.condition.wait_for(lambda: self.idle or self.opened < self.size)
+            if self.idle:
+                sws = self.idle.pop()
+            else:
+                self.opened += 1
+        if sws is None:
+            try:
+                sws = self.driverFactory(self.headless)
+            except Exception:
+                with self.condition:
+                    self.opened -= 1
+                    self.condition.notify()
+                raise
+        try:
+            yield sws
+        finally:
+            # A driver that can not be cleaned is replaced by a new one on next use
+            isClean = bool(sws.driver and sws.reset())
+            if not isClean:
+                sws.close()
+            with self.condition:
+                if isClean:
+                    self.idle.append(sws)
+                else:
+                    self.opened -= 1
+                self.condition.notify()
+
+    def close(self):
+        """Closes idle drivers."""
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.opened -= len(idle)
+            self.condition.notify_all()
+        for sws in idle:
+            sws.close()
+
+
+def get_driver_pool(size : int = 1, headless : bool = True):
+    """
+    Instantiates DRIVER_POOL_Instance if needed.
+
+    Parameters:
+        - size (int): Max drivers open at once, used on first call.
+        - headless (bool): If True browsers are not shown, used on first call.
+
+    Returns:
+        - DriverPool of the current process.
+    """
+    global DRIVER_POOL_Instance
+    if DRIVER_POOL_Instance is None:
+        DRIVER_POOL_Instance = DriverPool(size, headless)
+    return DRIVER_POOL_Instance
+
+
+def set_driver_pool(driverPool : DriverPool):
+    """
+    Changes the driver pool of the current process, e.g. to one opening other drivers.
+
+    Parameters:
+        - driverPool (DriverPool): New driver pool, None to create a default one on next use.
+    """
+    global DRIVER_POOL_Instance
+    DRIVER_POOL_Instance = driverPool
+
+
+def create_account_job(job : FarmJob, stageTimes : dict, mailbox : Mailbox = None):
+    """
+    Default farm job: registers, activates and sets up an account with a pooled driver.
+
+    Parameters:
+        - job (FarmJob): Account to create.
+        - stageTimes (dict): Filled with the seconds spent in each stage.
+        - mailbox (Mailbox): Source of activation mails, shared by the jobs of a process, temporary email tabs
+            by default.
+
+    Returns:
+        - True if operation was successful, False otherwise.
+    """
+    with get_driver_pool(headless=job.headless).driver() as sws:
+        return create_new_account(job.username, job.password, job.server, job.tribe, job.region, job.doTasks,
+            job.headless, sws=sws, stageTimes=stageTimes, mailbox=mailbox)
+
+
+def _run_job(createFunction, job : FarmJob):
+    """
+    Runs a job and catches its failures.
+
+    Parameters:
+        - createFunction (callable): Called with (job, stageTimes), returns True on success.
+        - job (FarmJob): Account to create.
+
+    Returns:
+        - FarmResult.
+    """
+    stageTimes = {}
+    startTime = time.time()
+    error = None
+    with logger.context(server=job.server.name, account=job.username):
+        try:
+            success = bool(createFunction(job, stageTimes))
+            if not success:
+                error = 'Failed to create account'
+        except Exception as err:
+            success = False
+            error = f'{type(err).__name__}: {err}'
+            logger.error(f'In AccountFarm: Job {job.username} raised {error}')
+    return FarmResult(job.username, success, error, stageTimes, time.time() - startTime)
+
+
+def _run_process_job(createFunction, job : FarmJob):
+    """
+    Runs a job in a worker process, whose logs are written before the result is returned.
+
+    Worker processes exit without running atexit handlers, so queued log lines would be lost.
+    """
+    try:
+        return _run_job(createFunction, job)
+    finally:
+        logger.flush()
+
+
+def _init_process(poolSize : int, headless : bool):
+    """Creates the driver pool of a worker process."""
+    get_driver_pool(poolSize, headless)
+
+
+# Creates many accounts concurrently
+class AccountFarm:
+    def __init__(self, workers : int = 4, useProcesses : bool = False, createFunction=create_account_job,
+                headless : bool = True):
+        """
+        Parameters:
+            - workers (int): Accounts created at once, 4 by default.
+            - useProcesses (bool): If True workers are processes with a driver each, threads sharing a driver pool
+                otherwise, False by default.
+            - createFunction (callable): Called with (FarmJob, stageTimes dict), returns True on success.
+                Must be picklable when using processes, create_account_job by default.
+            - headless (bool): If True browsers are not shown, True by default.
+        """
+        self.workers = workers
+        self.useProcesses = useProcesses
+        self.createFunction = createFunction
+        self.headless = headless
+
+    def __executor(self):
+        """
+        Returns:
+            - Executor running the jobs.
+        """
+        if self.useProcesses:
+            executor = ProcessPoolExecutor(self.workers, initializer=_init_process, initargs=(1, self.headless))
+        else:
+            driverPool = get_driver_pool(self.workers, self.headless)
+            driverPool.size = max(driverPool.size, self.workers)
+            executor = ThreadPoolExecutor(self.workers, thread_name_prefix='AccountFarm')
+        return executor
+
+    def run(self, count : int, server : Server = Server.S10k, tribe : Tribe = Tribe.TEUTONS,
+                region : _Region = _Region.PLUS_PLUS, doTasks : bool = True):
+        """
+        Creates count generic accounts, usernames are reserved up front so workers never collide.
+
+        Parameters:
+            - count (int): Amount of accounts to create.
+            - server (Server): Server of new accounts, 10K by default.
+            - tribe (Tribe): Desired tribe, Teutons by default.
+            - region (_Region): Desired region, +|+ by default.
+            - doTasks (bool): If True will accept tasks, True by default.
+
+        Returns:
+            - FarmReport, None if usernames could not be reserved.
+        """
+        ret = None
+        startTime = time.time()
+        usernames = reserve_generic_usernames(server, GENERIC_PHRASE, count)
+        if usernames is not None:
+            jobs = [FarmJob(username, username, server, tribe, region, doTasks, self.headless) \
+                for username in usernames]
+            runJob = _run_process_job if self.useProcesses else _run_job
+            with self.__executor() as executor:
+                results = list(executor.map(runJob, [self.createFunction] * len(jobs), jobs))
+            ret = self.__report(results, time.time() - startTime)
+            logger.info(f'In AccountFarm: Created {ret.created}/{count} accounts in {ret.duration:.1f}s')
+        else:
+            logger.error('In AccountFarm: Failed to reserve usernames')
+        return ret
+
+    @staticmethod
+    def __report(results : list, duration : float):
+        """
+        Parameters:
+            - results ([FarmResult]): Outcome of each job.
+            - duration (float): Total seconds.
+
+        Returns:
+            - FarmReport.
+        """
+        stages = {}
+        for result in results:
+            for stage, elapsed in result.stageTimes.items():
+                stages.setdefault(stage, []).append(elapsed)
+        stageLatencies = {stage: (sum(times) / len(times), max(times)) for stage, times in stages.items()}
+        created = sum(result.success for result in results)
+        return FarmReport(results, created, len(results) - created, duration, stageLatencies)
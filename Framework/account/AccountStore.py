@@ -0,0 +1,652 @@
+from abc import ABC, abstractmethod
+import json
+import os
+import re
+import sqlite3
+import threading
+import weakref
+from Framework.utility.Constants import ACCOUNT_LIBRARY_PATH, Server, get_projectLogger
+from Framework.utility.FileLock import FileLock, atomic_write
+
+
+# Project constants
+logger = get_projectLogger()
+# JSON username key
+JSON_USERNAME_KEY = "username"
+# JSON password key
+JSON_PASSWORD_KEY = "password"
+# Account store singleton
+ACCOUNT_STORE_Instance = None
+# Connections inherited by a forked child, kept open since closing them could disturb the parent's database
+INHERITED_CONNECTIONS = []
+
+
+def check_account_library_format(accountLib : dict):
+    """
+    Checks whether a given dictionary respects the account_library.json pattern.
+
+    Parameters:
+        - accountLib (Dictionary): Will update json with it.
+
+    Returns:
+        - True if operation was successful, False otherwise.
+    """
+    ret = False
+    for sv in Server:
+        if sv.value in accountLib and \
+                (isinstance(accountLib[sv.value], list) or accountLib[sv.value] == {}) and \
+                all(isinstance(elem, dict) for elem in accountLib[sv.value]) and \
+                all(JSON_USERNAME_KEY in elem and JSON_PASSWORD_KEY in elem for elem in accountLib[sv.value]):
+            continue
+        logger.error('In check_account_library_format: JSON does not have the proper form')
+        break
+    else:
+        ret = True
+    return ret
+
+
+def get_max_sequence_number(usernames : list, phrase : str):
+    """
+    Parameters:
+        - usernames (list): Usernames to search in.
+        - phrase (str): Prefix of the sequence.
+
+    Returns:
+        - Highest number used in phrase<number> usernames, 0 if none.
+    """
+    ret = 0
+    for username in usernames:
+        numberRe = re.fullmatch(f'{re.escape(phrase)}([0-9]+)', username)
+        if numberRe:
+            ret = max(ret, int(numberRe.group(1)))
+    return ret
+
+
+# Interface of account storages, accounts are kept in insertion order for each server
+class AccountStore(ABC):
+    @abstractmethod
+    def get_password(self, server : Server, username : str):
+        """
+        Parameters:
+            - server (Server): Identifies the server.
+            - username (String): Identifies the account.
+
+        Returns:
+            - String with password if account exists, None otherwise.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def append(self, server : Server, username : str, password : str):
+        """
+        Adds a new account, an existing account is left unchanged.
+
+        Parameters:
+            - server (Server): Denotes server.
+            - username (String): Identifies the account.
+            - password (String): Account password.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def reset(self, server : Server):
+        """
+        Removes all accounts from one server.
+
+        Parameters:
+            - server (Server): Denotes server.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_last_account(self, server : Server):
+        """
+        Parameters:
+            - server (Server): Identifies the server.
+
+        Returns:
+            - (username, password) of the most recent account, None if server has no accounts or on error.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_usernames(self, server : Server, prefix : str = ''):
+        """
+        Parameters:
+            - server (Server): Identifies the server.
+            - prefix (str): Only usernames starting with it are returned, '' by default.
+
+        Returns:
+            - List of usernames if operation was successful, None otherwise.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def reserve_numbers(self, server : Server, phrase : str, count : int = 1):
+        """
+        Atomically reserves the next numbers of the phrase<number> username sequence.
+
+        The sequence continues after the highest number in use when it is first reserved.
+
+        Parameters:
+            - server (Server): Identifies the server.
+            - phrase (str): Prefix of the sequence.
+            - count (int): Amount of numbers to reserve, 1 by default.
+
+        Returns:
+            - List of reserved numbers if operation was successful, None otherwise.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def export_library(self):
+        """
+        Returns:
+            - Dictionary in `account_library.json` format if operation was successful, None otherwise.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def import_library(self, accountLib : dict):
+        """
+        Replaces all accounts with the ones in accountLib.
+
+        Parameters:
+            - accountLib (Dictionary): Accounts in `account_library.json` format.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        raise NotImplementedError
+
+
+# Accounts stored in `account_library.json`
+class JsonAccountStore(AccountStore):
+    # Appends kept in the write-ahead log before it is merged into the library with one rewrite
+    WAL_COMPACT_SIZE = 100
+
+    def __init__(self, path : str = ACCOUNT_LIBRARY_PATH):
+        """
+        Parameters:
+            - path (str): JSON file, `account_library.json` by default.
+        """
+        self.path = path
+        # Appended accounts as JSON lines, merged into the library by compact()
+        self.walPath = f'{path}.wal'
+        # Server value linked to a dictionary linking phrase to the last reserved number
+        self.countersPath = f'{os.path.splitext(path)[0]}_counters.json'
+        # Guards read-modify-write sequences against other threads and processes
+        self.lock = FileLock(path)
+        # Parsed library, reloaded only when the file or the log changes on disk
+        self.accountLib = None
+        # Server value linked to a dictionary linking username to password
+        self.index = None
+        self.walSize = 0
+        # (mtime, size) of the library and of the log the cache was built from
+        self.cacheKey = None
+
+    @staticmethod
+    def __file_key(path : str):
+        """
+        Parameters:
+            - path (str): File path.
+
+        Returns:
+            - (mtime, size) of the file, None if it can not be accessed.
+        """
+        try:
+            stat = os.stat(path)
+            ret = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            ret = None
+        return ret
+
+    def __cache_key(self):
+        """
+        Returns:
+            - Key identifying the library and log on disk.
+        """
+        return self.__file_key(self.path), self.__file_key(self.walPath)
+
+    def __cache(self, accountLib : dict):
+        """
+        Stores a parsed library and indexes it by username.
+
+        Parameters:
+            - accountLib (Dictionary): Library matching the file.
+        """
+        self.accountLib = accountLib
+        self.index = {server: {str(acc[JSON_USERNAME_KEY]): str(acc[JSON_PASSWORD_KEY]) for acc in reversed(accounts)} \
+            for server, accounts in accountLib.items()}
+
+    def __add_to_cache(self, server : str, username : str, password : str):
+        """
+        Parameters:
+            - server (str): Server value.
+            - username (String): Identifies the account.
+            - password (String): Account password.
+        """
+        self.accountLib[server].append({JSON_USERNAME_KEY: username, JSON_PASSWORD_KEY: password})
+        self.index[server][username] = password
+
+    def __replay_wal(self):
+        """Adds accounts from the write-ahead log to the cache, a partially written last line is ignored."""
+        self.walSize = 0
+        try:
+            with open(self.walPath, 'r') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            lines = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                server, username, password = entry['server'], str(entry['username']), str(entry['password'])
+            except (json.JSONDecodeError, ValueError, KeyError, TypeError):
+                logger.warning(f'In JsonAccountStore: Ignoring invalid entry in {self.walPath}')
+                continue
+            self.walSize += 1
+            if server in self.index and username not in self.index[server]:
+                self.__add_to_cache(server, username, password)
+
+    def __read(self):
+        """
+        Returns:
+            - Dictionary containing json if operation was successful, None otherwise.
+        """
+        cacheKey = self.__cache_key()
+        if cacheKey[0] is not None and cacheKey == self.cacheKey:
+            return self.accountLib
+        with self.lock:
+            cacheKey = self.__cache_key()
+            ret = None
+            jsonData = None
+            try:
+                with open(self.path, 'r') as f:
+                    jsonData = f.read()
+            except IOError:
+                logger.error(f'In JsonAccountStore: Failed to open {self.path}')
+            accountLib = None
+            if jsonData:
+                try:
+                    accountLib = dict(json.loads(jsonData))
+                except (json.JSONDecodeError, ValueError):
+                    logger.error(f'In JsonAccountStore: Invalid json format in file {self.path}')
+            if accountLib and check_account_library_format(accountLib):
+                self.__cache(accountLib)
+                self.__replay_wal()
+                self.cacheKey = cacheKey
+                ret = self.accountLib
+            else:
+                logger.error('In JsonAccountStore: JSON failed format check')
+            return ret
+
+    def __write(self, accountLib : dict):
+        """
+        Atomically replaces the library and clears the write-ahead log.
+
+        Parameters:
+            - accountLib (Dictionary): Will overwrite json with it.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        ret = False
+        with self.lock:
+            try:
+                atomic_write(self.path, json.dumps(accountLib, indent=4, sort_keys=False))
+                if os.path.exists(self.walPath):
+                    os.remove(self.walPath)
+                ret = True
+            except OSError as err:
+                logger.error(f'In JsonAccountStore: Failed to write {self.path}: {err}')
+            if ret:
+                self.__cache(accountLib)
+                self.walSize = 0
+                self.cacheKey = self.__cache_key()
+            else:
+                self.cacheKey = None
+        return ret
+
+    def compact(self):
+        """
+        Merges the write-ahead log into the library.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        ret = False
+        with self.lock:
+            accountLib = self.__read()
+            if accountLib:
+                ret = self.__write(accountLib)
+        return ret
+
+    def get_password(self, server : Server, username : str):
+        ret = None
+        if self.__read():
+            ret = self.index[server.value].get(username)
+        return ret
+
+    def append(self, server : Server, username : str, password : str):
+        ret = False
+        with self.lock:
+            accountLib = self.__read()
+            if accountLib:
+                if username in self.index[server.value]:
+                    ret = True
+                else:
+                    entry = json.dumps({'server': server.value, 'username': username, 'password': password})
+                    try:
+                        with open(self.walPath, 'a') as f:
+                            f.write(entry + '\n')
+                            f.flush()
+                            os.fsync(f.fileno())
+                        ret = True
+                    except OSError as err:
+                        logger.error(f'In JsonAccountStore: Failed to write {self.walPath}: {err}')
+                    if ret:
+                        self.__add_to_cache(server.value, username, password)
+                        self.walSize += 1
+                        self.cacheKey = self.__cache_key()
+                        if self.walSize >= self.WAL_COMPACT_SIZE and not self.compact():
+                            logger.warning('In JsonAccountStore: compact() failed')
+                    else:
+                        self.cacheKey = None
+        return ret
+
+    def reset(self, server : Server):
+        ret = False
+        with self.lock:
+            accountLib = self.__read()
+            if accountLib:
+                ret = self.__write({**accountLib, server.value: []})
+        return ret
+
+    def reserve_numbers(self, server : Server, phrase : str, count : int = 1):
+        ret = None
+        with self.lock:
+            counters = {}
+            try:
+                with open(self.countersPath, 'r') as f:
+                    counters = dict(json.loads(f.read()))
+            except FileNotFoundError:
+                pass
+            except (json.JSONDecodeError, ValueError) as err:
+                logger.warning(f'In JsonAccountStore: Rebuilding invalid counters {self.countersPath}: {err}')
+            serverCounters = counters.setdefault(server.value, {})
+            last = serverCounters.get(phrase)
+            if last is None:
+                usernames = self.get_usernames(server, phrase)
+                last = get_max_sequence_number(usernames, phrase) if usernames is not None else None
+            if last is not None:
+                serverCounters[phrase] = last + count
+                try:
+                    atomic_write(self.countersPath, json.dumps(counters, indent=4))
+                    ret = list(range(last + 1, last + count + 1))
+                except OSError as err:
+                    logger.error(f'In JsonAccountStore: Failed to write {self.countersPath}: {err}')
+        return ret
+
+    def get_last_account(self, server : Server):
+        ret = None
+        accountLib = self.__read()
+        if accountLib and accountLib[server.value]:
+            acc = accountLib[server.value][-1]
+            ret = (str(acc[JSON_USERNAME_KEY]), str(acc[JSON_PASSWORD_KEY]))
+        return ret
+
+    def get_usernames(self, server : Server, prefix : str = ''):
+        ret = None
+        accountLib = self.__read()
+        if accountLib:
+            ret = [str(acc[JSON_USERNAME_KEY]) for acc in accountLib[server.value] \
+                if str(acc[JSON_USERNAME_KEY]).startswith(prefix)]
+        return ret
+
+    def export_library(self):
+        ret = None
+        accountLib = self.__read()
+        if accountLib:
+            # Copy so that callers can not alter the cache
+            ret = {server: [dict(acc) for acc in accounts] for server, accounts in accountLib.items()}
+        return ret
+
+    def import_library(self, accountLib : dict):
+        ret = False
+        if check_account_library_format(accountLib):
+            ret = self.__write({server: [dict(acc) for acc in accounts] for server, accounts in accountLib.items()})
+        return ret
+
+
+# Accounts stored in a SQLite database indexed by (server, username)
+class SqliteAccountStore(AccountStore):
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            server TEXT NOT NULL,
+            username TEXT NOT NULL,
+            password TEXT NOT NULL,
+            UNIQUE (server, username)
+        );
+        CREATE INDEX IF NOT EXISTS accounts_server_id ON accounts (server, id);
+        CREATE TABLE IF NOT EXISTS counters (
+            server TEXT NOT NULL,
+            phrase TEXT NOT NULL,
+            last INTEGER NOT NULL,
+            PRIMARY KEY (server, phrase)
+        );
+    '''
+
+    # Stores of the process, their connections are replaced in forked children
+    INSTANCES = weakref.WeakSet()
+
+    def __init__(self, path : str):
+        """
+        Parameters:
+            - path (str): Database file, created if missing.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = None
+        self.__connection()
+        self.INSTANCES.add(self)
+
+    def reset_after_fork(self):
+        """SQLite connections must not be used across fork(), the child opens its own on next use."""
+        self.lock = threading.Lock()
+        if self.connection is not None:
+            INHERITED_CONNECTIONS.append(self.connection)
+        self.connection = None
+
+    def __connection(self):
+        """
+        Opens the database connection of the current process if needed, called with lock held or on creation.
+
+        Returns:
+            - sqlite3.Connection.
+        """
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.executescript(self.SCHEMA)
+        return self.connection
+
+    def __query(self, sql : str, params : tuple = ()):
+        """
+        Parameters:
+            - sql (str): Statement to run.
+            - params (tuple): Statement parameters.
+
+        Returns:
+            - List of rows if operation was successful, None otherwise.
+        """
+        ret = None
+        try:
+            with self.lock:
+                ret = self.__connection().execute(sql, params).fetchall()
+        except sqlite3.Error as err:
+            logger.error(f'In SqliteAccountStore: {err}')
+        return ret
+
+    def get_password(self, server : Server, username : str):
+        rows = self.__query('SELECT password FROM accounts WHERE server = ? AND username = ?', (server.value, username))
+        return str(rows[0][0]) if rows else None
+
+    def append(self, server : Server, username : str, password : str):
+        rows = self.__query('INSERT OR IGNORE INTO accounts (server, username, password) VALUES (?, ?, ?)',
+            (server.value, username, password))
+        return rows is not None
+
+    def reset(self, server : Server):
+        return self.__query('DELETE FROM accounts WHERE server = ?', (server.value,)) is not None
+
+    def get_last_account(self, server : Server):
+        rows = self.__query('SELECT username, password FROM accounts WHERE server = ? ORDER BY id DESC LIMIT 1',
+            (server.value,))
+        return (str(rows[0][0]), str(rows[0][1])) if rows else None
+
+    def get_usernames(self, server : Server, prefix : str = ''):
+        # Range on the (server, username) index instead of LIKE, which would scan the table
+        rows = self.__query('SELECT username FROM accounts WHERE server = ? AND username >= ? AND username < ? '
+            'ORDER BY id', (server.value, prefix, prefix + '\U0010ffff'))
+        return [str(row[0]) for row in rows] if rows is not None else None
+
+    def reserve_numbers(self, server : Server, phrase : str, count : int = 1):
+        ret = None
+        try:
+            with self.lock:
+                connection = self.__connection()
+                with connection:
+                    # Write lock taken up front so that concurrent processes can not read the same value
+                    connection.execute('BEGIN IMMEDIATE')
+                    row = connection.execute('SELECT last FROM counters WHERE server = ? AND phrase = ?',
+                        (server.value, phrase)).fetchone()
+                    if row is not None:
+                        last = row[0]
+                    else:
+                        usernames = [username for (username,) in connection.execute('SELECT username FROM '
+                            'accounts WHERE server = ? AND username >= ? AND username < ?',
+                            (server.value, phrase, phrase + '\U0010ffff'))]
+                        last = get_max_sequence_number(usernames, phrase)
+                    connection.execute('INSERT OR REPLACE INTO counters (server, phrase, last) VALUES (?, ?, ?)',
+                        (server.value, phrase, last + count))
+            ret = list(range(last + 1, last + count + 1))
+        except sqlite3.Error as err:
+            logger.error(f'In SqliteAccountStore: {err}')
+        return ret
+
+    def export_library(self):
+        ret = {sv.value: [] for sv in Server}
+        rows = self.__query('SELECT server, username, password FROM accounts ORDER BY id')
+        if rows is not None:
+            for server, username, password in rows:
+                ret.setdefault(server, []).append({JSON_USERNAME_KEY: username, JSON_PASSWORD_KEY: password})
+        else:
+            ret = None
+        return ret
+
+    def import_library(self, accountLib : dict):
+        ret = False
+        if check_account_library_format(accountLib):
+            rows = [(server, str(acc[JSON_USERNAME_KEY]), str(acc[JSON_PASSWORD_KEY])) \
+                for server, accounts in accountLib.items() for acc in accounts]
+            try:
+                with self.lock:
+                    connection = self.__connection()
+                    with connection:
+                        connection.execute('BEGIN')
+                        connection.execute('DELETE FROM accounts')
+                        connection.executemany('INSERT OR IGNORE INTO accounts (server, username, password) '
+                            'VALUES (?, ?, ?)', rows)
+                ret = True
+            except sqlite3.Error as err:
+                logger.error(f'In SqliteAccountStore: {err}')
+        return ret
+
+    def close(self):
+        """Closes the database connection."""
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = None
+
+
+def _reset_stores_after_fork():
+    """Drops the SQLite connections inherited by a forked child."""
+    for store in list(SqliteAccountStore.INSTANCES):
+        store.reset_after_fork()
+
+
+# Not available on Windows, where children are spawned
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_stores_after_fork)
+
+
+def import_json_library(store : AccountStore, path : str = ACCOUNT_LIBRARY_PATH):
+    """
+    Copies accounts from a JSON account library into store.
+
+    Parameters:
+        - store (AccountStore): Destination.
+        - path (str): JSON file, `account_library.json` by default.
+
+    Returns:
+        - True if operation was successful, False otherwise.
+    """
+    ret = False
+    accountLib = JsonAccountStore(path).export_library()
+    if accountLib is not None:
+        ret = store.import_library(accountLib)
+    else:
+        logger.error(f'In import_json_library: Failed to read {path}')
+    return ret
+
+
+def export_json_library(store : AccountStore, path : str = ACCOUNT_LIBRARY_PATH):
+    """
+    Writes all accounts of store to a JSON account library.
+
+    Parameters:
+        - store (AccountStore): Source.
+        - path (str): JSON file, `account_library.json` by default.
+
+    Returns:
+        - True if operation was successful, False otherwise.
+    """
+    ret = False
+    accountLib = store.export_library()
+    if accountLib is not None:
+        ret = JsonAccountStore(path).import_library(accountLib)
+    else:
+        logger.error('In export_json_library: Failed to read store')
+    return ret
+
+
+def get_account_store():
+    """
+    Instantiates ACCOUNT_STORE_Instance if needed.
+
+    Returns:
+        - AccountStore used by the account library, `account_library.json` by default.
+    """
+    global ACCOUNT_STORE_Instance
+    if ACCOUNT_STORE_Instance is None:
+        ACCOUNT_STORE_Instance = JsonAccountStore()
+    return ACCOUNT_STORE_Instance
+
+
+def set_account_store(store : AccountStore):
+    """
+    Changes the storage used by the account library, e.g. to a SqliteAccountStore.
+
+    Parameters:
+        - store (AccountStore): New storage.
+    """
+    global ACCOUNT_STORE_Instance
+    ACCOUNT_STORE_Instance = store
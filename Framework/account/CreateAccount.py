@@ -1,10 +1,13 @@
+from collections import deque, namedtuple
+from contextlib import contextmanager
 from enum import Enum
 import re
 import time
-from Framework.account.AccountLibraryManager import append_account, get_generic_accounts, get_last_account_username, \
-    get_last_account_password
+from Framework.account.AccountLibraryManager import append_account, reserve_generic_usernames
 from Framework.account.Login import Login, initial_setup
+from Framework.account.Mailbox import BrowserMailbox, Mailbox
 from Framework.utility.Constants import Server, Tribe, get_XPATH, get_projectLogger 
+from Framework.utility.Polling import poll_until
 from Framework.utility.SeleniumWebScraper import SWS, Attr
 
 
@@ -13,10 +16,9 @@ logger = get_projectLogger()
 XPATH = get_XPATH()
 # Generic phrase to include in all accounts (At least 5 characters long)
 GENERIC_PHRASE = '0bomb'
-# URL for temporary email generator site
-TEMP_EMAIL_URL = 'https://mailpoof.com/'
 # Polling constants
 DEFAULT_POLLING_TIME = 1
+MAX_POLLING_DELAY = 4
 MAX_POLLING_TIME = 60
 # Unknown element
 UNKNOWN = ''
@@ -32,14 +34,48 @@ class _Region(Enum):
 
 
 class _AccountCreator:
-    def __init__(self, headless : bool):
-        self.sws = SWS(headless)
+    def __init__(self, headless : bool, sws : SWS = None, mailbox : Mailbox = None):
+        """
+        Parameters:
+            - headless (bool): If True the browser is not shown.
+            - sws (SWS): Driver to reuse, it is reset instead of closed, None by default.
+            - mailbox (Mailbox): Source of activation mails, it is left open, temporary email tabs by default.
+        """
+        self.ownsDriver = sws is None
+        self.sws = sws if sws is not None else SWS(headless)
+        self.ownsMailbox = mailbox is None
+        self.mailbox = mailbox if mailbox is not None else BrowserMailbox(self.sws)
+        # Credentials of the registered account
+        self.username = None
+        self.password = None
+        # Stage name linked to elapsed seconds
+        self.stageTimes = {}
 
     def close(self):
+        if self.ownsMailbox and self.mailbox:
+            self.mailbox.close()
+        self.mailbox = None
         if self.sws:
-            self.sws.close()
+            if self.ownsDriver:
+                self.sws.close()
+            else:
+                self.sws.reset()
         self.sws = None
 
+    @contextmanager
+    def stage(self, name : str):
+        """
+        Measures the time spent in a registration stage.
+
+        Parameters:
+            - name (str): Stage name.
+        """
+        startTime = time.time()
+        try:
+            yield
+        finally:
+            self.stageTimes[name] = self.stageTimes.get(name, 0) + time.time() - startTime
+
     # Required in order to use 'with' keyword
     def __enter__(self):
         return self
@@ -47,88 +83,57 @@ class _AccountCreator:
     def __exit__(self, exc_type, exc_value, exc_traceback): 
         self.close()
 
-    # Temporary email page
+    # Mailbox
     def generate_email(self):
         """
-        Opens a new tab and generates a new email.
+        Creates a new email address on the mailbox.
 
         Returns:
             - String with new email if operation was successful, None otherwise.
         """
-        ret = None
-        if self.sws.newTab(TEMP_EMAIL_URL, switchTo=True):
-            # Generate a new email
-            if self.sws.clickElement(XPATH.TE_RANDOM_BTN, refresh=True, scrollIntoView=True, javaScriptClick=True):
-                email = self.sws.getElementAttribute(XPATH.TE_EMAIL_ADDRESS, Attr.VALUE)
-                if email:
-                    ret = str(email)
-                    logger.success(f'In generate_email: Generated email {email}')
-                else:
-                    logger.error('In generate_email: Failed to get the email address')
+        ret = self.mailbox.new_address()
+        if not ret:
+            logger.error('In generate_email: Failed to create an email address')
+        return ret
+
+    def follow_activation_link(self, link : str):
+        """
+        Opens the activation link in the current tab.
+
+        Parameters:
+            - link (str): Activation link from the activation mail.
+
+        Returns:
+            - True if operation is successful, False otherwise.
+        """
+        ret = False
+        # Click the link and check for success status
+        if self.sws.get(link, checkURL=False):
+            if self.sws.isVisible(XPATH.ZRAVIAN_SUCCESS_STATUS, waitFor=True):
+                ret = True
+                logger.success('In follow_activation_link: Activation successful')
             else:
-                logger.error('In generate_email: Failed to press `Random` button')
+                logger.error('In follow_activation_link: Success message not found')
         else:
-            logger.error('In generate_email: Failed to open new tab')
+            logger.error('In follow_activation_link: Failed to access activation link')
         return ret
 
-    def activate_zravian_account(self):
+    def activate_zravian_account(self, emailAddress : str):
         """
-        Switches to email tab and clicks on the activation link from the activation mail.
+        Waits for the activation mail and clicks on its activation link.
+
+        Parameters:
+            - emailAddress (str): Email of new account.
 
         Returns:
             - True if operation is successful, False otherwise.
         """
         ret = False
-        email_id = None
-        if self.sws.switchToTab(TEMP_EMAIL_URL):
-            # Wait for zravian activation mail
-            startTime = time.time()
-            endTime = startTime + MAX_POLLING_TIME
-            while startTime < endTime:
-                if self.sws.isVisible(XPATH.TE_ZRAVIAN_MAIL):
-                    # Extract the email id in order to see its content
-                    email_id = self.sws.getElementAttribute(XPATH.TE_ZRAVIAN_MAIL, Attr.ID)
-                    if email_id:
-                        # Open email
-                        if not self.sws.clickElement(XPATH.TE_ZRAVIAN_MAIL, scrollIntoView=True, javaScriptClick=True):
-                            email_id = None
-                            logger.error('In activate_zravian_account: Failed to click email')
-                    else:
-                            logger.error('In activate_zravian_account: Failed to extract email id')  
-                    break
-                time.sleep(DEFAULT_POLLING_TIME)
-                startTime = time.time()
-                # Refresh mail section to check for new emails
-                if not self.sws.clickElement(XPATH.TE_REFRESH_BTN):
-                    logger.error('In activate_zravian_account: Failed to refresh')
-            else:
-                logger.warning('In activate_zravian_account: Failed to receive mail.')
+        link = self.mailbox.wait_for_link(emailAddress, MAX_POLLING_TIME)
+        if link:
+            ret = self.follow_activation_link(link)
         else:
-            logger.error('In activate_zravian_account: Failed to switch to tab')
-        # If email id was retrieved and email is open
-        if email_id:
-            ACTIVATE_TEXT = r'activate\.php\?'
-            link = None
-            # Extract text from the activation email
-            text = self.sws.getElementAttribute(XPATH.TE_EMAIL_TEXT % email_id, Attr.TEXT, waitFor=True)
-            if text:
-                try:
-                    # Seacrh the activation link
-                    link = re.search(f'[^ \n]*{ACTIVATE_TEXT}[^ \n]*', text).group()
-                except AttributeError:
-                    logger.error('In activate_zravian_account: Failed to extract activation link')
-            else:
-                logger.error('In activate_zravian_account: Failed to extract activation link')
-            if link:
-                # Click the link and check for success status
-                if self.sws.get(link, checkURL=False):
-                    if self.sws.isVisible(XPATH.ZRAVIAN_SUCCESS_STATUS, waitFor=True):
-                        ret = True
-                        logger.success('In activate_zravian_account: Activation successful')
-                    else:
-                        logger.error('In activate_zravian_account: Success message not found')
-                else:
-                    logger.error('In activate_zravian_account: Failed to access activation link')
+            logger.warning('In activate_zravian_account: Failed to receive mail.')
         return ret
 
     # Zravian registration page
@@ -147,21 +152,12 @@ class _AccountCreator:
         # Generic phrase min length
         GENERIC_PHRASE_MIN_LEN = 5
         if len(GENERIC_PHRASE) >= GENERIC_PHRASE_MIN_LEN:
-            # Find the last generic name and generate the next
-            accountList = get_generic_accounts(server, GENERIC_PHRASE)
-            if accountList is not None:
-                num = 0
-                for acc in accountList:
-                    accountRegex = re.search(f'{GENERIC_PHRASE}([0-9]+)', acc)
-                    try:
-                        num = max(num, int(accountRegex.group(1)))
-                    except (AttributeError, ValueError):
-                        # Found an account not respecting the pattern so ignore it
-                        pass
-                num += 1
-                ret = GENERIC_PHRASE + str(num)
+            # Reserve the next generic name
+            usernames = reserve_generic_usernames(server, GENERIC_PHRASE)
+            if usernames:
+                ret = usernames[0]
             else:
-                logger.error('In generic_credentials_generator: Failed to get account list')
+                logger.error('In generic_credentials_generator: Failed to reserve username')
         else:
             logger.error(f'In generic_credentials_generator: Generic phrase {GENERIC_PHRASE} is too short')
         return ret
@@ -333,11 +329,18 @@ class _AccountCreator:
         elif not password:
             password = _AccountCreator.generic_credentials_generator(server)
         if username and password:
-            emailAddress = self.generate_email()
+            with self.stage('email'):
+                emailAddress = self.generate_email()
             if emailAddress:
-                if self.complete_registration_form(username, password, server, emailAddress, tribe, region):
-                    if self.activate_zravian_account():
+                with self.stage('registration'):
+                    registered = self.complete_registration_form(username, password, server, emailAddress, tribe,
+                        region)
+                if registered:
+                    with self.stage('activation'):
+                        activated = self.activate_zravian_account(emailAddress)
+                    if activated:
                         if self.store_new_account(server, username, password):
+                            self.username, self.password = username, password
                             logger.success(f'In register: Created and saved account [{username}, {password}] on '\
                                 f'server {server.value}')
                             ret = True
@@ -349,6 +352,7 @@ class _AccountCreator:
                         logger.warning('In register: Failed to activate the new account')
                 else:
                     logger.warning('In register: Failed to complete the registration form')
+                self.mailbox.release(emailAddress)
             else:
                 logger.error('In register: Failed to generate an email address')
         else:
@@ -356,8 +360,150 @@ class _AccountCreator:
         return ret
 
 
+# Registration waiting for its activation mail
+_PendingActivation = namedtuple(typename='_PendingActivation', field_names=['username', 'password', 'server',
+    'emailAddress', 'deadline'])
+
+
+class _PipelinedAccountCreator(_AccountCreator):
+    """
+    Registers accounts while earlier ones wait for their activation mail.
+
+    Email addresses are generated ahead, each registration takes one, and pending activations are checked
+    in sweeps between registrations.
+    """
+    def __init__(self, headless : bool, sws : SWS = None, mailbox : Mailbox = None, mailboxPoolSize : int = 4,
+                maxPending : int = 8):
+        """
+        Parameters:
+            - headless (bool): If True the browser is not shown.
+            - sws (SWS): Driver to reuse, it is reset instead of closed, None by default.
+            - mailbox (Mailbox): Source of activation mails, it is left open, temporary email tabs by default.
+            - mailboxPoolSize (int): Mailboxes generated ahead, 4 by default.
+            - maxPending (int): Registrations waiting for activation at once, 8 by default.
+        """
+        super().__init__(headless, sws, mailbox)
+        self.mailboxPoolSize = mailboxPoolSize
+        self.maxPending = maxPending
+        # Email addresses ready to be used
+        self.mailboxes = deque()
+        self.pending = []
+        # Credentials of activated accounts
+        self.created = []
+
+    def fill_mailbox_pool(self, needed : int):
+        """
+        Generates mailboxes until the pool is full or holds the needed amount.
+
+        Parameters:
+            - needed (int): Mailboxes still required by queued registrations.
+
+        Returns:
+            - True if at least one mailbox is available, False otherwise.
+        """
+        while len(self.mailboxes) < min(self.mailboxPoolSize, needed):
+            with self.stage('email'):
+                emailAddress = self.generate_email()
+            if not emailAddress:
+                logger.error('In fill_mailbox_pool: generate_email() failed')
+                break
+            self.mailboxes.append(emailAddress)
+        return bool(self.mailboxes)
+
+    def start_registration(self, username : str, password : str, server : Server, tribe : Tribe, region : _Region):
+        """
+        Fills the registration form with the next mailbox, the account then waits for activation.
+
+        Parameters:
+            - username (str): Username of new account.
+            - password (str): Password of new account.
+            - server (Server): Server of new account.
+            - tribe (Tribe): Tribe of new account.
+            - region (_Region): Region of new account.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        emailAddress = self.mailboxes.popleft()
+        with self.stage('registration'):
+            ret = self.complete_registration_form(username, password, server, emailAddress, tribe, region)
+            # Close registration tab
+            self.sws.closeTab()
+        if ret:
+            self.pending.append(_PendingActivation(username, password, server, emailAddress,
+                time.time() + MAX_POLLING_TIME))
+        else:
+            self.mailbox.release(emailAddress)
+            logger.warning(f'In start_registration: Failed to register {username}')
+        return ret
+
+    def sweep_activations(self):
+        """
+        Checks every pending mailbox once and activates the accounts whose mail arrived.
+
+        Returns:
+            - True if any activation finished or expired, False otherwise.
+        """
+        ret = False
+        for pending in list(self.pending):
+            activated, finished = False, False
+            with self.stage('activation'):
+                link = self.mailbox.poll_link(pending.emailAddress)
+                if link:
+                    activated = self.follow_activation_link(link)
+                    finished = True
+                elif time.time() > pending.deadline:
+                    logger.warning(f'In sweep_activations: Failed to receive mail for {pending.username}')
+                    finished = True
+            if finished:
+                ret = True
+                self.pending.remove(pending)
+                self.mailbox.release(pending.emailAddress)
+                if activated:
+                    if self.store_new_account(pending.server, pending.username, pending.password):
+                        self.created.append((pending.username, pending.password))
+                    else:
+                        logger.error(f'In sweep_activations: Failed to store {pending.username}')
+                elif not self.store_new_account(pending.server, pending.username, UNKNOWN):
+                    logger.error('In sweep_activations: Failed to store account with unknown password')
+        return ret
+
+    def create_many(self, count : int, server : Server, tribe : Tribe, region : _Region):
+        """
+        Registers and activates count generic accounts.
+
+        Parameters:
+            - count (int): Amount of accounts.
+            - server (Server): Server of new accounts.
+            - tribe (Tribe): Tribe of new accounts.
+            - region (_Region): Region of new accounts.
+
+        Returns:
+            - List of (username, password) of the activated accounts.
+        """
+        usernames = reserve_generic_usernames(server, GENERIC_PHRASE, count)
+        queued = deque(usernames or [])
+        while queued or self.pending:
+            if queued and len(self.pending) < self.maxPending:
+                if self.fill_mailbox_pool(len(queued)):
+                    username = queued.popleft()
+                    self.start_registration(username, username, server, tribe, region)
+                    continue
+                elif not self.pending:
+                    logger.error(f'In create_many: No mailbox available, dropping {len(queued)} registrations')
+                    break
+            # Wait for mail only when there is nothing to register
+            if queued and len(self.pending) < self.maxPending:
+                self.sweep_activations()
+            else:
+                poll_until(self.sweep_activations, MAX_POLLING_TIME, initialDelay=DEFAULT_POLLING_TIME,
+                    maxDelay=MAX_POLLING_DELAY, name='pending activations')
+        return self.created
+
+
 def create_new_account(username : str = None, password : str = None, server=Server.S10k, tribe=Tribe.TEUTONS,
-            region=_Region.PLUS_PLUS, doTasks=True, headless=True):
+            region=_Region.PLUS_PLUS, doTasks=True, headless=True, sws : SWS = None, stageTimes : dict = None,
+            mailbox : Mailbox = None):
     """
     Creates and activates a new account.
 
@@ -368,6 +514,9 @@ def create_new_account(username : str = None, password : str = None, server=Serv
         - tribe (Tribe): Desired tribe, Teutons by default.
         - region (_Region): Desired region, +|+ by default.
         - doTasks (bool): If True will accept tasks, False by default.
+        - sws (SWS): Driver to reuse for registration and login, a new one is opened for each by default.
+        - stageTimes (dict): If given, is filled with the seconds spent in each stage.
+        - mailbox (Mailbox): Source of the activation mail, it is left open, temporary email tabs by default.
 
     Returns:
         - True if operation is successful, False otherwise.
@@ -375,21 +524,65 @@ def create_new_account(username : str = None, password : str = None, server=Serv
     ret = False
     # Register account
     registerStatus = False
-    with _AccountCreator(headless) as newAcc:
+    with _AccountCreator(headless, sws, mailbox) as newAcc:
         registerStatus = newAcc.register(username, password, server, tribe, region)
+    if stageTimes is not None:
+        stageTimes.update(newAcc.stageTimes)
     if registerStatus:
-        username, password = get_last_account_username(server), get_last_account_password(server)
+        # Credentials of this registration, the last library entry may belong to a concurrent creator
+        username, password = newAcc.username, newAcc.password
         if username and password:
+            loginStart = time.time()
             # Login on the new account
-            with Login(server, username, password, headless=True, ) as sws:
+            with Login(server, username, password, headless=True, sws=sws, useSession=True) as loggedSws:
+                setupStart = time.time()
                 # Perform initial configuration
-                if sws:
-                    if initial_setup(sws, doTasks):
+                if loggedSws:
+                    if initial_setup(loggedSws, doTasks):
                         ret = True
                     else:
                         logger.error('In create_new_account: Failed to do the initial setup')
+                if stageTimes is not None:
+                    stageTimes['login'] = setupStart - loginStart
+                    stageTimes['setup'] = time.time() - setupStart
         else:
             logger.error('In create_new_account: Failed to retrieve credentials of created account')
     else:
         logger.error('In create_new_account: Failed to register')
     return ret
+
+
+def create_new_accounts(count : int, server=Server.S10k, tribe=Tribe.TEUTONS, region=_Region.PLUS_PLUS, doTasks=True,
+            headless=True, mailbox : Mailbox = None, mailboxPoolSize : int = 4, maxPending : int = 8):
+    """
+    Creates and activates many generic accounts with one browser, registering new accounts while earlier ones
+    wait for their activation mail.
+
+    Parameters:
+        - count (int): Amount of accounts.
+        - server (Server): Server of new accounts, 10K by default.
+        - tribe (Tribe): Desired tribe, Teutons by default.
+        - region (_Region): Desired region, +|+ by default.
+        - doTasks (bool): If True will accept tasks, False by default.
+        - mailbox (Mailbox): Source of activation mails, temporary email tabs by default.
+        - mailboxPoolSize (int): Mailboxes generated ahead, 4 by default.
+        - maxPending (int): Registrations waiting for activation at once, 8 by default.
+
+    Returns:
+        - List of (username, password) of the accounts created and set up.
+    """
+    ret = []
+    sws = SWS(headless)
+    try:
+        with _PipelinedAccountCreator(headless, sws, mailbox, mailboxPoolSize, maxPending) as creator:
+            created = creator.create_many(count, server, tribe, region)
+        for username, password in created:
+            with Login(server, username, password, headless=headless, sws=sws, useSession=True) as loggedSws:
+                if initial_setup(loggedSws, doTasks):
+                    ret.append((username, password))
+                else:
+                    logger.error(f'In create_new_accounts: Failed to do the initial setup of {username}')
+    finally:
+        sws.close()
+    logger.info(f'In create_new_accounts: Created {len(ret)}/{count} accounts')
+    return ret
@@ -0,0 +1,193 @@
+from html.parser import HTMLParser
+import threading
+from urllib.parse import urljoin
+from Framework.utility.Constants import Server, get_projectLogger
+
+
+# Project constants
+logger = get_projectLogger()
+# Ids of the login form inputs, same as LOGIN_USER_INPUT and LOGIN_PASS_INPUT xpaths
+LOGIN_USER_ID = 'name'
+LOGIN_PASS_ID = 'pass'
+# Page loaded to check a session, redirects to the login form when logged out
+SESSION_CHECK_SUFFIX = 'village1.php'
+# HTTP constants
+HTTP_TIMEOUT = 15
+HTTP_POOL_SIZE = 32
+HTTP_MAX_RETRIES = 2
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0 Safari/537.36'
+# Connection pool shared by all sessions, created with the first session
+HTTP_ADAPTER_Instance = None
+HTTP_ADAPTER_LOCK = threading.Lock()
+
+# requests is imported by the first session
+requests = None
+
+
+def _load_requests():
+    """Imports requests on first use."""
+    global requests
+    if requests is None:
+        import requests as _requests
+        requests = _requests
+
+
+def get_http_adapter():
+    """
+    Instantiates HTTP_ADAPTER_Instance if needed.
+
+    Returns:
+        - HTTPAdapter pooling the connections of every HttpSession.
+    """
+    global HTTP_ADAPTER_Instance
+    with HTTP_ADAPTER_LOCK:
+        if HTTP_ADAPTER_Instance is None:
+            _load_requests()
+            HTTP_ADAPTER_Instance = requests.adapters.HTTPAdapter(pool_connections=len(Server),
+                pool_maxsize=HTTP_POOL_SIZE, max_retries=HTTP_MAX_RETRIES)
+        return HTTP_ADAPTER_Instance
+
+
+# Collects the forms of a page with their fields
+class _FormParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        # Dictionaries with action, fields (name linked to value) and ids (id linked to name)
+        self.forms = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form':
+            self.forms.append({'action': attrs.get('action') or '', 'fields': {}, 'ids': {}})
+        elif tag in ('input', 'select', 'textarea') and self.forms and attrs.get('name'):
+            form = self.forms[-1]
+            inputType = (attrs.get('type') or '').lower()
+            # Unchecked boxes are not sent by browsers
+            if inputType not in ('checkbox', 'radio') or 'checked' in attrs:
+                form['fields'][attrs['name']] = attrs.get('value') or ''
+            if attrs.get('id'):
+                form['ids'][attrs['id']] = attrs['name']
+
+    @staticmethod
+    def find_login_form(html : str):
+        """
+        Parameters:
+            - html (str): Page content.
+
+        Returns:
+            - Dictionary of the login form if found, None otherwise.
+        """
+        parser = _FormParser()
+        parser.feed(html)
+        for form in parser.forms:
+            if LOGIN_USER_ID in form['ids'] and LOGIN_PASS_ID in form['ids']:
+                return form
+        return None
+
+
+# Browserless session of one account, connections are pooled across sessions
+class HttpSession:
+    def __init__(self, baseURL : str):
+        """
+        Parameters:
+            - baseURL (str): Server URL, ending with `/`.
+        """
+        self.baseURL = baseURL
+        adapter = get_http_adapter()
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = USER_AGENT
+
+    def get(self, path : str = ''):
+        """
+        Loads a page of the server.
+
+        Parameters:
+            - path (str): Page relative to the server URL, home page by default.
+
+        Returns:
+            - Response if operation was successful, None otherwise.
+        """
+        ret = None
+        try:
+            ret = self.session.get(urljoin(self.baseURL, path), timeout=HTTP_TIMEOUT)
+            ret.raise_for_status()
+        except requests.RequestException as err:
+            logger.error(f'In HttpSession: Failed to load {path}: {err}')
+            ret = None
+        return ret
+
+    def login(self, username : str, password : str):
+        """
+        Fills and posts the login form of the home page.
+
+        Parameters:
+            - username (str): Identifies the account.
+            - password (str): Account password.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        ret = False
+        response = self.get()
+        form = _FormParser.find_login_form(response.text) if response is not None else None
+        if form:
+            fields = dict(form['fields'])
+            fields[form['ids'][LOGIN_USER_ID]] = username
+            fields[form['ids'][LOGIN_PASS_ID]] = password
+            try:
+                response = self.session.post(urljoin(response.url, form['action']), data=fields,
+                    timeout=HTTP_TIMEOUT)
+                response.raise_for_status()
+                if _FormParser.find_login_form(response.text):
+                    logger.error(f'In HttpSession: Login form rejected {username}')
+                else:
+                    ret = True
+            except requests.RequestException as err:
+                logger.error(f'In HttpSession: Failed to post login form: {err}')
+        elif response is not None:
+            logger.error('In HttpSession: Failed to find login form')
+        return ret
+
+    def is_logged_in(self):
+        """
+        Checks the session with one page load.
+
+        Returns:
+            - True if the session is logged in, False otherwise.
+        """
+        response = self.get(SESSION_CHECK_SUFFIX)
+        return response is not None and SESSION_CHECK_SUFFIX in response.url and \
+            not _FormParser.find_login_form(response.text)
+
+    def getCookies(self):
+        """
+        Gets the session cookies.
+
+        Returns:
+            - List of cookie dictionaries, same format as SWS.getCookies().
+        """
+        ret = []
+        for cookie in self.session.cookies:
+            ret.append({'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path,
+                'secure': bool(cookie.secure), 'httpOnly': cookie.has_nonstandard_attr('HttpOnly')})
+            if cookie.expires is not None:
+                ret[-1]['expiry'] = cookie.expires
+        return ret
+
+    def setCookies(self, cookies : list):
+        """
+        Sets cookies, replacing the ones with the same name, domain and path.
+
+        Parameters:
+            - cookies (list): Cookie dictionaries as returned by getCookies() or SWS.getCookies().
+        """
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/'), secure=cookie.get('secure', False), expires=cookie.get('expiry'),
+                rest={'HttpOnly': None} if cookie.get('httpOnly') else {})
+
+    def close(self):
+        """Forgets the session cookies, pooled connections stay open for other sessions."""
+        self.session.cookies.clear()
@@ -1,4 +1,8 @@
+from enum import Enum
+import sys
 from Framework.account.AccountLibraryManager import get_account_password
+from Framework.account.HttpSession import SESSION_CHECK_SUFFIX, HttpSession
+from Framework.account.SessionStore import get_session_store
 from Framework.screen.Dialog import accept_missions, skip_missions
 from Framework.utility.Constants import Server, get_XPATH, get_projectLogger
 from Framework.utility.SeleniumWebScraper import SWS
@@ -14,22 +18,86 @@ class LoginError(Exception):
     pass
 
 
+# How the credentials are submitted and which backend is returned
+class LoginMode(Enum):
+    # Login form filled in the browser, returns SWS
+    BROWSER = 'browser'
+    # Login form posted over HTTP, the cookies are handed to the browser, returns SWS
+    HTTP = 'http'
+    # Login form posted over HTTP without any browser, returns HttpSession
+    HTTP_ONLY = 'http only'
+
+
 class Login:
-    def __init__(self, server : Server, username : str, password: str = None, headless: bool = False):
+    def __init__(self, server : Server, username : str, password: str = None, headless: bool = False,
+                sws: SWS = None, useSession: bool = False, mode: LoginMode = LoginMode.BROWSER):
+        """
+        Parameters:
+            - server (Server): Denotes server.
+            - username (str): Identifies the account.
+            - password (str): Account password, read from the account library by default.
+            - headless (bool): If True the browser is not shown, False by default.
+            - sws (SWS): Driver to reuse, it is reset instead of closed on exit, None by default.
+            - useSession (bool): If True restores the last session of the account instead of filling the login
+                form when possible, and stores the new session otherwise, False by default.
+            - mode (LoginMode): How to login, in the browser by default.
+        """
+        self.sws = None
+        self.http = None
         self.server = server
         self.username = username
         self.password = password
         self.headless = headless
+        self.sharedSws = sws
+        self.useSession = useSession
+        self.mode = mode
 
     def __enter__(self):
-        """Instantiates sws and attempts to login with the given credentials."""
-        self.sws = SWS(self.headless)
+        """Instantiates the backend and attempts to login with the given credentials."""
+        # Records logged while logged in are tagged with the account
+        self.logContext = logger.context(server=self.server.name, account=self.username)
+        self.logContext.__enter__()
+        try:
+            return self.__login()
+        except BaseException:
+            self.__exit__(*sys.exc_info())
+            raise
+
+    def __login(self):
+        """
+        Returns:
+            - SWS logged in with the given credentials, HttpSession in HTTP_ONLY mode.
+        """
+        if self.mode is LoginMode.HTTP_ONLY:
+            self.http = HttpSession(self.server.value)
+        else:
+            self.sws = self.sharedSws or SWS(self.headless)
+        if self.useSession and self.__restore_session():
+            return self.__backend()
         if not self.password:
             self.password = get_account_password(self.server, self.username)
         if not self.password:
             err = LoginError(f'In login: Failed to identify password for {self.username} on {self.server.value}')
             logger.error(str(err))
             raise err
+        if self.mode is LoginMode.BROWSER:
+            self.__browser_login()
+        else:
+            self.__http_login()
+        cookies = self.http.getCookies() if self.http else self.sws.getCookies()
+        if self.useSession and not get_session_store().save(self.server, self.username, cookies):
+            logger.warning('In login: Failed to store session')
+        return self.__backend()
+
+    def __backend(self):
+        """
+        Returns:
+            - HttpSession in HTTP_ONLY mode, SWS otherwise.
+        """
+        return self.http if self.mode is LoginMode.HTTP_ONLY else self.sws
+
+    def __browser_login(self):
+        """Fills the login form in the browser."""
         if not self.sws.get(self.server.value):
             err = LoginError(f'In login: Failed to load {self.server.value}!')
             logger.error(str(err))
@@ -46,13 +114,61 @@ class Login:
             err = LoginError('In login: Failed to click submit')
             logger.error(str(err))
             raise err
-        return self.sws
+
+    def __http_login(self):
+        """Posts the login form over HTTP and hands the session cookies to the browser if any."""
+        self.http = self.http or HttpSession(self.server.value)
+        if not self.http.login(self.username, self.password):
+            err = LoginError(f'In login: Failed to post credentials of {self.username}')
+            logger.error(str(err))
+            raise err
+        if self.sws:
+            if not self.sws.setCookies(self.http.getCookies()):
+                err = LoginError('In login: Failed to hand cookies to the browser')
+                logger.error(str(err))
+                raise err
+            if not self.sws.get(self.server.value + SESSION_CHECK_SUFFIX):
+                err = LoginError(f'In login: Failed to load {SESSION_CHECK_SUFFIX} with the new session')
+                logger.error(str(err))
+                raise err
+
+    def __restore_session(self):
+        """
+        Restores the stored cookies of the account and validates them with one page load.
+
+        Returns:
+            - True if the session is valid, False otherwise.
+        """
+        ret = False
+        cookies = get_session_store().load(self.server, self.username)
+        if cookies and self.http:
+            self.http.setCookies(cookies)
+            ret = self.http.is_logged_in()
+        elif cookies and self.sws.setCookies(cookies):
+            ret = self.sws.get(self.server.value + SESSION_CHECK_SUFFIX, checkURL=False) and \
+                SESSION_CHECK_SUFFIX in self.sws.getCurrentUrl() and not self.sws.isVisible(XPATH.LOGIN_USER_INPUT)
+        if cookies:
+            if ret:
+                logger.info(f'In login: Restored session of {self.username}')
+            else:
+                logger.info(f'In login: Stored session of {self.username} is no longer valid')
+                get_session_store().discard(self.server, self.username)
+                if self.http:
+                    self.http.close()
+        return ret
 
     def __exit__(self, exc_type, exc_value, exc_traceback):
-        """Closes sws."""
+        """Closes sws and forgets the HTTP session."""
+        if self.http:
+            self.http.close()
+        self.http = None
         if self.sws:
-            self.sws.close()
+            if self.sws is self.sharedSws:
+                self.sws.reset()
+            else:
+                self.sws.close()
         self.sws = None
+        self.logContext.__exit__(exc_type, exc_value, exc_traceback)
 
 
 def initial_setup(sws : SWS, doTasks):
@@ -0,0 +1,290 @@
+from abc import ABC, abstractmethod
+from email import message_from_bytes, policy
+import re
+import socketserver
+import threading
+import uuid
+from Framework.utility.Constants import get_XPATH, get_projectLogger
+from Framework.utility.Polling import poll_until
+from Framework.utility.SeleniumWebScraper import SWS, Attr
+
+
+# Project constants
+logger = get_projectLogger()
+XPATH = get_XPATH()
+# URL for temporary email generator site
+TEMP_EMAIL_URL = 'https://mailpoof.com/'
+# Polling delays of mailboxes that can not notify new mail, each check costs a page refresh
+MIN_POLLING_DELAY = 1
+MAX_POLLING_DELAY = 4
+# Zravian activation link
+ACTIVATION_LINK_RE = re.compile(r'[^\s"\'<>]*activate\.php\?[^\s"\'<>]*')
+
+
+def extract_activation_link(text : str):
+    """
+    Parameters:
+        - text (str): Content of a mail.
+
+    Returns:
+        - String with the activation link if found, None otherwise.
+    """
+    ret = None
+    if text:
+        linkRe = ACTIVATION_LINK_RE.search(text)
+        if linkRe:
+            ret = linkRe.group()
+    return ret
+
+
+# Interface of activation mail sources
+class Mailbox(ABC):
+    @abstractmethod
+    def new_address(self):
+        """
+        Creates a new address able to receive mail.
+
+        Returns:
+            - String with the address if operation was successful, None otherwise.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def poll_link(self, address : str):
+        """
+        Checks once for the activation mail, never blocks for new mail.
+
+        Parameters:
+            - address (str): Address returned by new_address().
+
+        Returns:
+            - String with the activation link if the mail arrived, None otherwise.
+        """
+        raise NotImplementedError
+
+    def wait_for_link(self, address : str, timeout : float):
+        """
+        Waits for the activation mail.
+
+        Parameters:
+            - address (str): Address returned by new_address().
+            - timeout (float): Max seconds to wait.
+
+        Returns:
+            - String with the activation link if the mail arrived in time, None otherwise.
+        """
+        return poll_until(lambda: self.poll_link(address), timeout, initialDelay=MIN_POLLING_DELAY,
+            maxDelay=MAX_POLLING_DELAY, name='activation mail')
+
+    def release(self, address : str):
+        """
+        Frees the resources of an address that is no longer needed.
+
+        Parameters:
+            - address (str): Address returned by new_address().
+        """
+        pass
+
+    def close(self):
+        """Frees the resources of every address."""
+        pass
+
+    # Required in order to use 'with' keyword
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+# Temporary email site scraped through a browser tab for each address
+class BrowserMailbox(Mailbox):
+    def __init__(self, sws : SWS):
+        """
+        Parameters:
+            - sws (SWS): Driver used to open the email tabs.
+        """
+        self.sws = sws
+        # Address linked to its tab handle
+        self.tabs = {}
+
+    def new_address(self):
+        ret = None
+        if self.sws.newTab(TEMP_EMAIL_URL, switchTo=True):
+            # Generate a new email
+            if self.sws.clickElement(XPATH.TE_RANDOM_BTN, refresh=True, scrollIntoView=True, javaScriptClick=True):
+                email = self.sws.getElementAttribute(XPATH.TE_EMAIL_ADDRESS, Attr.VALUE)
+                if email:
+                    ret = str(email)
+                    self.tabs[ret] = self.sws.getTabHandle()
+                    logger.success(f'In BrowserMailbox: Generated email {email}')
+                else:
+                    logger.error('In BrowserMailbox: Failed to get the email address')
+            else:
+                logger.error('In BrowserMailbox: Failed to press `Random` button')
+            if not ret:
+                self.sws.closeTab()
+        else:
+            logger.error('In BrowserMailbox: Failed to open new tab')
+        return ret
+
+    def __find_activation_mail(self):
+        """
+        Checks the current email tab once for the activation mail and opens it, refreshes the inbox otherwise.
+
+        Returns:
+            - String with the email id if the mail was opened, None otherwise.
+        """
+        ret = None
+        if self.sws.isVisible(XPATH.TE_ZRAVIAN_MAIL):
+            # Extract the email id in order to see its content
+            emailId = self.sws.getElementAttribute(XPATH.TE_ZRAVIAN_MAIL, Attr.ID)
+            if emailId:
+                # Open email
+                if self.sws.clickElement(XPATH.TE_ZRAVIAN_MAIL, scrollIntoView=True, javaScriptClick=True):
+                    ret = emailId
+                else:
+                    logger.error('In BrowserMailbox: Failed to click email')
+            else:
+                logger.error('In BrowserMailbox: Failed to extract email id')
+        # Refresh mail section to check for new emails
+        elif not self.sws.clickElement(XPATH.TE_REFRESH_BTN):
+            logger.error('In BrowserMailbox: Failed to refresh')
+        return ret
+
+    def poll_link(self, address : str):
+        ret = None
+        if address in self.tabs and self.sws.switchToTab(self.tabs[address]):
+            emailId = self.__find_activation_mail()
+            if emailId:
+                # Extract text from the activation email
+                text = self.sws.getElementAttribute(XPATH.TE_EMAIL_TEXT % emailId, Attr.TEXT, waitFor=True)
+                ret = extract_activation_link(text)
+                if not ret:
+                    logger.error('In BrowserMailbox: Failed to extract activation link')
+        else:
+            logger.error(f'In BrowserMailbox: Failed to switch to the tab of {address}')
+        return ret
+
+    def release(self, address : str):
+        tabHandle = self.tabs.pop(address, None)
+        if tabHandle and self.sws.driver:
+            self.sws.closeTab(tabHandle)
+
+    def close(self):
+        for address in list(self.tabs):
+            self.release(address)
+
+
+# Minimal SMTP server conversation, every accepted message is handed to the mailbox of the server
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line : str):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        mailbox = self.server.mailbox
+        recipients = []
+        self.reply(f'220 {mailbox.domain} SMTP ready')
+        for rawLine in self.rfile:
+            command = rawLine.decode(errors='replace').strip()
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply(f'250 {mailbox.domain}')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipientRe = re.search(r'<([^>]*)>', command)
+                if recipientRe:
+                    recipients.append(recipientRe.group(1).lower())
+                    self.reply('250 OK')
+                else:
+                    self.reply('501 Syntax error')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                for dataLine in self.rfile:
+                    if dataLine.rstrip(b'\r\n') == b'.':
+                        break
+                    # Remove dot stuffing
+                    data.append(dataLine[1:] if dataLine.startswith(b'..') else dataLine)
+                mailbox.deliver(recipients, b''.join(data))
+                recipients = []
+                self.reply('250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                recipients = [] if verb == 'RSET' else recipients
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                break
+            else:
+                self.reply('502 Command not implemented')
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+# SMTP sink on this host, the mail server of the game must deliver to it, messages wake up their waiters
+class LocalSMTPMailbox(Mailbox):
+    def __init__(self, host : str = '127.0.0.1', port : int = 0, domain : str = 'zravian.local'):
+        """
+        Parameters:
+            - host (str): Interface to listen on, localhost by default.
+            - port (int): Port to listen on, a free one by default.
+            - domain (str): Domain of generated addresses, `zravian.local` by default.
+        """
+        self.domain = domain
+        # Address linked to the activation link received, None while waiting
+        self.inbox = {}
+        self.condition = threading.Condition()
+        self.server = _SMTPServer((host, port), _SMTPHandler)
+        self.server.mailbox = self
+        self.host, self.port = self.server.server_address[:2]
+        self.thread = threading.Thread(target=self.server.serve_forever, name='LocalSMTPMailbox', daemon=True)
+        self.thread.start()
+
+    def deliver(self, recipients : list, data : bytes):
+        """
+        Stores the activation link of a received message and notifies its waiters.
+
+        Parameters:
+            - recipients (list): Addresses of the message.
+            - data (bytes): Raw message.
+        """
+        message = message_from_bytes(data, policy=policy.default)
+        body = message.get_body(preferencelist=('plain', 'html'))
+        link = extract_activation_link(body.get_content() if body else '')
+        if link:
+            with self.condition:
+                for address in recipients:
+                    if address in self.inbox:
+                        self.inbox[address] = link
+                self.condition.notify_all()
+        else:
+            logger.warning(f'In LocalSMTPMailbox: Ignored message without activation link for {recipients}')
+
+    def new_address(self):
+        ret = f'{uuid.uuid4().hex[:12]}@{self.domain}'
+        with self.condition:
+            self.inbox[ret] = None
+        return ret
+
+    def poll_link(self, address : str):
+        with self.condition:
+            return self.inbox.get(address.lower())
+
+    def wait_for_link(self, address : str, timeout : float):
+        with self.condition:
+            return self.condition.wait_for(lambda: self.inbox.get(address.lower()), timeout)
+
+    def release(self, address : str):
+        with self.condition:
+            self.inbox.pop(address.lower(), None)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        with self.condition:
+            self.inbox.clear()
@@ -0,0 +1,342 @@
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import heapq
+import itertools
+import threading
+import time
+from Framework.account.AccountFarm import DriverPool
+from Framework.account.AccountLibraryManager import get_account_library
+from Framework.account.AccountStore import JSON_PASSWORD_KEY, JSON_USERNAME_KEY
+from Framework.account.Login import Login, LoginMode
+from Framework.utility.Constants import Server, get_projectLogger
+
+
+# Project constants
+logger = get_projectLogger()
+# One-off tasks an account may hold before submit() refuses new ones
+MAX_ACCOUNT_QUEUE = 16
+# Max seconds the scheduler sleeps without checking for stop() or new work
+MAX_IDLE_TIME = 1
+# Task run for each account, every interval seconds (once if interval is None)
+# Function is called with the logged in backend (SWS, HttpSession in HTTP_ONLY mode) and returns True on success
+AccountTask = namedtuple(typename='AccountTask', field_names=['name', 'function', 'interval'])
+# Outcome of a task run
+TaskRun = namedtuple(typename='TaskRun', field_names=['server', 'username', 'task', 'success', 'error', 'duration'])
+
+
+# Counters of a task over all accounts
+class TaskStats:
+    __slots__ = ('runs', 'failures', 'totalTime')
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.totalTime = 0
+
+    def __repr__(self):
+        return f'TaskStats(runs={self.runs}, failures={self.failures}, totalTime={self.totalTime:.2f})'
+
+
+def get_library_accounts(servers : list = None):
+    """
+    Lists the accounts of the account library with a known password.
+
+    Parameters:
+        - servers (list): Servers to take accounts from, all by default.
+
+    Returns:
+        - List of (server, username).
+    """
+    ret = []
+    accountLib = get_account_library() or {}
+    for sv in servers or list(Server):
+        ret += [(sv, acc[JSON_USERNAME_KEY]) for acc in accountLib.get(sv.value, []) if acc[JSON_PASSWORD_KEY]]
+    return ret
+
+
+# Tasks of one account ordered by due time, served by one worker at a time
+class _AccountQueue:
+    def __init__(self, server : Server, username : str, tasks : list):
+        """
+        Parameters:
+            - server (Server): Denotes server.
+            - username (str): Identifies the account.
+            - tasks ([AccountTask]): Tasks due right away.
+        """
+        self.server = server
+        self.username = username
+        # (due time, sequence, task), sequence keeps insertion order between equal times
+        self.heap = []
+        self.sequence = itertools.count()
+        self.busy = False
+        # Task name linked to finished runs
+        self.runs = {}
+        startTime = time.time()
+        for task in tasks:
+            self.push(task, startTime)
+
+    def push(self, task : AccountTask, dueTime : float):
+        heapq.heappush(self.heap, (dueTime, next(self.sequence), task))
+
+    def next_time(self):
+        """
+        Returns:
+            - Due time of the first task, None if the queue is empty.
+        """
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now : float):
+        """
+        Parameters:
+            - now (float): Current timestamp.
+
+        Returns:
+            - List of (due time, task) due until now.
+        """
+        ret = []
+        while self.heap and self.heap[0][0] <= now:
+            dueTime, _, task = heapq.heappop(self.heap)
+            ret.append((dueTime, task))
+        return ret
+
+    def one_off_count(self):
+        return sum(task.interval is None for _, _, task in self.heap)
+
+    def is_finished(self, rounds : int):
+        """
+        Parameters:
+            - rounds (int): Runs required for each task, unlimited if None.
+
+        Returns:
+            - True if every queued task ran rounds times and no one-off task is left, False otherwise.
+        """
+        return rounds is not None and all(task.interval is not None and self.runs.get(task.name, 0) >= rounds \
+            for _, _, task in self.heap)
+
+
+# Runs tasks for many accounts over a bounded pool of workers
+class Orchestrator:
+    """
+    Each account has its own queue of due tasks. A worker logs in once per account and runs all its due tasks,
+    an account is never served by two workers at once.
+
+    Accounts are served round robin, so an account with many tasks can not starve the others. No more sessions
+    than workers are started, due tasks wait in their account queue meanwhile, and a recurring task that missed
+    several intervals runs only once.
+    """
+    def __init__(self, accounts : list, tasks : list, workers : int = 4, mode : LoginMode = LoginMode.BROWSER,
+                headless : bool = True, sessionFunction=None, onResult=None):
+        """
+        Parameters:
+            - accounts (list): (server, username) of the accounts to drive, see get_library_accounts().
+            - tasks ([AccountTask]): Tasks of every account.
+            - workers (int): Accounts served at once, each with its own driver, 4 by default.
+            - mode (LoginMode): How workers login, in the browser by default.
+            - headless (bool): If True browsers are not shown, True by default.
+            - sessionFunction (callable): Called with (server, username), returns a context manager yielding the
+                logged in backend, Login with pooled drivers by default.
+            - onResult (callable): Called with each TaskRun from worker threads, None by default.
+        """
+        self.workers = workers
+        self.mode = mode
+        self.headless = headless
+        self.sessionFunction = sessionFunction or self.__login_session
+        self.onResult = onResult
+        self.queues = deque(_AccountQueue(server, username, tasks) for server, username in accounts)
+        self.queueByAccount = {(queue.server, queue.username): queue for queue in self.queues}
+        self.stats = {}
+        self.lock = threading.Lock()
+        # Set whenever a worker finishes or work is submitted
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        # Free workers, the scheduler never submits more sessions than workers
+        self.slots = threading.BoundedSemaphore(workers)
+        self.driverPool = None
+
+    @contextmanager
+    def __login_session(self, server : Server, username : str):
+        """Logs in with a pooled driver, or without any in HTTP_ONLY mode."""
+        if self.mode is LoginMode.HTTP_ONLY:
+            with Login(server, username, useSession=True, mode=self.mode) as http:
+                yield http
+        else:
+            with self.driverPool.driver() as sws:
+                with Login(server, username, headless=self.headless, sws=sws, useSession=True,
+                        mode=self.mode) as backend:
+                    yield backend
+
+    def submit(self, server : Server, username : str, task : AccountTask):
+        """
+        Queues a task for one account, it runs once with the next session of the account.
+
+        Parameters:
+            - server (Server): Denotes server.
+            - username (str): Identifies the account.
+            - task (AccountTask): Task to run, its interval is ignored.
+
+        Returns:
+            - True if the task was queued, False if the account is unknown or its queue is full.
+        """
+        ret = False
+        queue = self.queueByAccount.get((server, username))
+        if queue:
+            with self.lock:
+                if queue.one_off_count() < MAX_ACCOUNT_QUEUE:
+                    queue.push(task._replace(interval=None), time.time())
+                    ret = True
+                else:
+                    logger.warning(f'In Orchestrator: Queue of {username} is full, refused {task.name}')
+            self.wakeup.set()
+        else:
+            logger.error(f'In Orchestrator: Unknown account {username} on {server.name}')
+        return ret
+
+    def stop(self):
+        """Makes run() return once the running sessions end."""
+        self.stopped.set()
+        self.wakeup.set()
+
+    def run(self, duration : float = None, rounds : int = None):
+        """
+        Serves the accounts until stopped.
+
+        Parameters:
+            - duration (float): Seconds after which no new session starts, unlimited by default.
+            - rounds (int): If given, returns once every task ran this many times for every account and no one-off
+                task is left, unlimited by default.
+
+        Returns:
+            - Dictionary linking task names to TaskStats.
+        """
+        endTime = time.time() + duration if duration is not None else None
+        if self.mode is not LoginMode.HTTP_ONLY and self.sessionFunction == self.__login_session:
+            self.driverPool = DriverPool(self.workers, self.headless)
+        self.stopped.clear()
+        try:
+            with ThreadPoolExecutor(self.workers, thread_name_prefix='Orchestrator') as executor:
+                while not self.stopped.is_set() and (endTime is None or time.time() < endTime) and \
+                        not (rounds is not None and self.__rounds_done(rounds)):
+                    self.wakeup.clear()
+                    if not self.__dispatch(executor, rounds):
+                        self.wakeup.wait(self.__idle_time(endTime, rounds))
+        finally:
+            if self.driverPool:
+                self.driverPool.close()
+                self.driverPool = None
+        return self.stats
+
+    def __rounds_done(self, rounds : int):
+        """
+        Returns:
+            - True if every account finished its rounds, False otherwise.
+        """
+        with self.lock:
+            return all(not queue.busy and queue.is_finished(rounds) for queue in self.queues)
+
+    def __idle_time(self, endTime : float, rounds : int):
+        """
+        Returns:
+            - Seconds until the next task of an idle account is due, at most MAX_IDLE_TIME.
+        """
+        ret = MAX_IDLE_TIME
+        with self.lock:
+            dueTimes = [queue.next_time() for queue in self.queues if not queue.busy and queue.heap and \
+                not queue.is_finished(rounds)]
+        if dueTimes:
+            ret = min(ret, max(0, min(dueTimes) - time.time()))
+        if endTime is not None:
+            ret = min(ret, max(0, endTime - time.time()))
+        return ret
+
+    def __dispatch(self, executor : ThreadPoolExecutor, rounds : int):
+        """
+        Starts a session for each idle account with due tasks, in round robin order, while workers are free.
+
+        Parameters:
+            - executor (ThreadPoolExecutor): Runs the sessions.
+            - rounds (int): Accounts that finished this many rounds are not served, unlimited if None.
+
+        Returns:
+            - True if a session was started, False otherwise.
+        """
+        ret = False
+        now = time.time()
+        for _ in range(len(self.queues)):
+            queue = self.queues[0]
+            with self.lock:
+                due = None
+                if not queue.busy and queue.heap and queue.next_time() <= now and not queue.is_finished(rounds):
+                    # Backpressure, tasks stay in their account queue until a worker is free
+                    if not self.slots.acquire(blocking=False):
+                        break
+                    queue.busy = True
+                    due = queue.pop_due(now)
+            # Next round starts after the last served account
+            self.queues.rotate(-1)
+            if due:
+                executor.submit(self.__serve, queue, due)
+                ret = True
+        return ret
+
+    def __serve(self, queue : _AccountQueue, due : list):
+        """
+        Logs in the account once and runs its due tasks, then reschedules the recurring ones.
+
+        Parameters:
+            - queue (_AccountQueue): Account to serve.
+            - due (list): (due time, task) to run.
+        """
+        runs = []
+        try:
+            with logger.context(server=queue.server.name, account=queue.username):
+                try:
+                    with self.sessionFunction(queue.server, queue.username) as backend:
+                        for _, task in due:
+                            if self.stopped.is_set():
+                                break
+                            runs.append(self.__run_task(queue, task, backend))
+                except Exception as err:
+                    # Tasks not reached fail with the session error
+                    error = f'{type(err).__name__}: {err}'
+                    logger.error(f'In Orchestrator: Session of {queue.username} failed with {error}')
+                    ranNames = {run.task for run in runs}
+                    runs += [TaskRun(queue.server, queue.username, task.name, False, error, 0) \
+                        for _, task in due if task.name not in ranNames]
+        finally:
+            now = time.time()
+            with self.lock:
+                for dueTime, task in due:
+                    if task.interval is not None:
+                        # Missed intervals are not run again
+                        queue.push(task, max(now, dueTime + task.interval))
+                for run in runs:
+                    queue.runs[run.task] = queue.runs.get(run.task, 0) + 1
+                    stats = self.stats.setdefault(run.task, TaskStats())
+                    stats.runs += 1
+                    stats.failures += not run.success
+                    stats.totalTime += run.duration
+                queue.busy = False
+            self.slots.release()
+            self.wakeup.set()
+        if self.onResult:
+            for run in runs:
+                self.onResult(run)
+
+    @staticmethod
+    def __run_task(queue : _AccountQueue, task : AccountTask, backend):
+        """
+        Returns:
+            - TaskRun of task.
+        """
+        error = None
+        startTime = time.time()
+        try:
+            success = bool(task.function(backend))
+            if not success:
+                error = 'Task failed'
+        except Exception as err:
+            success = False
+            error = f'{type(err).__name__}: {err}'
+            logger.error(f'In Orchestrator: Task {task.name} of {queue.username} raised {error}')
+        return TaskRun(queue.server, queue.username, task.name, success, error, time.time() - startTime)
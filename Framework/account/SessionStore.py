@@ -0,0 +1,163 @@
+import json
+import os
+from Framework.utility.Constants import SESSION_KEY_PATH, SESSIONS_PATH, Server, get_projectLogger
+from Framework.utility.FileLock import FileLock, atomic_write
+
+
+# Project constants
+logger = get_projectLogger()
+# Environment variable holding the session encryption key
+SESSION_KEY_ENV = 'ZRAVIAN_SESSION_KEY'
+# Sessions older than this are never restored (seconds)
+SESSION_MAX_AGE = 7 * 24 * 3600
+# Session store singleton
+SESSION_STORE_Instance = None
+
+
+# Cookies of logged in accounts, encrypted on disk and keyed by (server, username)
+class SessionStore:
+    def __init__(self, path : str = SESSIONS_PATH, keyPath : str = SESSION_KEY_PATH, maxAge : int = SESSION_MAX_AGE):
+        """
+        Parameters:
+            - path (str): Sessions file, `sessions.bin` by default.
+            - keyPath (str): Encryption key file, created on first use, `session.key` by default.
+            - maxAge (int): Seconds after which a session is not restored, 7 days by default.
+        """
+        self.path = path
+        self.keyPath = keyPath
+        self.maxAge = maxAge
+        self.lock = FileLock(path)
+        self.fernet = None
+        # Set once sessions are found to be unavailable, e.g. cryptography is not installed
+        self.disabled = False
+
+    def __get_fernet(self):
+        """
+        Loads the encryption key, generating it on first use.
+
+        Returns:
+            - Fernet if operation was successful, None otherwise.
+        """
+        if self.fernet is None and not self.disabled:
+            try:
+                from cryptography.fernet import Fernet
+            except ImportError:
+                self.disabled = True
+                logger.warning('In SessionStore: cryptography is not installed, sessions are disabled')
+                return None
+            key = os.environ.get(SESSION_KEY_ENV)
+            try:
+                if not key:
+                    with self.lock:
+                        if not os.path.exists(self.keyPath):
+                            # Readable by the owner only
+                            fd = os.open(self.keyPath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                            with os.fdopen(fd, 'wb') as f:
+                                f.write(Fernet.generate_key())
+                        with open(self.keyPath, 'rb') as f:
+                            key = f.read().strip()
+                self.fernet = Fernet(key)
+            except (OSError, ValueError) as err:
+                logger.error(f'In SessionStore: Failed to load the encryption key: {err}')
+        return self.fernet
+
+    def __read(self):
+        """
+        Returns:
+            - Dictionary linking session keys to encrypted tokens, empty if file is missing or corrupted.
+        """
+        ret = {}
+        try:
+            with open(self.path, 'r') as f:
+                ret = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as err:
+            logger.error(f'In SessionStore: Failed to read sessions: {err}')
+        return ret
+
+    @staticmethod
+    def __key(server : Server, username : str):
+        return f'{server.name}:{username}'
+
+    def load(self, server : Server, username : str):
+        """
+        Parameters:
+            - server (Server): Identifies the server.
+            - username (str): Identifies the account.
+
+        Returns:
+            - List of cookie dictionaries if a recent session exists, None otherwise.
+        """
+        ret = None
+        fernet = self.__get_fernet()
+        if fernet:
+            from cryptography.fernet import InvalidToken
+            token = self.__read().get(self.__key(server, username))
+            if token:
+                try:
+                    ret = json.loads(fernet.decrypt(token.encode(), ttl=self.maxAge))
+                except InvalidToken:
+                    logger.info(f'In SessionStore: Session of {username} expired or can not be decrypted')
+        return ret
+
+    def save(self, server : Server, username : str, cookies : list):
+        """
+        Stores the session cookies of an account, replacing the previous ones.
+
+        Parameters:
+            - server (Server): Identifies the server.
+            - username (str): Identifies the account.
+            - cookies (list): Cookie dictionaries.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        ret = False
+        fernet = self.__get_fernet()
+        if fernet:
+            token = fernet.encrypt(json.dumps(cookies).encode()).decode()
+            try:
+                with self.lock:
+                    sessions = self.__read()
+                    sessions[self.__key(server, username)] = token
+                    atomic_write(self.path, json.dumps(sessions))
+                ret = True
+            except OSError as err:
+                logger.error(f'In SessionStore: Failed to save session of {username}: {err}')
+        return ret
+
+    def discard(self, server : Server, username : str):
+        """
+        Removes the session of an account.
+
+        Parameters:
+            - server (Server): Identifies the server.
+            - username (str): Identifies the account.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        ret = False
+        try:
+            with self.lock:
+                sessions = self.__read()
+                if sessions.pop(self.__key(server, username), None):
+                    atomic_write(self.path, json.dumps(sessions))
+            ret = True
+        except OSError as err:
+            logger.error(f'In SessionStore: Failed to discard session of {username}: {err}')
+        return ret
+
+
+def get_session_store():
+    """
+    Instantiates SESSION_STORE_Instance if needed.
+
+    Returns:
+        - SessionStore.
+    """
+    global SESSION_STORE_Instance
+    if SESSION_STORE_Instance is None:
+        SESSION_STORE_Instance = SessionStore()
+    return SESSION_STORE_Instance
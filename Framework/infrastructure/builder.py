@@ -1,11 +1,15 @@
+from collections import deque, namedtuple
+from contextlib import contextmanager, nullcontext
 from enum import Enum
 import re
+import sched
 import time
 from Framework.infrastructure.buildings import FIRST_BUILDING_SITE_VILLAGE, LAST_BUILDING_SITE_VILLAGE, \
-    RESOURCE_FIELDS, find_building
+    RESOURCE_FIELDS, find_building, scan_village
+from Framework.infrastructure.costs import parse_costs, record_building_costs
 from Framework.screen.Navigation import enter_building, enter_building_site, is_screen_menu_of, \
     move_to_overview, move_to_village
-from Framework.utility.Constants import BuildingType, get_XPATH, get_building_info, \
+from Framework.utility.Constants import Building, BuildingType, get_XPATH, get_building_info, \
     get_building_type_by_name, get_projectLogger, time_to_seconds
 from Framework.utility.SeleniumWebScraper import SWS, Attr
 
@@ -15,6 +19,8 @@ logger = get_projectLogger()
 XPATH = get_XPATH()
 # Min wait time
 MIN_WAIT = 1
+# Max wait between reads of a jammed demolition timer, the wait doubles from MIN_WAIT on each read
+MAX_JAM_WAIT = 30
 
 
 class BuildingError(Enum):
@@ -35,7 +41,155 @@ class BuildingError(Enum):
     UPGRADE_MAIN_BUILDING = 'Main building level is too low'
 
 
+class BuildPhase(Enum):
+    """Phases of a construct / level up operation."""
+    SCAN = 'scan'
+    CHECKS = 'checks'
+    CLICK = 'click'
+    WAIT = 'wait'
+
+
+class BuildResult:
+    """
+    Outcome of a construct / level up operation.
+
+    Compares equal to its BuildingError and is truthy only on success.
+    """
+    __slots__ = ('error', 'siteId', 'targetLevel', 'finishTime', 'pageLoads', 'driverCalls', 'phaseTimes',
+        '_sws', '_startUsage')
+
+    def __init__(self, sws: SWS = None):
+        """
+        Parameters:
+            - sws (SWS): Used to measure page loads and WebDriver calls from now on, None by default.
+        """
+        self.error = BuildingError.FATAL_ERROR
+        self.siteId = None
+        self.targetLevel = None
+        # Timestamp when the building is ready
+        self.finishTime = None
+        self.pageLoads = 0
+        self.driverCalls = 0
+        self.phaseTimes = {phase: 0.0 for phase in BuildPhase}
+        self._sws = sws
+        self._startUsage = sws.getUsage() if sws else (0, 0)
+
+    @contextmanager
+    def phase(self, phase: BuildPhase):
+        """
+        Measures the time spent in a phase.
+
+        Parameters:
+            - phase (BuildPhase): Phase to add the elapsed time to.
+        """
+        startTime = time.time()
+        try:
+            yield
+        finally:
+            self.phaseTimes[phase] += time.time() - startTime
+
+    def finish(self, error: BuildingError):
+        """
+        Sets the error code and stops measuring page loads and WebDriver calls.
+
+        Parameters:
+            - error (BuildingError): Outcome of the operation.
+
+        Returns:
+            - Itself.
+        """
+        self.error = error
+        if self._sws:
+            pageLoads, driverCalls = self._sws.getUsage()
+            self.pageLoads = pageLoads - self._startUsage[0]
+            self.driverCalls = driverCalls - self._startUsage[1]
+        return self
+
+    def __eq__(self, other):
+        if isinstance(other, BuildingError):
+            return self.error is other
+        if isinstance(other, BuildResult):
+            return self.error is other.error and self.siteId == other.siteId and \
+                self.targetLevel == other.targetLevel
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.error)
+
+    def __bool__(self):
+        return self.error is BuildingError.OK
+
+    def __repr__(self):
+        phases = ', '.join(f'{phase.value}={elapsed:.2f}s' for phase, elapsed in self.phaseTimes.items())
+        return f'BuildResult({self.error.name}, siteId={self.siteId}, targetLevel={self.targetLevel}, ' \
+            f'finishTime={self.finishTime}, pageLoads={self.pageLoads}, driverCalls={self.driverCalls}, {phases})'
+
+
+def __measure(result: BuildResult, phase: BuildPhase):
+    """
+    Measures a phase if a result is given.
+
+    Parameters:
+        - result (BuildResult): Result to record the phase in, may be None.
+        - phase (BuildPhase): Phase to measure.
+
+    Returns:
+        - Context manager.
+    """
+    return result.phase(phase) if result is not None else nullcontext()
+
+
+# Pre-flight verdict for a building page
+BuildVerdict = namedtuple(typename='BuildVerdict', field_names=['error', 'bdType', 'level', 'targetLevel',
+    'constructingMode', 'storageType', 'resourcesTimer', 'costs', 'timeToBuild'])
+
+
 # Utils
+def parse_building_title(title: str):
+    """
+    Extracts building type and level from a building menu title.
+
+    Parameters:
+        - title (str): Building menu title, e.g. "Main Building level 3".
+
+    Returns:
+        - (BuildingType, Int) if operation is successful, (None, None) otherwise.
+    """
+    bdType, level = None, None
+    titleRe = re.search('(.*) level ([0-9]+)', title) if title else None
+    if titleRe:
+        # Translate building name to building type
+        bdType = get_building_type_by_name(titleRe.group(1))
+        if bdType is not None:
+            level = int(titleRe.group(2))
+        else:
+            logger.error('In parse_building_title: get_building_type_by_name() failed')
+    else:
+        logger.error(f'In parse_building_title: Title does not respect pattern: {title}')
+    return bdType, level
+
+
+def parse_costs_level(costsText: str):
+    """
+    Extracts the level a level up leads to from the costs region.
+
+    The title shows the current level, while the costs name the level reached after the upgrades already queued.
+
+    Parameters:
+        - costsText (str): Text of the costs region, naming the level as "level N".
+
+    Returns:
+        - Int if the costs mention the level, None otherwise.
+    """
+    ret = None
+    levelRe = re.search('level ([0-9]+)', costsText) if costsText else None
+    if levelRe:
+        ret = int(levelRe.group(1))
+    else:
+        logger.info('In parse_costs_level: Costs region does not mention the level')
+    return ret
+
+
 def identify_building_type_from_menu(sws: SWS):
     """
     Identifies building type based on current building menu.
@@ -52,24 +206,91 @@ def identify_building_type_from_menu(sws: SWS):
     else:
         title = sws.getElementAttribute(XPATH.BUILDING_MENU_TITLE, Attr.TEXT)
         if title:
-            bdTitle = None
-            # Extract building name from page title
-            try:
-                bdTitle = re.search('(.*)( level [0-9]+)', title).group(1)
-            except AttributeError:
-                logger.error(f'In identify_building_menu: Title does not respect pattern: {title}')
-            if bdTitle:
-                # Translate building name to building type
-                bdType = get_building_type_by_name(bdTitle)
-                if bdType:
-                    ret = bdType
-                else:
-                    logger.error('In identify_building_menu: get_building_type_by_name() failed')
+            ret, _ = parse_building_title(title)
         else:
             logger.error('In identify_building_menu: Failed to retrieve building title')
     return ret
 
 
+def evaluate_build_page(sws: SWS, bdType: BuildingType = None):
+    """
+    Reads the current building page once and evaluates every construct / level up condition.
+
+    Conditions are evaluated in the same order as the checks: max level, storage, resources and busy workers.
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+        - bdType (BuildingType): Building to construct, None if the page is used to level up.
+
+    Returns:
+        - BuildVerdict if the page was read, None otherwise.
+    """
+    ret = None
+    props = {
+        'empty': XPATH.BUILDING_PAGE_EMPTY_TITLE,
+        'title': XPATH.BUILDING_MENU_TITLE,
+        'maxLevel': XPATH.BUILDING_ERR_MAX_LVL,
+        'busyWorkers': XPATH.BUILDING_ERR_BUSY_WORKERS,
+        'levelUpWarehouse': [XPATH.LEVEL_UP_ERR_WRAPPER, XPATH.BUILDING_ERR_WH],
+        'levelUpGranary': [XPATH.LEVEL_UP_ERR_WRAPPER, XPATH.BUILDING_ERR_GR],
+        'levelUpResources': [XPATH.BUILDING_ERR_RESOURCES, XPATH.INSIDE_TIMER],
+        'levelUpCosts': XPATH.LEVEL_UP_COSTS,
+    }
+    if bdType is not None:
+        constructName = XPATH.CONSTRUCT_BUILDING_NAME % get_building_info(bdType).name
+        props.update({
+            'constructWarehouse': [constructName, XPATH.BUILDING_ERR_WH],
+            'constructGranary': [constructName, XPATH.BUILDING_ERR_GR],
+            'constructResources': [constructName, XPATH.BUILDING_ERR_RESOURCES, XPATH.INSIDE_TIMER],
+            'constructCosts': [constructName, XPATH.CONSTRUCT_COSTS],
+        })
+    page = sws.getSnapshot(props)
+    if page is not None:
+        constructingMode = page['empty'] is not None
+        mode = 'construct' if constructingMode else 'levelUp'
+        level, costsLevel, targetLevel = None, None, None
+        if constructingMode:
+            level, costsLevel = 0, 1
+            if bdType is None:
+                bdType = BuildingType.EmptyPlace
+        else:
+            bdType, level = parse_building_title(page['title'])
+            costsLevel = parse_costs_level(page['levelUpCosts']) if page.get('levelUpCosts') else None
+        # Costs of a level up are for the level they name, later than level + 1 while upgrades are queued
+        if costsLevel is not None:
+            targetLevel = costsLevel
+        elif level is not None:
+            targetLevel = level + 1
+        storageType = None
+        if page.get(mode + 'Warehouse') is not None:
+            storageType = BuildingType.Warehouse
+        elif page.get(mode + 'Granary') is not None:
+            storageType = BuildingType.Granary
+        resourcesTimer = None
+        if page.get(mode + 'Resources'):
+            resourcesTimer = time_to_seconds(page[mode + 'Resources'])
+        costs = parse_costs(page.get(mode + 'Costs')) if page.get(mode + 'Costs') else None
+        if costs and bdType is not None and costsLevel is not None:
+            learn_costs(bdType, page[mode + 'Costs'], costsLevel)
+        # Same priority as the sequential checks
+        error = BuildingError.OK
+        if not constructingMode and page['maxLevel'] is not None:
+            error = BuildingError.MAX_LEVEL_ALREADY
+        elif storageType is not None:
+            error = BuildingError.STORAGE
+        elif resourcesTimer is not None:
+            error = BuildingError.RESOURCES
+        elif page['busyWorkers'] is not None:
+            error = BuildingError.BUSY_WORKERS
+        elif bdType is None:
+            error = BuildingError.FATAL_ERROR
+        ret = BuildVerdict(error, bdType, level, targetLevel, constructingMode, storageType, resourcesTimer, costs,
+            costs.time if costs else None)
+    else:
+        logger.error('In evaluate_build_page: Failed to read building page')
+    return ret
+
+
 def get_construction_site(sws: SWS, bdType: BuildingType):
     """
     Finds a suitable construction site for building.
@@ -116,6 +337,7 @@ def get_time_to_build(sws: SWS, bdType: BuildingType, constructingMode: bool = F
             time_left = time_to_seconds(costs.split('|')[-1])
         except (AttributeError, IndexError):
             logger.error('In get_time_to_build: Failed to get construct time from costs')
+        learn_costs(bdType, costs, 1)
     else:
         propList = [XPATH.LEVEL_UP_COSTS]
         costs = sws.getElementAttribute(propList, Attr.TEXT)
@@ -123,10 +345,34 @@ def get_time_to_build(sws: SWS, bdType: BuildingType, constructingMode: bool = F
             time_left = time_to_seconds(costs.split('|')[-1].split()[0])
         except (AttributeError, IndexError):
             logger.error('In get_time_to_build: Failed to get level up time from costs')
+        learn_costs(bdType, costs)
     return time_left
 
 
-def press_upgrade_button(sws: SWS, bdType: BuildingType, waitToFinish: bool = False):
+def learn_costs(bdType: BuildingType, costsText: str, level: int = None):
+    """
+    Records costs displayed in game in the learned cost table.
+
+    Parameters:
+        - bdType (BuildingType): Denotes a type of building.
+        - costsText (str): Text of the costs region.
+        - level (Int): Level the costs are for, extracted from costsText if None.
+
+    Returns:
+        - True if operation is successful, False otherwise.
+    """
+    status = False
+    if costsText:
+        if level is None:
+            level = parse_costs_level(costsText)
+        costs = parse_costs(costsText)
+        if level and costs:
+            status = record_building_costs(bdType, level, costs)
+    return status
+
+
+def press_upgrade_button(sws: SWS, bdType: BuildingType, waitToFinish: bool = False, verdict: BuildVerdict = None,
+            result: BuildResult = None):
     """
     Press level up building / construct building.
 
@@ -134,80 +380,291 @@ def press_upgrade_button(sws: SWS, bdType: BuildingType, waitToFinish: bool = Fa
         - sws (SWS): Used to interact with the webpage.
         - bdType (BuildingType): Denotes a type of building.
         - waitToFinish (bool): If True, will wait for building to finish construct, False by default.
+        - verdict (BuildVerdict): Pre-flight verdict of the current page, avoids reading the page again.
+        - result (BuildResult): Records click and wait phases and the finish time, None by default.
 
     Returns:
         - True if operation is successful, False otherwise.
     """
     status = False
-    constructingMode = False
-    if sws.isVisible(XPATH.BUILDING_PAGE_EMPTY_TITLE):
-        constructingMode = True
-        propList = [XPATH.CONSTRUCT_BUILDING_NAME % get_building_info(bdType).name, XPATH.CONSTRUCT_BUILDING_ID]
-    else:
-        propList = [XPATH.LEVEL_UP_BUILDING_BTN]
-    initialURL = sws.getCurrentUrl()
-    # Extract time to build
-    time_to_build = get_time_to_build(sws, bdType, constructingMode)
-    if time_to_build is not None:
-        time_to_build = max(MIN_WAIT, time_to_build)
-        if sws.clickElement(propList, refresh=True):
-            if waitToFinish:
+    with __measure(result, BuildPhase.CLICK):
+        if verdict is not None:
+            constructingMode = verdict.constructingMode
+        else:
+            constructingMode = sws.isVisible(XPATH.BUILDING_PAGE_EMPTY_TITLE)
+        if constructingMode:
+            propList = [XPATH.CONSTRUCT_BUILDING_NAME % get_building_info(bdType).name, XPATH.CONSTRUCT_BUILDING_ID]
+        else:
+            propList = [XPATH.LEVEL_UP_BUILDING_BTN]
+        initialURL = sws.getCurrentUrl()
+        # Extract time to build
+        if verdict is not None and verdict.timeToBuild is not None:
+            time_to_build = verdict.timeToBuild
+        else:
+            time_to_build = get_time_to_build(sws, bdType, constructingMode)
+        clicked = False
+        if time_to_build is not None:
+            time_to_build = max(MIN_WAIT, time_to_build)
+            clicked = sws.clickElement(propList, refresh=True)
+            if clicked and result is not None:
+                result.finishTime = time.time() + time_to_build
+        else:
+            logger.error('In press_upgrade_button: Failed to get time to build')
+    if clicked:
+        if waitToFinish:
+            with __measure(result, BuildPhase.WAIT):
                 if sws.get(initialURL):
                     logger.info('In press_upgrade_button: Sleep for %d seconds' % time_to_build)
                     time.sleep(time_to_build)
                 else:
                     logger.error('In press_upgrade_button: Failed to enter building in order to wait to finish')
-            status = True
-        else:
-            logger.error('In press_upgrade_button: Failed to press Upgrade')
-    else:
-        logger.error('In press_upgrade_button: Failed to get time to build')
+        status = True
+    elif time_to_build is not None:
+        logger.error('In press_upgrade_button: Failed to press Upgrade')
     return status
 
 
-def select_and_demolish_building(sws: SWS, index: int):
+def read_demolition_timer(sws: SWS):
     """
-    On main building`s view selects and demolishes one building.
+    Reads for how long the current demolition will run, on main building`s view.
 
     Parameters:
         - sws (SWS): Used to interact with the webpage.
-        - index (Int): Denotes index of building site.
 
     Returns:
-        - True if operation is successful, False otherwise.    
+        - Int with seconds left, 0 if no demolition is running. A jammed timer only gives the time until it should
+        be read again.
     """
-    status = False
+    ret = 0
     # Zravian event jam text
-    ZRAVIAN_EJ_TEXT = '00?'
+    ZRAVIAN_EJ_TEXT = '?'
+    demolitionTimer = sws.getElementAttribute([XPATH.FINISH_DIALOG, XPATH.INSIDE_TIMER], Attr.TEXT)
+    if demolitionTimer:
+        if ZRAVIAN_EJ_TEXT in demolitionTimer:
+            # Timer is stuck, the demolition is still running
+            demolitionTimer = demolitionTimer.replace(ZRAVIAN_EJ_TEXT, '')
+        ret = max(MIN_WAIT, time_to_seconds(demolitionTimer) or 0)
+    return ret
+
+
+def start_demolition(sws: SWS, index: int):
+    """
+    On main building`s view selects one building and starts its demolition.
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+        - index (Int): Denotes index of building site.
+
+    Returns:
+        - Int with seconds until demolition ends if operation is successful, None otherwise.
+    """
+    ret = None
     # 40 is not a valid choice, because Wall can not be demolished
-    if index >= FIRST_BUILDING_SITE_VILLAGE and index < LAST_BUILDING_SITE_VILLAGE:      
+    if index >= FIRST_BUILDING_SITE_VILLAGE and index < LAST_BUILDING_SITE_VILLAGE:
         if is_screen_menu_of(sws, BuildingType.MainBuilding):
             if sws.clickElement(XPATH.DEMOLITION_BUILDING_OPTION % index):
                 if sws.clickElement(XPATH.DEMOLITION_BTN, refresh=True):
-                    propList = [XPATH.FINISH_DIALOG, XPATH.INSIDE_TIMER]
-                    demolitionTimer = sws.getElementAttribute(propList, Attr.TEXT)
-                    # Wait for demolishing to end
-                    while demolitionTimer:
-                        demolitionTimer = sws.getElementAttribute(propList, Attr.TEXT)
-                        if demolitionTimer:
-                            if ZRAVIAN_EJ_TEXT in demolitionTimer:
-                                demolitionTimer = ''.join([char for char in demolitionTimer if char != '?'])
-                                sws.refresh()
-                            dmTime = max(MIN_WAIT, time_to_seconds(demolitionTimer))
-                            time.sleep(dmTime)
-                    logger.success(f'In select_and_demolish_building: Successfully demolished {index}')
-                    status = True
+                    ret = read_demolition_timer(sws)
+                    logger.info(f'In start_demolition: Demolition of {index} ends in {ret} seconds')
                 else:
-                    logger.error('In select_and_demolish_building: Failed to press demolish button')
+                    logger.error('In start_demolition: Failed to press demolish button')
             else:
-                logger.error('In select_and_demolish_building: Failed to select building to demolish')
+                logger.error('In start_demolition: Failed to select building to demolish')
         else:
-            logger.error('In select_and_demolish_building: is_screen_building_site() failed')
+            logger.error('In start_demolition: is_screen_menu_of() failed')
     else:
-        logger.error(f'In select_and_demolish_building: Invalid index={index}')
+        logger.error(f'In start_demolition: Invalid index={index}')
+    return ret
+
+
+def select_and_demolish_building(sws: SWS, index: int):
+    """
+    On main building`s view selects and demolishes one building, waiting for the demolition to end.
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+        - index (Int): Denotes index of building site.
+
+    Returns:
+        - True if operation is successful, False otherwise.
+    """
+    status = False
+    queue = DemolitionQueue(sws)
+    queue.add(index)
+    if queue.run():
+        logger.success(f'In select_and_demolish_building: Successfully demolished {index}')
+        status = True
+    else:
+        logger.error('In select_and_demolish_building: Demolition failed')
     return status
 
 
+class DemolitionQueue:
+    """
+    Schedules demolitions so that each one starts as soon as the Main Building is free.
+
+    The queue sleeps until the timer of each demolition runs out instead of polling the page, then reads the timer
+    once more and completes the demolition only if no timer is left. A jammed timer is read again after a growing
+    delay. run(blocking=False) only handles the due events, so the caller may do other work meanwhile.
+    """
+    def __init__(self, sws: SWS, onComplete=None):
+        """
+        Parameters:
+            - sws (SWS): Used to interact with the webpage.
+            - onComplete (Function): Called with the site index after each demolition ends, None by default.
+        """
+        self.sws = sws
+        self.onComplete = onComplete
+        self.pending = deque()
+        self.completed = []
+        self.failed = []
+        self.running = None
+        self.mainBuildingURL = None
+        # Wait before the next read of a jammed timer
+        self.jamWait = MIN_WAIT
+        self.scheduler = sched.scheduler(time.time, time.sleep)
+
+    def add(self, pos):
+        """
+        Queues building sites for demolition.
+
+        Parameters:
+            - pos (Int or List of Int): Denotes index(indexes) of building site(s).
+        """
+        self.pending.extend(pos if isinstance(pos, list) else [pos])
+        if self.running is None and self.scheduler.empty():
+            self.scheduler.enter(0, 1, self.__start_next)
+
+    def is_done(self):
+        """
+        Returns:
+            - True if no demolition is running or waiting, False otherwise.
+        """
+        return self.running is None and not self.pending and self.scheduler.empty()
+
+    def next_event_time(self):
+        """
+        Returns:
+            - Timestamp of the next scheduled event, None if nothing is scheduled.
+        """
+        queue = self.scheduler.queue
+        return queue[0].time if queue else None
+
+    def run(self, blocking: bool = True):
+        """
+        Runs scheduled events.
+
+        Parameters:
+            - blocking (bool): If True sleeps until all demolitions ended, otherwise runs only the due events.
+
+        Returns:
+            - True if all demolitions ended successfully, False otherwise (failed or still running).
+        """
+        self.scheduler.run(blocking)
+        return self.is_done() and not self.failed
+
+    def __enter_main_building(self):
+        """
+        Enters the Main Building, by URL once its location is known.
+
+        Returns:
+            - True if operation is successful, False otherwise.
+        """
+        status = False
+        if self.mainBuildingURL:
+            status = self.sws.get(self.mainBuildingURL) and is_screen_menu_of(self.sws, BuildingType.MainBuilding)
+        elif enter_building(self.sws, BuildingType.MainBuilding):
+            self.mainBuildingURL = self.sws.getCurrentUrl()
+            status = True
+        return status
+
+    def __wait_for(self, busyFor: int):
+        """
+        Delay before reading a timer again, growing while the timer stays jammed.
+
+        Parameters:
+            - busyFor (Int): Seconds left, as read_demolition_timer() returns.
+
+        Returns:
+            - Int with seconds to wait.
+        """
+        ret = busyFor
+        if busyFor <= MIN_WAIT:
+            # Timer is jammed or about to end
+            ret = self.jamWait
+            self.jamWait = min(self.jamWait * 2, MAX_JAM_WAIT)
+        else:
+            self.jamWait = MIN_WAIT
+        return ret
+
+    def __start_next(self):
+        """Starts the next demolition, or reschedules itself if the Main Building is busy."""
+        if self.pending:
+            if self.__enter_main_building():
+                busyFor = read_demolition_timer(self.sws)
+                if busyFor:
+                    logger.info(f'In DemolitionQueue: Main Building busy for {busyFor} seconds')
+                    self.scheduler.enter(self.__wait_for(busyFor), 1, self.__start_next)
+                else:
+                    self.jamWait = MIN_WAIT
+                    index = self.pending.popleft()
+                    duration = start_demolition(self.sws, index)
+                    if duration is not None:
+                        self.running = index
+                        self.scheduler.enter(duration, 1, self.__check, argument=(index,))
+                    else:
+                        self.__fail(index)
+            else:
+                logger.error('In DemolitionQueue: Failed to enter Main Building')
+                self.__fail(self.pending.popleft())
+
+    def __check(self, index: int):
+        """
+        Reads the timer of a running demolition, completes it once no timer is left.
+
+        Parameters:
+            - index (Int): Denotes index of building site.
+        """
+        if self.__enter_main_building():
+            busyFor = read_demolition_timer(self.sws)
+            if busyFor:
+                logger.info(f'In DemolitionQueue: Demolition of {index} still running for {busyFor} seconds')
+                self.scheduler.enter(self.__wait_for(busyFor), 1, self.__check, argument=(index,))
+            else:
+                self.jamWait = MIN_WAIT
+                self.__complete(index)
+        else:
+            logger.error('In DemolitionQueue: Failed to enter Main Building')
+            self.running = None
+            self.__fail(index)
+
+    def __complete(self, index: int):
+        """
+        Marks a demolition as ended and starts the next one.
+
+        Parameters:
+            - index (Int): Denotes index of building site.
+        """
+        self.running = None
+        self.completed.append(index)
+        logger.success(f'In DemolitionQueue: Demolished {index}')
+        if self.onComplete:
+            self.onComplete(index)
+        self.__start_next()
+
+    def __fail(self, index: int):
+        """
+        Marks a demolition as failed and drops the remaining ones.
+
+        Parameters:
+            - index (Int): Denotes index of building site.
+        """
+        self.failed.append(index)
+        self.failed.extend(self.pending)
+        self.pending.clear()
+        logger.error(f'In DemolitionQueue: Failed to demolish {index}')
+
+
 # Checks
 def check_requirements(sws: SWS, bdType: BuildingType, forced: bool = False):
     """
@@ -419,6 +876,62 @@ def check_below_max_level(sws: SWS, bdType: BuildingType):
     return status
 
 
+def build_on_current_page(sws: SWS, bdType: BuildingType, verdict: BuildVerdict, forced: bool = False,
+            waitToFinish: bool = False, result: BuildResult = None):
+    """
+    Constructs / levels up the building whose page is open, based on its pre-flight verdict.
+
+    When the verdict reports an inconvenience and forced is set, the sequential checks are used to resolve it.
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+        - bdType (BuildingType): Denotes a type of building.
+        - verdict (BuildVerdict): Pre-flight verdict of the current page.
+        - forced (bool): If True bypass any inconvenience, False by default.
+        - waitToFinish (bool): If True, will wait for building to finish construct, False by default.
+        - result (BuildResult): Records phases and the finish time, None by default.
+
+    Returns:
+        - BuildingError.
+    """
+    status = BuildingError.FATAL_ERROR
+    # Inconveniences that may be solved by forcing
+    SOLVABLE = [BuildingError.STORAGE, BuildingError.RESOURCES, BuildingError.BUSY_WORKERS]
+    if verdict is None:
+        logger.error('In build_on_current_page: Missing pre-flight verdict')
+    elif verdict.error is BuildingError.OK:
+        if press_upgrade_button(sws, bdType, waitToFinish, verdict, result):
+            logger.success('Successfully upgraded %s' % get_building_info(bdType).name)
+            status = BuildingError.OK
+        else:
+            logger.error('In build_on_current_page: press_upgrade_button() failed')
+    elif forced and verdict.error in SOLVABLE:
+        with __measure(result, BuildPhase.CHECKS):
+            checksPassed = check_storage(sws, bdType, BuildingType.Warehouse, forced) and \
+                check_storage(sws, bdType, BuildingType.Granary, forced)
+            storagePassed = checksPassed
+            checksPassed = checksPassed and check_resources(sws, bdType, forced)
+            resourcesPassed = checksPassed
+            checksPassed = checksPassed and check_busy_workers(sws, bdType, forced)
+        if storagePassed:
+            if resourcesPassed:
+                if checksPassed:
+                    if press_upgrade_button(sws, bdType, waitToFinish, result=result):
+                        logger.success('Successfully upgraded %s' % get_building_info(bdType).name)
+                        status = BuildingError.OK
+                    else:
+                        logger.error('In build_on_current_page: press_upgrade_button() failed')
+                else:
+                    status = BuildingError.BUSY_WORKERS
+            else:
+                status = BuildingError.RESOURCES
+        else:
+            status = BuildingError.STORAGE
+    else:
+        status = verdict.error
+    return status
+
+
 # Main methods
 def construct_building(sws: SWS, bdType: BuildingType, forced: bool = False, waitToFinish: bool = False):
     """
@@ -431,32 +944,25 @@ def construct_building(sws: SWS, bdType: BuildingType, forced: bool = False, wai
         - waitToFinish (bool): If True, will wait for building to finish construct, False by default.
 
     Returns:
-        - BuildinError.
+        - BuildResult.
     """
+    result = BuildResult(sws)
     status = BuildingError.FATAL_ERROR
     logger.info(f'Attempting to construct {get_building_info(bdType).name}')
     if bdType in RESOURCE_FIELDS:
         status = BuildingError.OK  # Resource fields are already constructed
     else:
-        if check_requirements(sws, bdType, forced):
-            constructSite = get_construction_site(sws, bdType)
+        with result.phase(BuildPhase.SCAN):
+            requirementsStatus = check_requirements(sws, bdType, forced)
+            constructSite = get_construction_site(sws, bdType) if requirementsStatus else None
+            entered = constructSite and enter_building_site(sws, constructSite)
+        if requirementsStatus:
             if constructSite:
-                if enter_building_site(sws, constructSite):
-                    if check_storage(sws, bdType, BuildingType.Warehouse, forced) and \
-                            check_storage(sws, bdType, BuildingType.Granary, forced):
-                        if check_resources(sws, bdType, forced):
-                            if check_busy_workers(sws, bdType, forced):
-                                if press_upgrade_button(sws, bdType, waitToFinish):
-                                    logger.success('Successfully built %s' % get_building_info(bdType).name)
-                                    status = BuildingError.OK
-                                else:
-                                    logger.error('In construct_building: press_upgrade_button() failed')
-                            else:
-                                status = BuildingError.BUSY_WORKERS
-                        else:
-                            status = BuildingError.RESOURCES
-                    else:
-                        status = BuildingError.STORAGE
+                if entered:
+                    result.siteId, result.targetLevel = constructSite, 1
+                    with result.phase(BuildPhase.CHECKS):
+                        verdict = evaluate_build_page(sws, bdType)
+                    status = build_on_current_page(sws, bdType, verdict, forced, waitToFinish, result)
                 else:
                     logger.error('In construct_building: enter_building_site() failed')
             else:
@@ -469,7 +975,7 @@ def construct_building(sws: SWS, bdType: BuildingType, forced: bool = False, wai
         logger.error('In construct_building: move_to_village() failed')
     if status is not BuildingError.OK:
         logger.info(f'In construct_building: Failed to construct {get_building_info(bdType).name}: {status.value}')
-    return status
+    return result.finish(status)
 
 
 def level_up_building_at(sws: SWS, index: int, forced: bool = False, waitToFinish: bool = False):
@@ -483,36 +989,27 @@ def level_up_building_at(sws: SWS, index: int, forced: bool = False, waitToFinis
         - waitToFinish (bool): If True, will wait for building to finish construct, False by default.
 
     Returns:
-        - BuildinError.
+        - BuildResult.
     """
+    result = BuildResult(sws)
+    result.siteId = index
     status = BuildingError.FATAL_ERROR
-    if enter_building_site(sws, index):
-        bdType = identify_building_type_from_menu(sws)
-        if bdType:
+    bdType = None
+    with result.phase(BuildPhase.SCAN):
+        entered = enter_building_site(sws, index)
+    if entered:
+        with result.phase(BuildPhase.CHECKS):
+            verdict = evaluate_build_page(sws)
+        bdType = verdict.bdType if verdict else None
+        if bdType is not None:
             if bdType is not BuildingType.EmptyPlace:
                 logger.info(f'Attempting to level up {get_building_info(bdType).name} at {index}')
-                if check_below_max_level(sws, bdType):
-                    if check_storage(sws, bdType, BuildingType.Warehouse, forced) and \
-                            check_storage(sws, bdType, BuildingType.Granary, forced):
-                        if check_resources(sws, bdType, forced):
-                            if check_busy_workers(sws, bdType, forced):
-                                if press_upgrade_button(sws, bdType, waitToFinish):
-                                    logger.success('Successfully leveled up %s' % get_building_info(bdType).name)
-                                    status = BuildingError.OK
-                                else:
-                                    logger.error('In level_up_building_at: press_upgrade_button() failed')
-                            else:
-                                status = BuildingError.BUSY_WORKERS
-                        else:
-                            status = BuildingError.RESOURCES
-                    else:
-                        status = BuildingError.STORAGE
-                else:
-                    status = BuildingError.MAX_LEVEL_ALREADY
+                result.targetLevel = verdict.targetLevel
+                status = build_on_current_page(sws, bdType, verdict, forced, waitToFinish, result)
             else:
                 status = BuildingError.CANT_LEVEL_EMPTY_PLACE
         else:
-            logger.error('In level_up_building_at: identify_building_type_from_menu() failed')
+            logger.error('In level_up_building_at: evaluate_build_page() failed')
     else:
         logger.error('In level_up_building_at: enter_building_site() failed')
     # Return to Village screen
@@ -520,8 +1017,8 @@ def level_up_building_at(sws: SWS, index: int, forced: bool = False, waitToFinis
         status = BuildingError.FATAL_ERROR
         logger.error('In level_up_building_at: move_to_village() failed')
     if status is not BuildingError.OK:
-        logger.info(f'In level_up_building_at: Failed to upgrade {get_building_info(bdType).name}: {status.value}')
-    return status
+        logger.info(f'In level_up_building_at: Failed to upgrade building at {index}: {status.value}')
+    return result.finish(status)
 
 
 def demolish_building_at(sws: SWS, pos):
@@ -538,20 +1035,16 @@ def demolish_building_at(sws: SWS, pos):
     status = BuildingError.FATAL_ERROR
     # Main Building level required to demolish
     DEMOLISH_LVL = 10
-    if isinstance(pos, list):
-        wrapper = pos
-    else:
-        wrapper = [pos]
     mb = find_building(sws, BuildingType.MainBuilding)
     if mb and mb.level >= DEMOLISH_LVL:
         if enter_building(sws, BuildingType.MainBuilding):
             if sws.isVisible(XPATH.DEMOLITION_BTN):
-                for index in wrapper:
-                    if not select_and_demolish_building(sws, index):
-                        logger.error(f'In demolish_building: select_and_demolish_building() failed')
-                        break
+                queue = DemolitionQueue(sws)
+                queue.add(pos)
+                if queue.run():
+                    status = BuildingError.OK
                 else:
-                    status = True
+                    logger.error(f'In demolish_building: Failed to demolish {queue.failed}')
             else:
                 logger.error('In demolish_building: Failed to find demolition button')
         else:
@@ -563,5 +1056,232 @@ def demolish_building_at(sws: SWS, pos):
         status = BuildingError.FATAL_ERROR
         logger.error('In demolish_building: move_to_village() failed')
     if status is not BuildingError.OK:
-        logger.info(f'In demolish_building: Failed to demolish {index}: {status.value}')
+        logger.info(f'In demolish_building: Failed to demolish {pos}: {status.value}')
+    return status
+
+
+# Bulk methods
+# Result of a bulk operation target
+BulkResult = namedtuple(typename='BulkResult', field_names=['target', 'level', 'error', 'duration'])
+
+
+def __update_village(village: dict, bdType: BuildingType, building):
+    """
+    Updates a village model after a building site changed.
+
+    Parameters:
+        - village (Dictionary): Village model, as scan_village() returns.
+        - bdType (BuildingType): Type of building now on site.
+        - building (Building): Site with its new level.
+    """
+    for lst in village.values():
+        lst[:] = [bd for bd in lst if bd.siteId != building.siteId]
+    village.setdefault(bdType, []).append(building)
+    village[bdType].sort(key=lambda e: (int(e[1]), -int(e[0])))
+
+
+def __rescan_village(sws: SWS, village: dict):
+    """
+    Replaces the village model with a fresh scan, used after forced operations changed other sites.
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+        - village (Dictionary): Village model, as scan_village() returns.
+
+    Returns:
+        - True if operation is successful, False otherwise.
+    """
+    status = False
+    newVillage = scan_village(sws)
+    if newVillage is not None:
+        village.clear()
+        village.update(newVillage)
+        status = True
+    else:
+        logger.error('In __rescan_village: scan_village() failed')
     return status
+
+
+def __level_up_site(sws: SWS, village: dict, index: int, level: int, forced: bool, waitToFinish: bool):
+    """
+    Levels up a building site up to level, using and updating the village model.
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+        - village (Dictionary): Village model, as scan_village() returns.
+        - index (Int): Denotes index of building site.
+        - level (Int): Target level.
+        - forced (bool): If True bypass any inconvenience.
+        - waitToFinish (bool): If True, will wait for building to finish construct.
+
+    Returns:
+        - BuildingError.
+    """
+    status = BuildingError.OK
+    bdType, building = next(((bdType, bd) for bdType, lst in village.items() for bd in lst if bd.siteId == index),
+        (None, None))
+    if building is None:
+        status = BuildingError.FATAL_ERROR
+        logger.error(f'In __level_up_site: Site {index} not found in village')
+    elif bdType is BuildingType.EmptyPlace:
+        status = BuildingError.CANT_LEVEL_EMPTY_PLACE
+    elif building.level < level and building.level >= get_building_info(bdType).maxLevel:
+        status = BuildingError.MAX_LEVEL_ALREADY
+    while status is BuildingError.OK and building.level < level:
+        if enter_building_site(sws, index, direct=True):
+            verdict = evaluate_build_page(sws)
+            if verdict is not None and verdict.bdType is not None:
+                status = build_on_current_page(sws, verdict.bdType, verdict, forced, waitToFinish)
+                if forced and verdict.error is not BuildingError.OK and not __rescan_village(sws, village):
+                    status = BuildingError.FATAL_ERROR
+                if status is BuildingError.OK:
+                    # Upgrades already queued on the site are counted by the costs level
+                    building = Building(index, max(verdict.targetLevel or 0, building.level + 1))
+                    __update_village(village, verdict.bdType, building)
+            else:
+                status = BuildingError.FATAL_ERROR
+                logger.error('In __level_up_site: evaluate_build_page() failed')
+        else:
+            status = BuildingError.FATAL_ERROR
+            logger.error('In __level_up_site: enter_building_site() failed')
+    return status
+
+
+def __requirements_fulfilled(village: dict, bdType: BuildingType):
+    """
+    Checks the requirements of a building against the village model.
+
+    Parameters:
+        - village (Dictionary): Village model, as scan_village() returns.
+        - bdType (BuildingType): Denotes a type of building.
+
+    Returns:
+        - True if requirements are fulfilled, False otherwise.
+    """
+    return all(village.get(reqBd) and village[reqBd][-1].level >= reqLevel \
+        for reqBd, reqLevel in get_building_info(bdType).requirements)
+
+
+def __construct_on_model(sws: SWS, village: dict, bdType: BuildingType, forced: bool, waitToFinish: bool):
+    """
+    Constructs a building, using and updating the village model.
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+        - village (Dictionary): Village model, as scan_village() returns.
+        - bdType (BuildingType): Denotes a type of building.
+        - forced (bool): If True bypass any inconvenience.
+        - waitToFinish (bool): If True, will wait for building to finish construct.
+
+    Returns:
+        - (BuildingError, Int): Status and the site id of the new building.
+    """
+    status, site = BuildingError.FATAL_ERROR, None
+    if not __requirements_fulfilled(village, bdType):
+        if forced:
+            # Resolving requirements may construct several buildings, so rely on the complete procedure
+            status = construct_building(sws, bdType, forced, waitToFinish).error
+            if status is BuildingError.OK and __rescan_village(sws, village):
+                site = village[bdType][-1].siteId if village.get(bdType) else None
+        else:
+            status = BuildingError.REQUIREMENTS
+    else:
+        if bdType is BuildingType.Wall or bdType is BuildingType.RallyPoint:
+            sites = village.get(bdType)
+        else:
+            sites = village.get(BuildingType.EmptyPlace)
+        if sites:
+            site = sites[-1].siteId
+            if enter_building_site(sws, site, direct=True):
+                verdict = evaluate_build_page(sws, bdType)
+                status = build_on_current_page(sws, bdType, verdict, forced, waitToFinish)
+                if forced and verdict and verdict.error is not BuildingError.OK and \
+                        not __rescan_village(sws, village):
+                    status = BuildingError.FATAL_ERROR
+                if status is BuildingError.OK:
+                    __update_village(village, bdType, Building(site, 1))
+            else:
+                logger.error('In __construct_on_model: enter_building_site() failed')
+        else:
+            status = BuildingError.FULL_VILLAGE
+    return status, site
+
+
+def level_up_many(sws: SWS, targets: list, forced: bool = False, waitToFinish: bool = False):
+    """
+    Levels up several buildings sharing one village model and without returning to Village between steps.
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+        - targets ([(Int or BuildingType, Int)]): Pairs of building site (or type, meaning its highest level
+        building) and target level.
+        - forced (bool): If True bypass any inconvenience, False by default.
+        - waitToFinish (bool): If True, will wait for building to finish construct, False by default.
+
+    Returns:
+        - [BulkResult], one for each target.
+    """
+    results = []
+    village = scan_village(sws)
+    for target, level in targets:
+        startTime = time.time()
+        status = BuildingError.FATAL_ERROR
+        if village is None:
+            logger.error('In level_up_many: scan_village() failed')
+        elif isinstance(target, BuildingType):
+            if village.get(target) and village[target][-1].level > 0:
+                status = __level_up_site(sws, village, village[target][-1].siteId, level, forced, waitToFinish)
+            else:
+                status = BuildingError.CANT_LEVEL_EMPTY_PLACE
+                logger.warning(f'In level_up_many: {get_building_info(target).name} not found')
+        else:
+            status = __level_up_site(sws, village, target, level, forced, waitToFinish)
+        if status is not BuildingError.OK:
+            logger.info(f'In level_up_many: Failed to level up {target} to {level}: {status.value}')
+        results.append(BulkResult(target, level, status, time.time() - startTime))
+    # Return to Village screen
+    if not move_to_village(sws):
+        logger.error('In level_up_many: move_to_village() failed')
+    return results
+
+
+def construct_many(sws: SWS, targets: list, forced: bool = False, waitToFinish: bool = False):
+    """
+    Constructs several buildings sharing one village model and without returning to Village between steps.
+
+    Existing buildings are leveled up instead, unless another one may be constructed.
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+        - targets ([(BuildingType, Int)]): Pairs of building type and target level.
+        - forced (bool): If True bypass any inconvenience, False by default.
+        - waitToFinish (bool): If True, will wait for building to finish construct, False by default.
+
+    Returns:
+        - [BulkResult], one for each target.
+    """
+    results = []
+    village = scan_village(sws)
+    for bdType, level in targets:
+        startTime = time.time()
+        status = BuildingError.FATAL_ERROR
+        if village is None:
+            logger.error('In construct_many: scan_village() failed')
+        else:
+            existing = village.get(bdType)
+            info = get_building_info(bdType)
+            if bdType in RESOURCE_FIELDS or existing and existing[-1].level > 0 and \
+                    (not info.duplicates or existing[-1].level < info.maxLevel):
+                site = existing[-1].siteId
+                status = BuildingError.OK
+            else:
+                status, site = __construct_on_model(sws, village, bdType, forced, waitToFinish)
+            if status is BuildingError.OK and site is not None:
+                status = __level_up_site(sws, village, site, level, forced, waitToFinish)
+        if status is not BuildingError.OK:
+            logger.info(f'In construct_many: Failed to construct {bdType} to {level}: {status.value}')
+        results.append(BulkResult(bdType, level, status, time.time() - startTime))
+    # Return to Village screen
+    if not move_to_village(sws):
+        logger.error('In construct_many: move_to_village() failed')
+    return results
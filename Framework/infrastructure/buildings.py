@@ -1,6 +1,7 @@
 import re
 import Framework.screen.Navigation as NAV
-from Framework.utility.Constants import Building, BuildingType, get_XPATH, get_building_info, get_projectLogger
+from Framework.utility.Constants import Building, BuildingType, get_XPATH, get_building_info, get_building_titles, \
+    get_projectLogger
 from Framework.utility.SeleniumWebScraper import SWS, Attr
 
 
@@ -90,34 +91,96 @@ def get_buildings(sws: SWS, bdType: BuildingType):
     return ret
 
 
-def get_village_data(sws: SWS):
+def __scan_screen(sws: SWS, bdTypes: list):
     """
-    Generates a dictionary linking each building to a list of pairs (location, level).
+    Reads all building sites of the current screen at once.
 
     Parameters:
         - sws (SWS): Used to interact with the webpage.
+        - bdTypes ([BuildingType]): Building types that may appear on the screen.
 
     Returns:
-        - Dictionary if operation is successful, None otherwise.
+        - Dictionary linking each BuildingType to [Building] if operation is successful, None otherwise.
     """
-    ret = None
-    buildingsDict = {}
-    # First get all resource fields
-    for bdType in RESOURCE_FIELDS:
-        buildingsDict[bdType] = get_buildings(sws, bdType)
-        if buildingsDict[bdType] is None:
+    ret = {bdType: [] for bdType in bdTypes}
+    # Some buildings contain phrase 'Build a' in their name
+    NOT_CONSTRUCTED = 'Build a'
+    bdTypes = set(bdTypes)
+    names = [(name, bdType) for name, bdType in get_building_titles() if bdType in bdTypes]
+    sitesAttr = sws.getElementsAttributes(XPATH.BUILDING_SITE_ALL, [Attr.HREF, Attr.ALT])
+    for (href, alt) in sitesAttr:
+        bdType = next((bdType for name, bdType in names if alt and name in alt), None)
+        if bdType is None:
+            continue
+        try:
+            elemId = int(re.search('id=([0-9]+)', href).group(1))
+        except (AttributeError, ValueError) as err:
+            logger.error(f'In __scan_screen: {Attr.HREF.value} regex failed to return value: {err}')
+            ret = None
             break
-    else:
-        # Get all buildings
-        for bdType in BuildingType:
-            if bdType in RESOURCE_FIELDS:
-                continue
-            buildingsDict[bdType] = get_buildings(sws, bdType)
-            if bdType == BuildingType.RallyPoint or bdType == BuildingType.Wall:
-                if buildingsDict[bdType][0].level == 0:
-                    buildingsDict[bdType] = []
-            if buildingsDict[bdType] is None:
+        try:
+            elemLvl = int(re.search('[0-9]+', alt).group())
+        except (AttributeError, ValueError) as err:
+            if bdType == BuildingType.EmptyPlace or NOT_CONSTRUCTED in alt:
+                elemLvl = 0
+            else:
+                logger.error(f'In __scan_screen: {Attr.ALT.value} regex failed to return value: {err}')
+                ret = None
                 break
+        # Wall appears with multiple ids
+        if bdType is BuildingType.Wall and ret[bdType]:
+            continue
+        ret[bdType].append(Building(elemId, elemLvl))
+    if ret is not None:
+        for lst in ret.values():
+            # Sort ascending by building level and descending by siteId
+            lst.sort(key=lambda e: (int(e[1]), -int(e[0])))
+    return ret
+
+
+def scan_village(sws: SWS):
+    """
+    Builds a model of the village with one read of the Overview and one read of the Village screen.
+
+    Rally Point and Wall are listed with level 0 if they are not constructed.
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+
+    Returns:
+        - Dictionary linking each BuildingType to [Building] if operation is successful, None otherwise.
+    """
+    ret = None
+    fields, buildings = None, None
+    if NAV.move_to_overview(sws):
+        fields = __scan_screen(sws, RESOURCE_FIELDS)
+    else:
+        logger.error('In scan_village: move_to_overview() failed')
+    if fields is not None:
+        if NAV.move_to_village(sws):
+            buildings = __scan_screen(sws, [bdType for bdType in BuildingType if bdType not in RESOURCE_FIELDS])
         else:
-            ret = buildingsDict
+            logger.error('In scan_village: move_to_village() failed')
+    if fields is not None and buildings is not None:
+        ret = {**fields, **buildings}
+    else:
+        logger.error('In scan_village: Failed to read building sites')
+    return ret
+
+
+def get_village_data(sws: SWS):
+    """
+    Generates a dictionary linking each building to a list of pairs (location, level).
+
+    Parameters:
+        - sws (SWS): Used to interact with the webpage.
+
+    Returns:
+        - Dictionary if operation is successful, None otherwise.
+    """
+    ret = scan_village(sws)
+    if ret is not None:
+        for bdType in [BuildingType.RallyPoint, BuildingType.Wall]:
+            if ret[bdType] and ret[bdType][0].level == 0:
+                ret[bdType] = []
     return ret
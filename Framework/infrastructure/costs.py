@@ -0,0 +1,201 @@
+import json
+import re
+import threading
+from collections import namedtuple
+from Framework.utility.Constants import BUILDING_COSTS_PATH, BuildingType, Tribe, get_TROOPS, get_building_type_by_name, \
+    get_projectLogger, get_troop_type_by_name, get_troop_types_by_name, time_to_seconds
+from Framework.utility.FileLock import FileLock, atomic_write
+
+
+# Project constants
+logger = get_projectLogger()
+# Costs named tuple, time is expressed in seconds
+BuildingCosts = namedtuple(typename='BuildingCosts', field_names=['lumber', 'clay', 'iron', 'crop', 'upkeep', 'time'])
+# Pattern of costs as displayed in construct / level up menus: lumber|clay|iron|crop|upkeep|hh:mm:ss
+COSTS_PATTERN = r'([0-9]+)\|([0-9]+)\|([0-9]+)\|([0-9]+)\|([0-9]+)\|([0-9]+:[0-9]+:[0-9]+)'
+# Learned costs singleton
+COST_TABLE_Instance = None
+# Guards the learned cost table, updated by the worker threads of a process
+COST_TABLE_LOCK = threading.RLock()
+
+
+def parse_costs(text: str):
+    """
+    Extracts costs from the text of a costs region.
+
+    Parameters:
+        - text (str): Text containing costs in format lumber|clay|iron|crop|upkeep|hh:mm:ss.
+
+    Returns:
+        - BuildingCosts if operation was successful, None otherwise.
+    """
+    ret = None
+    costsRe = re.search(COSTS_PATTERN, text) if text else None
+    if costsRe:
+        seconds = time_to_seconds(costsRe.group(6))
+        if seconds is not None:
+            ret = BuildingCosts(*[int(value) for value in costsRe.groups()[:5]], seconds)
+    else:
+        logger.warning(f'In parse_costs: Costs do not respect pattern: {text}')
+    return ret
+
+
+def __read_cost_file():
+    """
+    Reads `building_costs.json`.
+
+    Returns:
+        - Dictionary linking BuildingType to a dictionary linking level to BuildingCosts, empty if unreadable.
+    """
+    ret = {}
+    jsonData = None
+    try:
+        with open(BUILDING_COSTS_PATH, 'r') as f:
+            jsonData = json.loads(f.read())
+    except IOError:
+        logger.warning(f'In __read_cost_file: Failed to open {BUILDING_COSTS_PATH}')
+    except (json.JSONDecodeError, ValueError):
+        logger.error(f'In __read_cost_file: Invalid json format in file {BUILDING_COSTS_PATH}')
+    for bdName, levels in (jsonData or {}).items():
+        try:
+            bdType = BuildingType[bdName]
+            ret[bdType] = {int(level): BuildingCosts(*costs) for level, costs in levels.items()}
+        except (KeyError, TypeError, ValueError):
+            logger.error(f'In __read_cost_file: Invalid entry for {bdName}')
+    return ret
+
+
+def get_cost_table():
+    """
+    Instantiates COST_TABLE_Instance if needed.
+
+    Returns:
+        - Dictionary linking BuildingType to a dictionary linking level to BuildingCosts, changed only while holding
+        COST_TABLE_LOCK.
+    """
+    global COST_TABLE_Instance
+    if COST_TABLE_Instance is None:
+        with COST_TABLE_LOCK:
+            if COST_TABLE_Instance is None:
+                COST_TABLE_Instance = __read_cost_file()
+    return COST_TABLE_Instance
+
+
+def write_cost_table():
+    """
+    Merges the learned costs into `building_costs.json`, costs learned by other processes are kept.
+
+    Returns:
+        - True if operation was successful, False otherwise.
+    """
+    ret = False
+    try:
+        # Other processes write the file too, the table is merged and replaced under the file lock
+        with FileLock(BUILDING_COSTS_PATH):
+            storedTable = __read_cost_file()
+            with COST_TABLE_LOCK:
+                costTable = get_cost_table()
+                for bdType, levels in storedTable.items():
+                    for level, costs in levels.items():
+                        costTable.setdefault(bdType, {}).setdefault(level, costs)
+                jsonData = {bdType.name: {str(level): list(costs) for level, costs in sorted(levels.items())} \
+                    for bdType, levels in sorted(costTable.items())}
+            atomic_write(BUILDING_COSTS_PATH, json.dumps(jsonData, indent=4, sort_keys=False))
+            ret = True
+    except OSError as err:
+        logger.error(f'In write_cost_table: Failed to write {BUILDING_COSTS_PATH}: {err}')
+    return ret
+
+
+def get_building_costs(bdType: BuildingType, level: int):
+    """
+    Gets the learned costs to construct / upgrade a building to level.
+
+    Parameters:
+        - bdType (BuildingType): Denotes a type of building.
+        - level (Int): Level the building is upgraded to.
+
+    Returns:
+        - BuildingCosts if costs were learned, None otherwise.
+    """
+    return get_cost_table().get(bdType, {}).get(level)
+
+
+def record_building_costs(bdType: BuildingType, level: int, costs: BuildingCosts):
+    """
+    Stores costs observed in game in the learned cost table.
+
+    Parameters:
+        - bdType (BuildingType): Denotes a type of building.
+        - level (Int): Level the building is upgraded to.
+        - costs (BuildingCosts): Observed costs.
+
+    Returns:
+        - True if operation was successful, False otherwise.
+    """
+    ret = False
+    with COST_TABLE_LOCK:
+        isKnown = get_building_costs(bdType, level) == costs
+        if not isKnown:
+            get_cost_table().setdefault(bdType, {})[level] = costs
+    if isKnown:
+        ret = True
+    else:
+        if write_cost_table():
+            ret = True
+        else:
+            logger.error('In record_building_costs: write_cost_table() failed')
+    return ret
+
+
+def lookup_costs(name: str, level: int = 1, tribe: Tribe = None):
+    """
+    Answers a costs lookup from local data, troops from `data.json` and buildings from the learned cost table.
+
+    Parameters:
+        - name (str): Troop or building name, as in the instructions.
+        - level (Int): Building level, 1 by default, ignored for troops.
+        - tribe (Tribe): Disambiguates troop names shared by several tribes, None by default.
+
+    Returns:
+        - List containing: Lumber, Clay, Iron, Crop and Upkeep if known, None otherwise.
+    """
+    ret = None
+    tpTypes = get_troop_types_by_name(name)
+    if tpTypes:
+        TROOPS = get_TROOPS()
+        if tribe is not None:
+            tpType = get_troop_type_by_name(name, tribe)
+            candidates = [TROOPS[tpType]] if tpType is not None else []
+        else:
+            candidates = [TROOPS[tpType] for tpType in tpTypes]
+        # Shared names may have different costs
+        if candidates and all(troop.costs == candidates[0].costs for troop in candidates):
+            ret = list(candidates[0].costs) + [candidates[0].upkeep]
+    else:
+        bdType = get_building_type_by_name(name)
+        costs = get_building_costs(bdType, level) if bdType is not None else None
+        if costs:
+            ret = list(costs[:5])
+    return ret
+
+
+def learn_instructions_costs(name: str, text: str, level: int = 1):
+    """
+    Stores building costs read from the instructions, troop costs are already known from `data.json`.
+
+    Parameters:
+        - name (str): Building name, as in the instructions.
+        - text (str): Costs in format lumber|clay|iron|crop|upkeep|hh:mm:ss.
+        - level (Int): Building level, 1 by default.
+
+    Returns:
+        - True if operation was successful, False otherwise.
+    """
+    ret = False
+    if not get_troop_types_by_name(name):
+        bdType = get_building_type_by_name(name)
+        costs = parse_costs(text) if bdType is not None else None
+        if costs:
+            ret = record_building_costs(bdType, level, costs)
+    return ret
@@ -0,0 +1,302 @@
+from collections import namedtuple
+import numpy as np
+from Framework.infrastructure.buildings import RESOURCE_FIELDS
+from Framework.infrastructure.costs import get_building_costs
+from Framework.utility.Constants import BuildingType, ResourceType, get_building_info, get_projectLogger
+
+
+# Project constants
+logger = get_projectLogger()
+# Resource fields layout of a standard village: 4 woodcutters, 4 clay pits, 4 iron mines and 6 croplands, values
+# index RESOURCE_FIELDS
+FIELD_LAYOUT = np.array([0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 3, 3])
+# Hourly production of a resource field for each level (index is the level)
+FIELD_PRODUCTION = np.array([2, 5, 9, 15, 22, 33, 50, 70, 100, 145, 200, 280, 375, 495, 635, 800, 1000, 1300,
+    1600, 2000, 2450], dtype=float)
+# Capacity of Warehouse / Granary for each level (index is the level, level 0 is the capacity without storage)
+STORAGE_CAPACITY = np.array([800, 1200, 1700, 2300, 3100, 4000, 5000, 6300, 7800, 9600, 11800, 14400, 17600,
+    21400, 25900, 31300, 37900, 45700, 55100, 66400, 80000], dtype=float)
+# Resources of a freshly founded village
+START_RESOURCES = [750, 750, 750, 750]
+# Size of the building type axis (BuildingType values are used as indexes)
+BUILDING_AXIS = max(BuildingType) + 1
+# Highest level of any building
+MAX_LEVEL = 20
+# Marks an unused step in a build order
+NO_STEP = -1
+# Index in RESOURCE_FIELDS of each building type, NO_STEP for other buildings
+FIELD_INDEX = np.full(BUILDING_AXIS, NO_STEP)
+FIELD_INDEX[RESOURCE_FIELDS] = np.arange(len(RESOURCE_FIELDS))
+# Seconds in an hour
+SECONDS_IN_HOUR = 3600
+
+
+# Village state the simulation starts from
+VillageState = namedtuple(typename='VillageState', field_names=['fields', 'buildings', 'resources'])
+
+# Result of evaluating a batch of build orders
+SimulationReport = namedtuple(typename='SimulationReport', field_names=['timeToGoal', 'reached', 'unknownCosts',
+    'best', 'percentiles'])
+
+
+def new_village_state():
+    """
+    Generates the state of a freshly founded village.
+
+    Returns:
+        - VillageState.
+    """
+    return VillageState([0] * len(FIELD_LAYOUT), {BuildingType.MainBuilding: 1}, list(START_RESOURCES))
+
+
+def village_state_from_data(villageData: dict, resources: list = None):
+    """
+    Generates the simulation start state from data scanned in game.
+
+    Parameters:
+        - villageData (Dictionary): Dictionary linking BuildingType to [Building], as get_village_data() returns.
+        - resources ([Int]): Current lumber, clay, iron and crop, START_RESOURCES by default.
+
+    Returns:
+        - VillageState.
+    """
+    fields = []
+    for fdType in RESOURCE_FIELDS:
+        fdLevels = sorted([bd.level for bd in villageData.get(fdType) or []])
+        expected = int(np.count_nonzero(FIELD_LAYOUT == RESOURCE_FIELDS.index(fdType)))
+        # Pad or trim to the standard layout
+        fields += (fdLevels + [0] * expected)[:expected]
+    buildings = {bdType: max(bd.level for bd in lst) for bdType, lst in villageData.items() \
+        if lst and bdType not in RESOURCE_FIELDS and bdType is not BuildingType.EmptyPlace}
+    return VillageState(fields, buildings, list(resources or START_RESOURCES))
+
+
+def build_cost_arrays():
+    """
+    Builds cost lookup arrays out of the learned cost table.
+
+    Returns:
+        - (costs, durations): Arrays indexed by [BuildingType, level] holding [lumber, clay, iron, crop] and
+        seconds. Unknown entries are NaN.
+    """
+    costs = np.full((BUILDING_AXIS, MAX_LEVEL + 1, len(ResourceType)), np.nan)
+    durations = np.full((BUILDING_AXIS, MAX_LEVEL + 1), np.nan)
+    for bdType in BuildingType:
+        for level in range(1, get_building_info(bdType).maxLevel + 1):
+            bdCosts = get_building_costs(bdType, level)
+            if bdCosts:
+                costs[bdType, level] = [bdCosts.lumber, bdCosts.clay, bdCosts.iron, bdCosts.crop]
+                durations[bdType, level] = bdCosts.time
+    return costs, durations
+
+
+def build_requirement_arrays():
+    """
+    Builds requirement and max level arrays out of `data.json`.
+
+    Returns:
+        - (requirements, maxLevels): requirements[bdType, reqType] is the minimum level of reqType needed before
+        constructing bdType, maxLevels[bdType] is the max level of bdType.
+    """
+    requirements = np.zeros((BUILDING_AXIS, BUILDING_AXIS), dtype=int)
+    maxLevels = np.zeros(BUILDING_AXIS, dtype=int)
+    for bdType in BuildingType:
+        info = get_building_info(bdType)
+        maxLevels[bdType] = info.maxLevel
+        for reqType, reqLevel in info.requirements:
+            if reqType is not None:
+                requirements[bdType, reqType] = reqLevel
+    return requirements, maxLevels
+
+
+def to_build_order_array(buildOrders: list):
+    """
+    Converts build orders to a matrix with one row per strategy.
+
+    Parameters:
+        - buildOrders ([[BuildingType]]): Each build order lists one BuildingType per upgrade step. A resource field
+        type upgrades the lowest level field of that type.
+
+    Returns:
+        - Int matrix padded with NO_STEP.
+    """
+    length = max([len(order) for order in buildOrders] + [0])
+    orders = np.full((len(buildOrders), length), NO_STEP, dtype=int)
+    for row, order in enumerate(buildOrders):
+        orders[row, :len(order)] = [int(bdType) for bdType in order]
+    return orders
+
+
+def required_steps(goal: dict, start: VillageState = None):
+    """
+    Lists the upgrade steps needed to reach a goal, in no particular order.
+
+    Parameters:
+        - goal (Dictionary): Links BuildingType to the desired level. For resource field types every field of
+        that type has to reach the level.
+        - start (VillageState): Starting village, new village by default.
+
+    Returns:
+        - [BuildingType].
+    """
+    start = start or new_village_state()
+    steps = []
+    for bdType, level in goal.items():
+        if bdType in RESOURCE_FIELDS:
+            fdIndex = RESOURCE_FIELDS.index(bdType)
+            for fdLevel in np.array(start.fields)[FIELD_LAYOUT == fdIndex]:
+                steps += [bdType] * max(0, level - int(fdLevel))
+        else:
+            steps += [bdType] * max(0, level - start.buildings.get(bdType, 0))
+    return steps
+
+
+def random_build_orders(goal: dict, count: int, start: VillageState = None, seed: int = None):
+    """
+    Generates random orderings of the steps needed to reach a goal.
+
+    Parameters:
+        - goal (Dictionary): Links BuildingType to the desired level.
+        - count (Int): Number of build orders to generate.
+        - start (VillageState): Starting village, new village by default.
+        - seed (Int): Seed for the random generator, None by default.
+
+    Returns:
+        - Int matrix with one build order per row.
+    """
+    steps = np.array([int(bdType) for bdType in required_steps(goal, start)], dtype=int)
+    rng = np.random.default_rng(seed)
+    # Sorting random keys gives an independent permutation for every row
+    permutations = np.argsort(rng.random((count, len(steps))), axis=1)
+    return steps[permutations]
+
+
+def __effective_levels(fields: np.ndarray, buildings: np.ndarray):
+    """
+    Computes the level of each building type for each strategy (highest field level for resource fields).
+
+    Parameters:
+        - fields (ndarray): Field levels, one row per strategy.
+        - buildings (ndarray): Building levels indexed by BuildingType, one row per strategy.
+
+    Returns:
+        - ndarray indexed by BuildingType, one row per strategy.
+    """
+    levels = buildings.copy()
+    for fdIndex, fdType in enumerate(RESOURCE_FIELDS):
+        levels[:, fdType] = fields[:, FIELD_LAYOUT == fdIndex].max(axis=1)
+    return levels
+
+
+def __goal_reached(fields: np.ndarray, levels: np.ndarray, goal: dict):
+    """
+    Checks for each strategy whether the goal is reached.
+
+    Parameters:
+        - fields (ndarray): Field levels, one row per strategy.
+        - levels (ndarray): Effective building levels, one row per strategy.
+        - goal (Dictionary): Links BuildingType to the desired level.
+
+    Returns:
+        - Boolean ndarray.
+    """
+    reached = np.ones(len(fields), dtype=bool)
+    for bdType, level in goal.items():
+        if bdType in RESOURCE_FIELDS:
+            reached &= fields[:, FIELD_LAYOUT == RESOURCE_FIELDS.index(bdType)].min(axis=1) >= level
+        else:
+            reached &= levels[:, bdType] >= level
+    return reached
+
+
+def evaluate_build_orders(buildOrders, goal: dict, start: VillageState = None, speed: float = 1,
+            percentiles: tuple = (5, 25, 50, 75, 95)):
+    """
+    Simulates a batch of build orders and measures how long each takes to reach the goal.
+
+    The model assumes one builder (no queue), resource production given by field levels multiplied by the server
+    speed, storage capped by the Warehouse / Granary level and the costs / durations from the learned cost table.
+    A strategy fails when a step breaks the requirements from `data.json`, exceeds the max level or storage.
+
+    Parameters:
+        - buildOrders ([[BuildingType]] or ndarray): Build orders, one per strategy.
+        - goal (Dictionary): Links BuildingType to the desired level.
+        - start (VillageState): Starting village, new village by default.
+        - speed (Float): Server speed multiplier for production, 1 by default.
+        - percentiles ((Int)): Percentiles of time to goal to report.
+
+    Returns:
+        - SimulationReport with time to goal in seconds for each strategy (inf if never reached).
+    """
+    start = start or new_village_state()
+    orders = buildOrders if isinstance(buildOrders, np.ndarray) else to_build_order_array(buildOrders)
+    count = len(orders)
+    costs, durations = build_cost_arrays()
+    requirements, maxLevels = build_requirement_arrays()
+    rows = np.arange(count)
+    # Per strategy state
+    fields = np.tile(np.array(start.fields, dtype=int), (count, 1))
+    buildings = np.zeros((count, BUILDING_AXIS), dtype=int)
+    for bdType, level in start.buildings.items():
+        buildings[:, bdType] = level
+    resources = np.tile(np.array(start.resources, dtype=float), (count, 1))
+    clock = np.zeros(count)
+    alive = np.ones(count, dtype=bool)
+    unknown = np.zeros(count, dtype=bool)
+    timeToGoal = np.full(count, np.inf)
+    levels = __effective_levels(fields, buildings)
+    timeToGoal[__goal_reached(fields, levels, goal)] = 0
+    for step in range(orders.shape[1]):
+        target = orders[:, step]
+        active = alive & (target != NO_STEP) & np.isinf(timeToGoal)
+        if not active.any():
+            break
+        safeTarget = np.where(target == NO_STEP, 0, target)
+        # Resource fields upgrade their lowest level field of that type
+        isField = FIELD_INDEX[safeTarget] != NO_STEP
+        fieldOfType = FIELD_LAYOUT[None, :] == FIELD_INDEX[safeTarget][:, None]
+        fieldSite = np.argmin(np.where(fieldOfType, fields, MAX_LEVEL + 1), axis=1)
+        current = np.where(isField, fields[rows, fieldSite], buildings[rows, safeTarget])
+        nextLevel = current + 1
+        valid = (nextLevel <= maxLevels[safeTarget]) & (levels >= requirements[safeTarget]).all(axis=1)
+        nextLevel = np.minimum(nextLevel, MAX_LEVEL)
+        stepCosts = costs[safeTarget, nextLevel]
+        stepDuration = durations[safeTarget, nextLevel]
+        known = ~np.isnan(stepCosts).any(axis=1) & ~np.isnan(stepDuration)
+        unknown |= active & ~known
+        # Production and storage for the current state
+        fieldProduction = FIELD_PRODUCTION[fields]
+        production = np.stack([fieldProduction[:, FIELD_LAYOUT == fdIndex].sum(axis=1) \
+            for fdIndex in range(len(RESOURCE_FIELDS))], axis=1) * speed
+        capacity = np.stack([STORAGE_CAPACITY[buildings[:, BuildingType.Warehouse]]] * 3 + \
+            [STORAGE_CAPACITY[buildings[:, BuildingType.Granary]]], axis=1)
+        stepCosts = np.nan_to_num(stepCosts)
+        valid &= (stepCosts <= capacity).all(axis=1)
+        alive &= ~active | (valid & known)
+        active &= alive
+        # Wait for resources, pay, then wait for the building to finish
+        with np.errstate(divide='ignore', invalid='ignore'):
+            wait = np.where(stepCosts > resources, (stepCosts - resources) / production * SECONDS_IN_HOUR, 0)
+        wait = wait.max(axis=1)
+        alive &= ~active | np.isfinite(wait)
+        active &= alive
+        wait = np.where(active, wait, 0)
+        elapsed = wait + np.where(active, np.nan_to_num(stepDuration), 0)
+        resources = np.minimum(resources + production * wait[:, None] / SECONDS_IN_HOUR, capacity)
+        resources -= np.where(active[:, None], stepCosts, 0)
+        resources = np.minimum(resources + production * (elapsed - wait)[:, None] / SECONDS_IN_HOUR, capacity)
+        clock += elapsed
+        # Apply the upgrade
+        upgradeField = active & isField
+        fields[rows[upgradeField], fieldSite[upgradeField]] += 1
+        upgradeBuilding = active & ~isField
+        buildings[rows[upgradeBuilding], safeTarget[upgradeBuilding]] += 1
+        levels = __effective_levels(fields, buildings)
+        justReached = active & __goal_reached(fields, levels, goal)
+        timeToGoal[justReached] = clock[justReached]
+    reached = np.isfinite(timeToGoal)
+    if unknown.any():
+        logger.warning(f'In evaluate_build_orders: {int(unknown.sum())} strategies need costs not learned yet')
+    best = int(np.argmin(timeToGoal)) if reached.any() else None
+    stats = {p: float(np.percentile(timeToGoal[reached], p)) for p in percentiles} if reached.any() else {}
+    return SimulationReport(timeToGoal, reached, unknown, best, stats)
@@ -1,7 +1,8 @@
-from enum import Enum, IntEnum
+from enum import Enum
 import re
-import time
-from Framework.utility.Constants import get_XPATH, get_projectLogger
+from Framework.infrastructure.costs import learn_instructions_costs, lookup_costs
+from Framework.utility.Constants import Tribe, get_XPATH, get_projectLogger
+from Framework.utility.Polling import poll_until
 from Framework.utility.SeleniumWebScraper import SWS, Attr
 
 
@@ -11,6 +12,8 @@ XPATH = get_XPATH()
 # Polling constants
 DEFAULT_POLLING_TIME = 0.5
 MAX_POLLING_TIME = 5
+# Time for the mission dialog to close in page
+MISSION_CLOSE_TIME = 1
 
 
 # Dialog page
@@ -70,7 +73,7 @@ def __search_in_instructions(sws: SWS, locators: list, item: InstructionsSearchI
 		else:
 			ret = sws.getElementAttribute(item.value, Attr.TEXT)
 		sws.exit_iframe()
-		if not sws.clickElement(sws.MISSION_CLOSE_BTN):
+		if not sws.clickElement(XPATH.MISSION_CLOSE_BTN):
 			ret = None
 			logger.error('In __search_in_instructions: Failed to close instructions dialog')
 	else:
@@ -78,61 +81,76 @@ def __search_in_instructions(sws: SWS, locators: list, item: InstructionsSearchI
 	return ret
 
 
-def instructions_get_costs(sws: SWS, locators: list):
+def instructions_get_costs(sws: SWS, locators: list, tribe: Tribe = None):
 	"""
-	Searches costs information for building/troop.
+	Searches costs information for building/troop, in local data first, then in instructions.
 
 	Parameters:
 		- sws (SWS): Selenium Web Scraper.
 		- locators ([str]): List with names to incrementally search for instructions page.
+		- tribe (Tribe): Disambiguates troop names shared by several tribes, None by default.
 
 	Returns:
 		- List containing: Lumber, Clay, Iron, Crop and Upkeep or None if error encountered.
 	"""
 	ret = None
-	costsText = __search_in_instructions(sws, locators, InstructionsSearchItem.COSTS)
-	if costsText:
-		# Take second row and split at each '|', leaving out the last one
-		try:
-			ret = costsText.split('\n')[1].split('|')[:-1]
-		except IndexError:
-			logger.error(f'In instructions_get_costs: Costs do not respect pattern {costsText}')
+	name = locators[-1] if locators else None
+	costs = lookup_costs(name, tribe=tribe) if name else None
+	if costs:
+		ret = [str(value) for value in costs]
 	else:
-		logger.error('In instructions_get_costs: __search_in_instructions() failed')
+		costsText = __search_in_instructions(sws, locators, InstructionsSearchItem.COSTS)
+		if costsText:
+			# Take second row and split at each '|', leaving out the last one
+			try:
+				costsRow = costsText.split('\n')[1]
+				ret = costsRow.split('|')[:-1]
+				learn_instructions_costs(name, costsRow)
+			except IndexError:
+				logger.error(f'In instructions_get_costs: Costs do not respect pattern {costsText}')
+		else:
+			logger.error('In instructions_get_costs: __search_in_instructions() failed')
 	return ret
 
 # Missions dialog
-class MissionNum(IntEnum):
-	M1 = 1
-	M2 = 2
-	M3 = 3
-	M4 = 4
-	M5 = 5
-	M6 = 6
-	M7 = 7
-	M8 = 8
-	M9 = 9
-	M10 = 10
-	M11 = 11
-	M12 = 12
-	M13 = 13
-	M14 = 14
-	M15 = 15
-	M16 = 16
-	M17 = 17
-	M18 = 18
-	M19 = 19
-	M20 = 20
-	M21 = 21
-	M22 = 22
-	M23 = 23
-	M24 = 24
-	M25 = 25
+class MissionNum(Enum):
+	"""Missions by (number, title keyword), the keyword tells apart missions sharing a number."""
+	M1 = (1, None)
+	M2 = (2, None)
+	M3 = (3, None)
+	M4 = (4, None)
+	M5 = (5, None)
+	M6 = (6, None)
+	M7 = (7, None)
+	M8 = (8, None)
+	M9 = (9, None)
+	M10 = (10, None)
+	M11 = (11, None)
+	M12 = (12, None)
+	M13 = (13, None)
+	M14 = (14, None)
+	M15 = (15, None)
+	M16 = (16, None)
+	M17 = (17, None)
+	M18 = (18, None)
+	M19 = (19, None)
 	# Same number, different tasks
-	M20M = 20
-	M20E = 20
-	M21M = 21
-	M21E = 21
+	M20M = (20, 'Barracks')
+	M20E = (20, 'Warehouse')
+	M21M = (21, 'Train')
+	M21E = (21, 'Marketplace')
+	M22 = (22, None)
+	M23 = (23, None)
+	M24 = (24, None)
+	M25 = (25, None)
+
+	@property
+	def number(self):
+		return self.value[0]
+
+	@property
+	def keyword(self):
+		return self.value[1]
 
 
 def open_mission_dialog(sws : SWS):
@@ -147,33 +165,96 @@ def open_mission_dialog(sws : SWS):
 	"""
 	ret = False
 	close_mission_dialog(sws)
-	if sws.isVisible(XPATH.TASK_MASTER):
-		if sws.clickElement(XPATH.TASK_MASTER):
-			startTime = time.time()
-			endTime = startTime + MAX_POLLING_TIME
-			while startTime < endTime:
-				if sws.isVisible(XPATH.MISSION_NAME):
-					ret = True
+	# Second attempt on a fresh page, in case the popup is shown without loading its content
+	for attempt in range(2):
+		if attempt:
+			logger.warning('In open_mission_dialog: Popup content not loaded, refreshing')
+			sws.refresh()
+		if sws.isVisible(XPATH.TASK_MASTER):
+			# Headline left by a previous open must not be read as the new one
+			sws.removeElements(XPATH.MISSION_NAME)
+			if sws.clickElement(XPATH.TASK_MASTER):
+				ret = wait_for_mission_headline(sws)
+				if ret:
 					break
-				time.sleep(DEFAULT_POLLING_TIME)
-				startTime = time.time()
 			else:
-				logger.error('In open_mission_dialog: Popup failed to open')
+				logger.error('In open_mission_dialog: Failed to click on task master')
+				break
 		else:
-			logger.error('In open_mission_dialog: Failed to click on task master')
+			logger.warning('In open_mission_dialog: Failed to find task master')
+			break
 	else:
-		logger.warning('In open_mission_dialog: Failed to find task master')
+		logger.error('In open_mission_dialog: Popup failed to open')
 	return ret
 
 
+def wait_for_mission_headline(sws : SWS):
+	"""
+	Waits for the mission dialog to be displayed with a headline.
+
+	Parameters:
+		- sws (SWS): Selenium Web Scraper.
+
+	Returns:
+		- True if operation was successful, False otherwise.
+	"""
+	return poll_until(lambda: sws.isDisplayed(XPATH.MISSION_DIALOG) and sws.isVisible(XPATH.MISSION_NAME),
+		MAX_POLLING_TIME, maxDelay=DEFAULT_POLLING_TIME, name='mission dialog')
+
+
 def close_mission_dialog(sws : SWS):
 	"""
-	Closes the mission dialog by refreshing the page.
+	Closes the mission dialog in page, refreshes the page only if that fails.
 
 	Parameters:
 		- sws (SWS): Selenium Web Scraper.
+
+	Returns:
+		- True if the dialog is closed, False otherwise.
 	"""
-	sws.refresh(hardRefesh=True)
+	ret = True
+	if sws.isDisplayed(XPATH.MISSION_DIALOG):
+		isClosed = lambda: not sws.isDisplayed(XPATH.MISSION_DIALOG)
+		if sws.isVisible(XPATH.MISSION_CLOSE_BTN):
+			sws.clickElement(XPATH.MISSION_CLOSE_BTN, javaScriptClick=True)
+		ret = poll_until(isClosed, MISSION_CLOSE_TIME, maxDelay=DEFAULT_POLLING_TIME, name='mission dialog close')
+		if not ret:
+			logger.warning('In close_mission_dialog: Failed to close in page, refreshing')
+			sws.refresh()
+			ret = isClosed()
+			if not ret:
+				logger.error('In close_mission_dialog: Failed to close mission dialog')
+	return ret
+
+
+def parse_mission_title(dialogHeadline : str):
+	"""
+	Identifies a mission by the headline of the mission dialog.
+
+	Parameters:
+		- dialogHeadline (str): Headline, e.g. `20. Barracks`.
+
+	Returns:
+		- MissionNum if identified, None otherwise.
+	"""
+	num = None
+	dialogRe = re.search('([0-9]+)(.*)', dialogHeadline or '')
+	if dialogRe:
+		missionTitleNum, missionTitleName = int(dialogRe.group(1)), dialogRe.group(2)
+		candidates = [mission for mission in MissionNum if mission.number == missionTitleNum]
+		for mission in candidates:
+			# Check if mission has multiple candidates
+			if mission.keyword is None or mission.keyword in missionTitleName:
+				num = mission
+				break
+		else:
+			if candidates:
+				logger.error(f'In parse_mission_title: Failed to identify mission {dialogHeadline}')
+			else:
+				logger.warning('In parse_mission_title: Unknown mission')
+	else:
+		logger.warning(f'In parse_mission_title: Title does not respect pattern: {dialogHeadline}')
+	return num
 
 
 def get_mission_number(sws : SWS):
@@ -190,35 +271,7 @@ def get_mission_number(sws : SWS):
 	if open_mission_dialog(sws):
 		dialogHeadline = sws.getElementAttribute(XPATH.MISSION_NAME, Attr.TEXT)
 		if dialogHeadline:
-			dialogRe = re.search('([0-9]+)(.*)', dialogHeadline)
-			missionTitleNum, missionTitleName = None, None
-			try:
-				missionTitleNum = int(dialogRe.group(1))
-				missionTitleName = str(dialogRe.group(2))
-			except (AttributeError, ValueError) as err:
-				logger.warning(f'In get_mission_number: Title does not respect pattern: {err}')
-			if missionTitleNum and missionTitleName:
-				# Search for mission number
-				for mission in MissionNum:
-					if missionTitleNum == mission.value:
-						# Check if mission has multiple candidates
-						if mission.value == MissionNum.M20.value:
-							if 'Barracks' in missionTitleName:
-								num = MissionNum.M20M
-							elif 'Warehouse' in missionTitleName:
-								num = MissionNum.M20E
-						elif mission.value == MissionNum.M21.value:
-							if 'Train' in missionTitleName:
-								num = MissionNum.M21M
-							elif 'Marketplace' in missionTitleName:
-								num = MissionNum.M21E
-						else:
-							num = mission
-						if num is None:
-							logger.error(f'In get_mission_number: Failed to identify mission {dialogHeadline}')
-						break
-				else:
-					logger.warning('In get_mission_number: Unknown mission')
+			num = parse_mission_title(dialogHeadline)
 		else:
 			logger.error('In get_mission_number: Failed to get headline')
 	else:
@@ -237,7 +290,10 @@ def press_accomplish_mission(sws : SWS):
 		- True if operation was successful, False otherwise.
 	"""
 	ret = False
-	if sws.clickElement(XPATH.ACCOMPLISH_MISSION, waitFor=True):
+	if sws.isVisible(XPATH.ACCOMPLISH_MISSION, waitFor=True):
+		# Next mission is shown with a new headline, see wait_for_mission_headline()
+		sws.removeElements(XPATH.MISSION_NAME)
+	if sws.clickElement(XPATH.ACCOMPLISH_MISSION):
 		ret = True
 	else:
 		logger.error('In accomplish_mission: Failed to press accomplish')
@@ -256,18 +312,33 @@ def is_initial_setup(sws : SWS):
 		- True if the mission dialog is in initial state, False otherwise.
 	"""
 	ret = False
-	INITIAL_SCREEN_TEXT = 'Welcome to Zravian!'
 	if open_mission_dialog(sws):
-		title = sws.getElementAttribute(XPATH.MISSION_NAME, Attr.TEXT, waitFor=True)
-		if title:
-			ret = INITIAL_SCREEN_TEXT in title
-		else:
-			logger.error('In is_initial_setup: Failed to get title')
+		ret = __is_initial_title(sws)
 	else:
 		logger.error('In is_initial_setup: Failed to open mission dialog')
 	return ret
 
 
+def __is_initial_title(sws : SWS):
+	"""
+	Checks if the opened mission dialog is on initial screen.
+
+	Parameters:
+		- sws (SWS): Selenium Web Scraper.
+
+	Returns:
+		- True if the mission dialog is in initial state, False otherwise.
+	"""
+	ret = False
+	INITIAL_SCREEN_TEXT = 'Welcome to Zravian!'
+	title = sws.getElementAttribute(XPATH.MISSION_NAME, Attr.TEXT, waitFor=True)
+	if title:
+		ret = INITIAL_SCREEN_TEXT in title
+	else:
+		logger.error('In is_initial_setup: Failed to get title')
+	return ret
+
+
 def accept_missions(sws : SWS):
 	"""
 	Accepts missions in initial dialog.
@@ -282,7 +353,8 @@ def accept_missions(sws : SWS):
 	# Accept tasks text
 	ACCEPT_TASKS_TEXT = 'To the first task!'
 	if open_mission_dialog(sws):
-		if is_initial_setup(sws):
+		# Dialog is already open
+		if __is_initial_title(sws):
 			if sws.clickElement(XPATH.STRING_ON_SCREEN % ACCEPT_TASKS_TEXT, javaScriptClick=True):
 				close_mission_dialog(sws)
 				if press_continue_btn(sws):
@@ -317,7 +389,8 @@ def skip_missions(sws : SWS):
 	# Number of times required to press 'Skip tasks'
 	REFUSE_COUNTER = 3
 	if open_mission_dialog(sws):
-		if is_initial_setup(sws):
+		# Dialog is already open
+		if __is_initial_title(sws):
 			for _ in range(REFUSE_COUNTER):
 				if not sws.clickElement(XPATH.STRING_ON_SCREEN % REFUSE_TASKS_TEXT, waitFor=True, \
 						javaScriptClick=True):
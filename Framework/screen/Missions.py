@@ -0,0 +1,316 @@
+from collections import namedtuple
+from enum import Enum
+import time
+from Framework.infrastructure.builder import BuildingError, construct_many, level_up_many
+from Framework.infrastructure.buildings import FIRST_BUILDING_SITE_VILLAGE
+from Framework.military.troops_trainer import buildingDict, make_troops_by_amount
+from Framework.screen.Dialog import MissionNum, close_mission_dialog, open_mission_dialog, parse_mission_title, \
+    press_accomplish_mission, wait_for_mission_headline
+from Framework.screen.Messages import read_all_new_messages
+from Framework.screen.OVillage import get_village_name
+from Framework.screen.Profile import get_tribe, update_description, update_village_name
+from Framework.screen.Statistics import get_rank
+from Framework.utility.Constants import BuildingType, get_TROOPS, get_XPATH, get_projectLogger
+from Framework.utility.SeleniumWebScraper import SWS, Attr
+
+
+# Project constants
+logger = get_projectLogger()
+XPATH = get_XPATH()
+# Text required by the Dove of Peace mission
+PEACE_DESCRIPTION = '[#0]'
+# New name given to the village
+MISSION_VILLAGE_NAME = 'Capital'
+# Troops trained for the Train mission
+MISSION_TROOPS_AMOUNT = 2
+# Mission read from the dialog and when it was read
+MissionState = namedtuple(typename='MissionState', field_names=['mission', 'readTime'])
+
+
+# Outcome of the last read of the mission dialog
+class MissionStatus(Enum):
+    FOUND = 'found'
+    # Task master is gone once the missions are finished or skipped
+    NONE_LEFT = 'none left'
+    # Dialog could not be opened or its headline could not be identified
+    FAILED = 'failed'
+
+
+# Steps, each step is a function called with the SWS and returning True on success
+def build_step(targets : list):
+    """
+    Parameters:
+        - targets ([(BuildingType, Int)]): Pairs of building type and target level.
+
+    Returns:
+        - Step constructing or leveling up the buildings, see construct_many().
+    """
+    def step(sws : SWS):
+        return all(result.error is BuildingError.OK for result in construct_many(sws, targets, waitToFinish=True))
+    return step
+
+
+def fields_step(level : int):
+    """
+    Parameters:
+        - level (int): Level required for every resource field.
+
+    Returns:
+        - Step leveling up all resource fields, see level_up_many().
+    """
+    def step(sws : SWS):
+        targets = [(site, level) for site in range(1, FIRST_BUILDING_SITE_VILLAGE)]
+        return all(result.error is BuildingError.OK for result in level_up_many(sws, targets, waitToFinish=True))
+    return step
+
+
+def answer_step(getAnswer):
+    """
+    Parameters:
+        - getAnswer (callable): Called with the SWS, returns the answer or None.
+
+    Returns:
+        - Step typing the answer in the mission dialog and confirming it.
+    """
+    def step(sws : SWS):
+        ret = False
+        answer = getAnswer(sws)
+        if answer is not None:
+            if open_mission_dialog(sws):
+                if sws.sendKeys(XPATH.MISSION_TEXT_BOX, str(answer)) and sws.clickElement(XPATH.MISSION_CONFIRM):
+                    ret = True
+                else:
+                    logger.error(f'In answer_step: Failed to send answer {answer}')
+            else:
+                logger.error('In answer_step: Failed to open mission dialog')
+        else:
+            logger.error('In answer_step: Failed to get answer')
+        return ret
+    return step
+
+
+def dialog_button_step(xpath : str):
+    """
+    Parameters:
+        - xpath (str): Button of the mission dialog.
+
+    Returns:
+        - Step pressing the button.
+    """
+    def step(sws : SWS):
+        ret = False
+        if open_mission_dialog(sws):
+            if sws.clickElement(xpath, waitFor=True):
+                ret = True
+            else:
+                logger.error(f'In dialog_button_step: Failed to press {xpath}')
+        else:
+            logger.error('In dialog_button_step: Failed to open mission dialog')
+        return ret
+    return step
+
+
+def rename_village(sws : SWS):
+    """Step renaming the village to MISSION_VILLAGE_NAME."""
+    ret = False
+    villageName = get_village_name(sws)
+    if villageName:
+        ret = update_village_name(sws, villageName, MISSION_VILLAGE_NAME)
+    else:
+        logger.error('In rename_village: Failed to get village name')
+    return ret
+
+
+def write_peace_description(sws : SWS):
+    """Step writing PEACE_DESCRIPTION in profile."""
+    return update_description(sws, PEACE_DESCRIPTION)
+
+
+def train_basic_troops(sws : SWS):
+    """Step training MISSION_TROOPS_AMOUNT troops of the first barracks troop of the tribe."""
+    ret = False
+    tribe = get_tribe(sws)
+    if tribe:
+        TROOPS = get_TROOPS()
+        for tpType, bdType in buildingDict.items():
+            if bdType is BuildingType.Barracks and TROOPS[tpType].tribe is tribe:
+                ret = make_troops_by_amount(sws, tpType, MISSION_TROOPS_AMOUNT)
+                break
+        else:
+            logger.error(f'In train_basic_troops: No barracks troop for {tribe.value}')
+    else:
+        logger.error('In train_basic_troops: Failed to get tribe')
+    return ret
+
+
+# Mission linked to its steps, None if the mission can not be solved automatically
+MISSION_PLANS = {
+    MissionNum.M1: [build_step([(BuildingType.Woodcutter, 1)])],
+    MissionNum.M2: [build_step([(BuildingType.Cropland, 1)])],
+    MissionNum.M3: [rename_village],
+    MissionNum.M4: [build_step([(BuildingType.ClayPit, 1), (BuildingType.IronMine, 1)])],
+    MissionNum.M5: [answer_step(get_rank)],
+    MissionNum.M6: [read_all_new_messages],
+    MissionNum.M7: [dialog_button_step(XPATH.MISSION_SEND_WHEAT_BTN)],
+    MissionNum.M8: [fields_step(1)],
+    MissionNum.M9: [write_peace_description],
+    # Requires the coordinates of a neighbour
+    MissionNum.M10: None,
+    MissionNum.M11: [build_step([(BuildingType.Cranny, 1)])],
+    MissionNum.M12: [build_step([(BuildingType.Woodcutter, 2), (BuildingType.ClayPit, 2),
+        (BuildingType.IronMine, 2), (BuildingType.Cropland, 2)])],
+    # Requires reading the costs asked in the instructions
+    MissionNum.M13: None,
+    MissionNum.M14: [build_step([(BuildingType.MainBuilding, 3)])],
+    MissionNum.M15: [answer_step(get_rank)],
+    MissionNum.M16: [build_step([(BuildingType.Warehouse, 1), (BuildingType.Granary, 1)])],
+    MissionNum.M17: [build_step([(BuildingType.Embassy, 1)])],
+    MissionNum.M18: [build_step([(BuildingType.MainBuilding, 5)])],
+    # Chosen by MissionEngine, see MISSION_CHOICE
+    MissionNum.M19: [],
+    MissionNum.M20M: [build_step([(BuildingType.RallyPoint, 1), (BuildingType.Barracks, 1)])],
+    MissionNum.M20E: [build_step([(BuildingType.Warehouse, 3)])],
+    MissionNum.M21M: [train_basic_troops],
+    MissionNum.M21E: [build_step([(BuildingType.Marketplace, 1)])],
+    MissionNum.M22: [fields_step(2)],
+    # Depend on the chosen path
+    MissionNum.M23: None,
+    MissionNum.M24: None,
+    MissionNum.M25: None,
+}
+# Mission asking to choose between army and economy
+MISSION_CHOICE = MissionNum.M19
+
+
+# Solves missions one after another, reading the mission dialog as little as possible
+class MissionEngine:
+    def __init__(self, sws : SWS, plans : dict = MISSION_PLANS, army : bool = True):
+        """
+        Parameters:
+            - sws (SWS): Selenium Web Scraper.
+            - plans (dict): Mission linked to its steps, MISSION_PLANS by default.
+            - army (bool): If True the army path is chosen, economy otherwise, True by default.
+        """
+        self.sws = sws
+        self.plans = plans
+        self.army = army
+        self.state = None
+        self.status = None
+
+    def __read_open_dialog(self):
+        """
+        Reads the mission of the opened dialog and caches it.
+
+        Returns:
+            - MissionNum if identified, None otherwise.
+        """
+        headline = self.sws.getElementAttribute(XPATH.MISSION_NAME, Attr.TEXT, waitFor=True)
+        mission = parse_mission_title(headline) if headline else None
+        self.state = MissionState(mission, time.time()) if mission else None
+        self.status = MissionStatus.FOUND if mission else MissionStatus.FAILED
+        return mission
+
+    def current(self, refresh : bool = False):
+        """
+        Parameters:
+            - refresh (bool): If True the dialog is read again, False by default.
+
+        Returns:
+            - MissionNum of the current mission, None if there is none or it can not be identified, see status.
+        """
+        if refresh or self.state is None:
+            self.state = None
+            if open_mission_dialog(self.sws):
+                self.__read_open_dialog()
+                close_mission_dialog(self.sws)
+            elif not self.sws.isVisible(XPATH.TASK_MASTER):
+                logger.info('In MissionEngine: No mission left')
+                self.status = MissionStatus.NONE_LEFT
+            else:
+                logger.error('In MissionEngine: Failed to open mission dialog')
+                self.status = MissionStatus.FAILED
+        return self.state.mission if self.state else None
+
+    def invalidate(self):
+        """Forgets the cached mission, e.g. after the missions were advanced elsewhere."""
+        self.state = None
+
+    def __steps(self, mission : MissionNum):
+        """
+        Returns:
+            - List of steps of mission, None if the mission can not be solved.
+        """
+        if mission is MISSION_CHOICE:
+            return [dialog_button_step(XPATH.MISSION_CHOOSE_ARMY if self.army else XPATH.MISSION_CHOOSE_ECONOMY)]
+        return self.plans.get(mission)
+
+    def solve_current(self):
+        """
+        Runs the steps of the current mission and accomplishes it.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        ret = False
+        mission = self.current()
+        steps = self.__steps(mission) if mission else None
+        if steps is not None:
+            for step in steps:
+                if not step(self.sws):
+                    logger.error(f'In MissionEngine: Step {step.__qualname__} of {mission.name} failed')
+                    break
+            else:
+                # Dialog steps leave the dialog open
+                if self.sws.isVisible(XPATH.ACCOMPLISH_MISSION) or open_mission_dialog(self.sws):
+                    if press_accomplish_mission(self.sws):
+                        logger.success(f'In MissionEngine: Accomplished {mission.name}')
+                        ret = True
+                        # Dialog shows the next mission once its headline is replaced
+                        if wait_for_mission_headline(self.sws):
+                            self.__read_open_dialog()
+                        else:
+                            self.invalidate()
+                        close_mission_dialog(self.sws)
+                else:
+                    logger.error('In MissionEngine: Failed to open mission dialog')
+            if not ret:
+                self.invalidate()
+        elif mission:
+            logger.warning(f'In MissionEngine: No plan for {mission.name}')
+        return ret
+
+    def run(self, maxMissions : int = None):
+        """
+        Solves missions until one fails or has no plan.
+
+        Parameters:
+            - maxMissions (int): Missions solved at most, unlimited by default.
+
+        Returns:
+            - List of accomplished MissionNum.
+        """
+        ret = []
+        while maxMissions is None or len(ret) < maxMissions:
+            mission = self.current()
+            if mission is None or not self.solve_current():
+                break
+            ret.append(mission)
+        return ret
+
+
+def solve_missions(sws : SWS):
+    """
+    Solves the missions of the account as far as MISSION_PLANS allows, usable as an AccountTask.
+
+    Parameters:
+        - sws (SWS): Selenium Web Scraper.
+
+    Returns:
+        - True if at least one mission was accomplished or none is left, False if the missions could not be read
+        or none could be solved.
+    """
+    engine = MissionEngine(sws)
+    accomplished = engine.run()
+    if engine.status is MissionStatus.FAILED:
+        logger.error('In solve_missions: Failed to read missions')
+    return engine.status is MissionStatus.NONE_LEFT or engine.status is MissionStatus.FOUND and bool(accomplished)
@@ -1,6 +1,7 @@
 from enum import Enum
 import Framework.infrastructure.buildings as BD
 from Framework.utility.Constants import BuildingType, get_XPATH, get_building_info, get_projectLogger
+from Framework.utility.Logger import LogLevel
 from Framework.utility.SeleniumWebScraper import SWS
 
 
@@ -200,10 +201,13 @@ def is_screen_menu_of(sws: SWS, bdType: BuildingType):
     if (bdType == BuildingType.EmptyPlace and sws.isVisible(XPATH.BUILDING_PAGE_EMPTY_TITLE)) or \
             bdType != BuildingType.EmptyPlace and \
             sws.isVisible(XPATH.BUILDING_PAGE_TITLE % get_building_info(bdType).name, waitFor=True):
-        logger.info(f'In is_building_menu: Current screen is {get_building_info(bdType).name} menu')
         status = True
-    else:
-        logger.info(f'In is_building_menu: Current screen is not {get_building_info(bdType).name} menu')
+    # Called before every building action, only format the message if it is logged
+    if logger.is_enabled_for(LogLevel.INFO):
+        if status:
+            logger.info(f'In is_building_menu: Current screen is {get_building_info(bdType).name} menu')
+        else:
+            logger.info(f'In is_building_menu: Current screen is not {get_building_info(bdType).name} menu')
     return status
 
 
@@ -328,13 +332,14 @@ def move_to_plus(sws: SWS, forced: bool = False):
     return ret
 
 
-def enter_building_site(sws: SWS, index: int):
+def enter_building_site(sws: SWS, index: int, direct: bool = False):
     """
     Enters a building site.
 
     Parameters:
         - sws (SWS): Used to interact with the webpage.
         - index (Int): Denotes building site index.
+        - direct (bool): If True enters from the current screen without passing through Overview / Village.
 
     Returns:
         - True if operation is successful, False otherwise.
@@ -343,7 +348,9 @@ def enter_building_site(sws: SWS, index: int):
     # Building site URL pattern
     BUILDING_SITE_PATTERN = 'build.php?id=%d'
     if index > 0 and index <= BD.LAST_BUILDING_SITE_VILLAGE:
-        if index > 0 and index < BD.FIRST_BUILDING_SITE_VILLAGE:
+        if direct:
+            moveStatus = True
+        elif index > 0 and index < BD.FIRST_BUILDING_SITE_VILLAGE:
             moveStatus = move_to_overview(sws)
         else:
             moveStatus = move_to_village(sws)
@@ -1,3 +1,5 @@
+from collections import namedtuple
+import time
 from Framework.screen.Navigation import move_to_overview
 from Framework.utility.Constants import ResourceType, get_XPATH, get_projectLogger
 from Framework.utility.SeleniumWebScraper import SWS, Attr
@@ -6,6 +8,33 @@ from Framework.utility.SeleniumWebScraper import SWS, Attr
 # Project constants
 logger = get_projectLogger()
 XPATH = get_XPATH()
+# Resource bar, present on every page: text is storage/capacity, title is hourly production
+RESOURCE_BAR = {
+    ResourceType.LUMBER: XPATH.PRODUCTION_LUMBER,
+    ResourceType.CLAY: XPATH.PRODUCTION_CLAY,
+    ResourceType.IRON: XPATH.PRODUCTION_IRON,
+    ResourceType.CROP: XPATH.PRODUCTION_CROP,
+}
+
+
+# Resource bar read at timestamp, each field is a dictionary linking ResourceType to int
+class ResourceSnapshot(namedtuple(typename='ResourceSnapshot', field_names=['storage', 'capacity', 'production',
+        'timestamp'])):
+    __slots__ = ()
+
+    def estimate(self, when: float = None):
+        """
+        Estimates storage from production, without reading the page again.
+
+        Parameters:
+            - when (float): Timestamp of the estimation, now by default.
+
+        Returns:
+            - Dictionary linking ResourceType to estimated storage, between 0 and capacity.
+        """
+        hours = ((time.time() if when is None else when) - self.timestamp) / 3600
+        return {resource: min(self.capacity[resource], max(0, int(amount + self.production[resource] * hours))) \
+            for resource, amount in self.storage.items()}
 
 
 def get_village_name(sws: SWS):
@@ -30,6 +59,40 @@ def get_village_name(sws: SWS):
     return ret
 
 
+def get_resources(sws: SWS):
+    """
+    Reads storage, capacity and production of each resource for current village, in a single extraction.
+
+    Parameters:
+        - sws (SWS): Selenium Web Scraper.
+
+    Returns:
+        - ResourceSnapshot if operation was successful, None otherwise.
+    """
+    ret = None
+    props, attrs = {}, {}
+    # Stock and production share the element
+    for resource, xpath in RESOURCE_BAR.items():
+        props[resource.value + 'Stock'], attrs[resource.value + 'Stock'] = xpath, Attr.TEXT
+        props[resource.value + 'Production'], attrs[resource.value + 'Production'] = xpath, Attr.TITLE
+    page = sws.getSnapshot(props, attrs)
+    if page is not None:
+        storage, capacity, production = {}, {}, {}
+        for resource in RESOURCE_BAR:
+            stock, hourly = page[resource.value + 'Stock'], page[resource.value + 'Production']
+            try:
+                storage[resource], capacity[resource] = [int(value) for value in stock.split('/')]
+                production[resource] = int(hourly)
+            except (AttributeError, TypeError, ValueError) as err:
+                logger.error(f'In get_resources: {resource.value} does not respect pattern. Error: {err}')
+                break
+        else:
+            ret = ResourceSnapshot(storage, capacity, production, time.time())
+    else:
+        logger.error('In get_resources: Failed to read resource bar')
+    return ret
+
+
 def get_storage(sws: SWS):
     """
     Gets for storage for each resource for current village.
@@ -41,50 +104,11 @@ def get_storage(sws: SWS):
         - Dictionary mapping each resource field to tuple.
     """
     storage = {}
-    # Extract lumber storage
-    lumber = sws.getElementAttribute(XPATH.PRODUCTION_LUMBER, Attr.TEXT)
-    if lumber:
-        try:
-            lumber_curr = int(lumber.split('/')[0])
-            lumber_cap = int(lumber.split('/')[1])
-            storage[ResourceType.LUMBER] = (lumber_curr, lumber_cap)
-        except (IndexError, ValueError) as err:
-            logger.error('In get_storage: Lumber storage does not respect pattern. Error: %s' % err)
+    snapshot = get_resources(sws)
+    if snapshot:
+        storage = {resource: (snapshot.storage[resource], snapshot.capacity[resource]) for resource in RESOURCE_BAR}
     else:
-        logger.error('In get_storage: Failed to get storage for lumber')
-    # Extract clay storage
-    clay = sws.getElementAttribute(XPATH.PRODUCTION_CLAY, Attr.TEXT)
-    if clay:
-        try:
-            clay_curr = int(clay.split('/')[0])
-            clay_cap = int(clay.split('/')[1])
-            storage[ResourceType.CLAY] = (clay_curr, clay_cap)
-        except (IndexError, ValueError) as err:
-            logger.error('In get_storage: Clay storage does not respect pattern. Error: %s' % err)
-    else:
-        logger.error('In get_storage: Failed to get storage for clay')
-    # Extract iron storage
-    iron = sws.getElementAttribute(XPATH.PRODUCTION_IRON, Attr.TEXT)
-    if iron:
-        try:
-            iron_curr = int(iron.split('/')[0])
-            iron_cap = int(iron.split('/')[1])
-            storage[ResourceType.IRON] = (iron_curr, iron_cap)
-        except (IndexError, ValueError) as err:
-            logger.error('In get_storage: Iron storage does not respect pattern. Error: %s' % err)
-    else:
-        logger.error('In get_storage: Failed to get storage for iron')
-    # Extract crop storage
-    crop = sws.getElementAttribute(XPATH.PRODUCTION_CROP, Attr.TEXT)
-    if crop:
-        try:
-            crop_curr = int(crop.split('/')[0])
-            crop_cap = int(crop.split('/')[1])
-            storage[ResourceType.CROP] = (crop_curr, crop_cap)
-        except (IndexError, ValueError) as err:
-            logger.error('In get_storage: Crop storage does not respect pattern. Error: %s' % err)
-    else:
-        logger.error('In get_storage: Failed to get storage for crop')
+        logger.error('In get_storage: get_resources() failed')
     return storage
 
 
@@ -99,40 +123,9 @@ def get_production(sws: SWS):
         - Dictionary mapping each resource to its production value.
     """
     production = {}
-    # Extract lumber production
-    lumber = sws.getElementAttribute(XPATH.PRODUCTION_LUMBER, Attr.TITLE)
-    if lumber:
-        try:
-            production[ResourceType.LUMBER] = int(lumber)
-        except ValueError as err:
-            logger.error('In get_production: Failed to convert to int. Error: %s' % err)
-    else:
-        logger.error('In get_production: Failed to get production for lumber')
-    # Extract clay production
-    clay = sws.getElementAttribute(XPATH.PRODUCTION_CLAY, Attr.TITLE)
-    if clay:
-        try:
-            production[ResourceType.CLAY] = int(clay)
-        except ValueError as err:
-            logger.error('In get_production: Failed to convert to int. Error: %s' % err)
-    else:
-        logger.error('In get_production: Failed to get production for clay')
-    # Extract iron production
-    iron = sws.getElementAttribute(XPATH.PRODUCTION_IRON, Attr.TITLE)
-    if iron:
-        try:
-            production[ResourceType.IRON] = int(iron)
-        except ValueError as err:
-            logger.error('In get_production: Failed to convert to int. Error: %s' % err)
-    else:
-        logger.error('In get_production: Failed to get production for iron')
-    # Extract crop production
-    crop = sws.getElementAttribute(XPATH.PRODUCTION_CROP, Attr.TITLE)
-    if crop:
-        try:
-            production[ResourceType.CROP] = int(crop)
-        except ValueError as err:
-            logger.error('In get_production: Failed to convert to int. Error: %s' % err)
+    snapshot = get_resources(sws)
+    if snapshot:
+        production = dict(snapshot.production)
     else:
-        logger.error('In get_production: Failed to get production for crop')
+        logger.error('In get_production: get_resources() failed')
     return production
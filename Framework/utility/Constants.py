@@ -1,8 +1,12 @@
 import os
 import json
+import hashlib
+import pickle
 from enum import IntEnum, Enum
 from pathlib import Path
 from collections import namedtuple
+from collections.abc import Mapping
+from types import MappingProxyType
 from Framework.utility.Logger import ProjectLogger
 
 
@@ -15,8 +19,18 @@ FRAMEWORK_PATH = Path(os.path.dirname(os.path.abspath(__file__))).parent.absolut
 CHROME_DRIVER_PATH = os.path.join(FRAMEWORK_PATH, *('files\\chromedriver.exe'.split('\\')))
 # Data file path
 DATA_PATH = os.path.join(FRAMEWORK_PATH, *('files\\data.json'.split('\\')))
+# Compiled data file path, rebuilt whenever data.json changes
+DATA_CACHE_PATH = os.path.join(FRAMEWORK_PATH, *('files\\data.cache'.split('\\')))
+# Layout of the compiled data, bump it whenever __compile_data or the records it builds change
+DATA_CACHE_VERSION = 1
 # Account library file path
 ACCOUNT_LIBRARY_PATH = os.path.join(FRAMEWORK_PATH, *('files\\account_library.json'.split('\\')))
+# Learned building costs file path
+BUILDING_COSTS_PATH = os.path.join(FRAMEWORK_PATH, *('files\\building_costs.json'.split('\\')))
+# Encrypted session cookies file path
+SESSIONS_PATH = os.path.join(FRAMEWORK_PATH, *('files\\sessions.bin'.split('\\')))
+# Session encryption key file path, ZRAVIAN_SESSION_KEY environment variable takes precedence
+SESSION_KEY_PATH = os.path.join(FRAMEWORK_PATH, *('files\\session.key'.split('\\')))
 # Log file path
 LOGS_PATH = os.path.join(FRAMEWORK_PATH, *('files\\execution.log'.split('\\')))
 
@@ -25,6 +39,10 @@ LOGS_PATH = os.path.join(FRAMEWORK_PATH, *('files\\execution.log'.split('\\')))
 XPATHCollectionInstance = None
 BUILDINGS_DATA_Instance = None
 TROOPSInstance = None
+# Lookup tables built once by init_data()
+BUILDING_NAMES_Instance = None
+BUILDING_TITLES_Instance = None
+TROOP_NAMES_Instance = None
 # Logger will be initialised to provide features for other elements
 logger = ProjectLogger()
 
@@ -51,22 +69,90 @@ def time_to_seconds(currTime: str):
     return ret
 
 
+def normalize_name(text: str):
+    """
+    Reduces a name to the key used by the lookup tables.
+
+    Case, spaces, underscores and punctuation are ignored, so "Hero's Mansion", "HeroMansion"
+    and "Heros mansion" share the same key.
+
+    Parameters:
+        - text (str): Name to normalize.
+
+    Returns:
+        - Normalized name.
+    """
+    return ''.join(ch for ch in text.lower() if ch.isalnum())
+
+
 def get_building_type_by_name(text: str):
     """
     Finds BuildingType based on text.
+
+    Accepts both display names ("Main Building") and type names ("MainBuilding").
+
     Parameters:
         - text (str): Building name to search by.
+
+    Returns:
+        - BuildingType if found, None otherwise.
+    """
+    if BUILDING_NAMES_Instance is None:
+        init_data()
+    ret = BUILDING_NAMES_Instance.get(normalize_name(text))
+    if ret is None:
+        logger.error(f'In get_building_type_by_name: Failed to get building type from "{text}"')
+    return ret
+
+
+def get_building_titles():
+    """
+    Display names as they appear on screen (titles, alt texts), longest first so that
+    "Great Granary" is matched before "Granary".
+
+    Returns:
+        - Tuple of (str, BuildingType).
+    """
+    if BUILDING_TITLES_Instance is None:
+        init_data()
+    return BUILDING_TITLES_Instance
+
+
+def get_troop_types_by_name(text: str):
+    """
+    Finds all TroopTypes sharing a name, e.g. "Settler" exists for every tribe.
+
+    Accepts both display names ("Equites Legati") and type names ("Equites_Legati").
+
+    Parameters:
+        - text (str): Troop name to search by.
+
+    Returns:
+        - Tuple of TroopType ordered by tribe, empty if none found.
+    """
+    if TROOP_NAMES_Instance is None:
+        init_data()
+    return TROOP_NAMES_Instance.get(normalize_name(text), ())
+
+
+def get_troop_type_by_name(text: str, tribe=None):
+    """
+    Finds TroopType based on text.
+
+    Parameters:
+        - text (str): Troop name to search by.
+        - tribe (Tribe): Disambiguates names shared by several tribes, None by default.
+
     Returns:
-        - BuildingType.
+        - TroopType if found, None otherwise.
     """
     ret = None
-    text = ''.join([word.capitalize() for word in text.split()])
-    for bdType in BuildingType:
-        if bdType.name == text:
-            ret = bdType
+    for tpType in get_troop_types_by_name(text):
+        if tribe is None or get_TROOPS()[tpType].tribe is tribe:
+            ret = tpType
             break
     else:
-        logger.error(f'In get_building_type_by_name: Failed to get building type from "{text}"')
+        logger.error(f'In get_troop_type_by_name: Failed to get troop type from "{text}"')
     return ret
 
 
@@ -204,6 +290,7 @@ class XPATHCollection(dict):
             # Localization
             'BUILDING_SITE_NAME': '//area[contains(@alt, "%s")]',
             'BUILDING_SITE_ID': '//area[contains(@href, "id=%d")]',
+            'BUILDING_SITE_ALL': '//area[contains(@href, "build.php?id=")]',
             # Menu
             'BUILDING_PAGE_TITLE': '//*[@id="build"]//*[contains(text(), "%s")]',
             'BUILDING_PAGE_EMPTY_TITLE': '//*[contains(text(), "Construct building.")]',
@@ -377,74 +464,194 @@ class SRType(Enum):
 SpecialRequirement = namedtuple(typename='SpecialRequirement', field_names=['type'])
 
 
-# Class containing building properties
-class BuildingInfo:
-    def __init__(self, data):
-        # Keywork in special requirements
-        self.id = data['id']
-        self.type = BuildingType(self.id)
-        self.name = data['name']
-        self.maxLevel = data['maxLevel']
-        self.requirements = []
-        for building, level in data['requirements']:
-            self.requirements.append(BuildingRequirement(get_building_type_by_name(building), int(level)))
-        self.specialRequirements = []
-        for value in data['specialRequirements']:
-            for sr in SRType:
-                if value == sr.value:
-                    self.specialRequirements.append(sr)
-                    break
-        self.duplicates = data['duplicates']
+# Immutable record containing building properties
+class BuildingInfo(namedtuple(typename='BuildingInfo', field_names=['id', 'type', 'name', 'maxLevel', 'requirements',
+        'specialRequirements', 'duplicates'])):
+    __slots__ = ()
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Parameters:
+            - data (dict): Building entry of data.json.
+
+        Returns:
+            - BuildingInfo.
+        """
+        requirements = tuple(BuildingRequirement(get_building_type_by_name(building), int(level)) \
+            for building, level in data['requirements'])
+        specialRequirements = tuple(SRType(value) for value in data['specialRequirements'])
+        return cls(data['id'], BuildingType(data['id']), data['name'], data['maxLevel'], requirements,
+            specialRequirements, data['duplicates'])
 
 
 # Named tuple 
 Building = namedtuple(typename='Building', field_names=['siteId', 'level'])
 
 
-# Class containing troop properties
-class Troop:
-    def __init__(self, data, type):
-        self.type = type
-        self.name = data['name']
-        self.attack = data['attack']
-        self.defenseInfantry = data['defenseInfantry']
-        self.defenseCavalry = data['defenseCavalry']
-        self.costs = data['costs']
-        self.capacity = data['capacity']
-        self.upkeep = data['upkeep']
-        self.requirements = []
-        for building, level in data['requirements']:
-            self.requirements.append((get_building_type_by_name(building), level))
+# Immutable record containing troop properties
+class Troop(namedtuple(typename='Troop', field_names=['type', 'tribe', 'name', 'attack', 'defenseInfantry',
+        'defenseCavalry', 'costs', 'capacity', 'upkeep', 'requirements'])):
+    __slots__ = ()
+
+    @classmethod
+    def from_data(cls, data, type, tribe):
+        """
+        Parameters:
+            - data (dict): Troop entry of data.json.
+            - type (TroopType): Type of the troop.
+            - tribe (Tribe): Tribe the troop belongs to.
+
+        Returns:
+            - Troop.
+        """
+        requirements = tuple((get_building_type_by_name(building), level) for building, level in data['requirements'])
+        return cls(type, tribe, data['name'], data['attack'], data['defenseInfantry'], data['defenseCavalry'],
+            tuple(data['costs']), data['capacity'], data['upkeep'], requirements)
 
 
 # Getters
-def init_data():
+def __compile_data(jsonData: dict):
     """
-    Initialises constants by parsing data.json.
+    Builds all records and lookup tables from data.json content.
+
+    Parameters:
+        - jsonData (dict): Parsed content of data.json.
+
+    Returns:
+        - Dictionary with buildings, troops and lookup tables.
     """
-    global TROOPSInstance
-    global BUILDINGS_DATA_Instance
-    # Init
-    BUILDINGS_DATA_Instance = {}
-    TROOPSInstance = {}
-    # Read data
-    with open(DATA_PATH, 'r') as f:
-        jsonData = f.read()
-    # Populate buildings
-    buildings = json.loads(jsonData)['buildings']
+    global BUILDING_NAMES_Instance
+    # Index building names before parsing requirements
+    buildings = jsonData['buildings']
     assert len(buildings) == len(BuildingType)
+    buildingNames = {}
     for bdType, bdData in zip(BuildingType, buildings):
         assert bdType == bdData['id']
-        BUILDINGS_DATA_Instance[bdType] = BuildingInfo(bdData)
+        buildingNames[normalize_name(bdType.name)] = bdType
+        buildingNames[normalize_name(bdData['name'])] = bdType
+    BUILDING_NAMES_Instance = MappingProxyType(buildingNames)
+    buildingTitles = tuple(sorted(((bdData['name'], bdType) for bdType, bdData in zip(BuildingType, buildings)),
+        key=lambda e: -len(e[0])))
+    # Populate buildings
+    buildingsData = {bdType: BuildingInfo.from_data(bdData) for bdType, bdData in zip(BuildingType, buildings)}
     # Populate troops
-    troops = json.loads(jsonData)['troops']['romans']
-    troops += json.loads(jsonData)['troops']['teutons']
-    troops += json.loads(jsonData)['troops']['gauls']
+    troops = []
+    for tribe in Tribe:
+        troops += [(troopData, tribe) for troopData in jsonData['troops'][tribe.value.lower()]]
     assert len(troops) == len(TroopType)
-    for troopType, troopData in zip(TroopType, troops):
+    troopsData = {}
+    troopNames = {}
+    for troopType, (troopData, tribe) in zip(TroopType, troops):
         troopName = ' '.join(troopType.name.split('_'))
         assert troopName == troopData['name'] or troopName[1:] == troopData['name']
-        TROOPSInstance[troopType] = Troop(troopData, troopType)
+        troopsData[troopType] = Troop.from_data(troopData, troopType, tribe)
+        for name in {normalize_name(troopType.name), normalize_name(troopData['name'])}:
+            troopNames[name] = troopNames.get(name, ()) + (troopType,)
+    return {
+        'buildings': buildingsData,
+        'troops': troopsData,
+        'buildingNames': buildingNames,
+        'buildingTitles': buildingTitles,
+        'troopNames': troopNames,
+    }
+
+
+def __read_data_cache(stat: os.stat_result):
+    """
+    Loads compiled data if it was built from the current data.json.
+
+    A cache built by another DATA_CACHE_VERSION is rejected. Otherwise it is accepted right away
+    if mtime and size match, else data.json is hashed so that a touched but unchanged file does
+    not force a rebuild.
+
+    Parameters:
+        - stat (os.stat_result): Status of data.json.
+
+    Returns:
+        - Tuple of (compiled data or None, sha256 of data.json or None if not computed).
+    """
+    compiled, digest = None, None
+    try:
+        with open(DATA_CACHE_PATH, 'rb') as f:
+            cache = pickle.load(f)
+        if cache.get('version') != DATA_CACHE_VERSION:
+            logger.info(f'In __read_data_cache: Ignoring cache {DATA_CACHE_PATH} of another version')
+        elif (cache['mtime'], cache['size']) == (stat.st_mtime_ns, stat.st_size):
+            compiled = cache['data']
+        else:
+            with open(DATA_PATH, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if cache['sha256'] == digest:
+                compiled = cache['data']
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, KeyError, TypeError) as err:
+        logger.warning(f'In __read_data_cache: Ignoring invalid cache {DATA_CACHE_PATH}: {err}')
+    return compiled, digest
+
+
+def __write_data_cache(compiled: dict, stat: os.stat_result, rawData: bytes):
+    """
+    Stores compiled data next to data.json.
+
+    Parameters:
+        - compiled (dict): Compiled data.
+        - stat (os.stat_result): Status of data.json.
+        - rawData (bytes): Content of data.json.
+
+    Returns:
+        - True if operation was successful, False otherwise.
+    """
+    ret = False
+    cache = {
+        'version': DATA_CACHE_VERSION,
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': hashlib.sha256(rawData).hexdigest(),
+        'data': compiled,
+    }
+    tempPath = f'{DATA_CACHE_PATH}.{os.getpid()}.tmp'
+    try:
+        with open(tempPath, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tempPath, DATA_CACHE_PATH)
+        ret = True
+    except OSError as err:
+        logger.warning(f'In __write_data_cache: Failed to write {DATA_CACHE_PATH}: {err}')
+        try:
+            os.remove(tempPath)
+        except OSError:
+            pass
+    return ret
+
+
+def init_data():
+    """
+    Initialises constants from the compiled data cache, parsing data.json only if it changed.
+    """
+    global TROOPSInstance
+    global BUILDINGS_DATA_Instance
+    global BUILDING_NAMES_Instance
+    global BUILDING_TITLES_Instance
+    global TROOP_NAMES_Instance
+    stat = os.stat(DATA_PATH)
+    compiled, digest = __read_data_cache(stat)
+    if compiled is None:
+        # Read data
+        with open(DATA_PATH, 'rb') as f:
+            rawData = f.read()
+        compiled = __compile_data(json.loads(rawData))
+        __write_data_cache(compiled, stat, rawData)
+    elif digest is not None:
+        # Same content with a new mtime, refresh the key to skip hashing next time
+        with open(DATA_PATH, 'rb') as f:
+            __write_data_cache(compiled, stat, f.read())
+    BUILDINGS_DATA_Instance = compiled['buildings']
+    TROOPSInstance = compiled['troops']
+    BUILDING_NAMES_Instance = MappingProxyType(compiled['buildingNames'])
+    BUILDING_TITLES_Instance = compiled['buildingTitles']
+    TROOP_NAMES_Instance = MappingProxyType(compiled['troopNames'])
 
 
 def get_building_info(bdType : BuildingType) -> BuildingInfo:
@@ -461,16 +668,41 @@ def get_building_info(bdType : BuildingType) -> BuildingInfo:
     return BUILDINGS_DATA_Instance[bdType]
 
 
+# Read-only view on game data, loading it on first access
+class LazyData(Mapping):
+    def __init__(self, getter):
+        """
+        Parameters:
+            - getter (callable): Returns the underlying dictionary, None while not loaded.
+        """
+        self.getter = getter
+
+    def data(self):
+        if self.getter() is None:
+            init_data()
+        return self.getter()
+
+    def __getitem__(self, key):
+        return self.data()[key]
+
+    def __iter__(self):
+        return iter(self.data())
+
+    def __len__(self):
+        return len(self.data())
+
+
 def get_TROOPS():
     """
-    Instantiates TROOPSInstance if needed.
-    
+    Troops are loaded on first access, so modules may keep the result at import time.
+
     Returns:
-        - Dictionary linking buildingType to Troop(object).
+        - Mapping linking TroopType to Troop.
     """
-    if TROOPSInstance is None:
-        init_data()
-    return TROOPSInstance
+    return TROOPS_View
+
+
+TROOPS_View = LazyData(lambda: TROOPSInstance)
 
 
 def get_XPATH():
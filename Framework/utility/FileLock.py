@@ -0,0 +1,77 @@
+import os
+import threading
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+# Advisory lock shared by processes and threads, held through a `<path>.lock` file
+class FileLock:
+    def __init__(self, path : str):
+        """
+        Parameters:
+            - path (str): File protected by the lock.
+        """
+        self.lockPath = f'{path}.lock'
+        # Threads of a process queue on this lock, the file lock is taken once per process
+        self.threadLock = threading.RLock()
+        self.depth = 0
+        self.file = None
+
+    def __enter__(self):
+        self.threadLock.acquire()
+        if self.depth == 0:
+            try:
+                self.file = open(self.lockPath, 'a+')
+                if os.name == 'nt':
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                else:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+            except OSError:
+                if self.file:
+                    self.file.close()
+                    self.file = None
+                self.threadLock.release()
+                raise
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.depth -= 1
+        if self.depth == 0:
+            try:
+                if os.name == 'nt':
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+                else:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            finally:
+                self.file.close()
+                self.file = None
+        self.threadLock.release()
+
+
+def atomic_write(path : str, text : str):
+    """
+    Writes text to a temporary file then renames it over path, readers see either the old or the new content.
+
+    Parameters:
+        - path (str): Destination file.
+        - text (str): Content.
+
+    Raises:
+        - OSError if the file could not be written.
+    """
+    tempPath = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(tempPath, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tempPath, path)
+    except OSError:
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        raise
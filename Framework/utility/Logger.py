@@ -1,7 +1,184 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from enum import Enum, IntEnum
+import atexit
+import json
+import os
+import re
+import queue
+import sys
+import threading
+import time
+import weakref
 import Framework.utility.Constants as CONST
 
 
+# Writes log lines from a background thread in batches
+class LogWriter:
+    # Max lines waiting to be written, further lines are dropped
+    MAX_QUEUE_SIZE = 10000
+    # Max lines written per batch
+    BATCH_SIZE = 500
+    # Max seconds a line waits before being written
+    FLUSH_INTERVAL = 0.5
+    # Log file is rotated once it exceeds this size (bytes) or age (seconds)
+    MAX_LOG_SIZE = 5 * 1024 * 1024
+    MAX_LOG_AGE = 24 * 3600
+    # Number of rotated files kept: execution.log.1 ... execution.log.N
+    BACKUP_COUNT = 3
+    # Writers of the process, reset in forked children
+    INSTANCES = weakref.WeakSet()
+
+    def __init__(self, path: str = None):
+        """
+        Parameters:
+            - path (str): Log file, LOGS_PATH by default.
+        """
+        self.path = path
+        self.queue = queue.Queue(maxsize=self.MAX_QUEUE_SIZE)
+        self.dropped = 0
+        # When the current log file started being written by this process
+        self.fileStartTime = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.INSTANCES.add(self)
+
+    def reset_after_fork(self):
+        """
+        Forked children inherit the queue but not the writer thread, the writer starts again on next use.
+
+        Lines queued before the fork are written by the parent.
+        """
+        self.queue = queue.Queue(maxsize=self.MAX_QUEUE_SIZE)
+        self.lock = threading.Lock()
+        self.dropped = 0
+        self.thread = None
+
+    def write(self, message: str):
+        """
+        Queues message without blocking, the message is dropped if the queue is full.
+
+        Parameters:
+            - message (str): Line to write.
+
+        Returns:
+            - True if message was queued, False if it was dropped.
+        """
+        ret = False
+        self.__start()
+        try:
+            self.queue.put_nowait(message)
+            ret = True
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+        return ret
+
+    def flush(self):
+        """Blocks until every queued line is written."""
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.join()
+
+    def __start(self):
+        """Starts the writer thread on first use."""
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    if self.path is None:
+                        self.path = CONST.LOGS_PATH
+                    self.thread = threading.Thread(target=self.__run, name='LogWriter', daemon=True)
+                    self.thread.start()
+                    atexit.register(self.flush)
+
+    def __next_batch(self):
+        """
+        Waits for a line, then collects whatever else is already queued.
+
+        Returns:
+            - List of lines.
+        """
+        batch = [self.queue.get()]
+        deadline = time.time() + self.FLUSH_INTERVAL
+        while len(batch) < self.BATCH_SIZE:
+            try:
+                batch.append(self.queue.get(timeout=max(0, deadline - time.time())))
+            except queue.Empty:
+                break
+        return batch
+
+    def __rotate_if_needed(self):
+        """Renames the log file to a backup when it is too large or too old."""
+        if self.fileStartTime is None:
+            self.fileStartTime = time.time()
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size < self.MAX_LOG_SIZE and time.time() - self.fileStartTime < self.MAX_LOG_AGE:
+            return
+        self.fileStartTime = time.time()
+        try:
+            for index in range(self.BACKUP_COUNT - 1, 0, -1):
+                if os.path.exists(f'{self.path}.{index}'):
+                    os.replace(f'{self.path}.{index}', f'{self.path}.{index + 1}')
+            os.replace(self.path, f'{self.path}.1')
+        except OSError as err:
+            sys.stderr.write(f'In LogWriter: Failed to rotate {self.path}: {err}\n')
+
+    def __run(self):
+        """Writer thread loop."""
+        while True:
+            batch = self.__next_batch()
+            with self.lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                batch.append(f'{datetime.now().strftime(ProjectLogger.TIMESTAMP_FORMAT)} - WARNING: '
+                    f'Log queue full, dropped {dropped} messages')
+            try:
+                self.__rotate_if_needed()
+                with open(self.path, 'a+') as f:
+                    f.write('\n'.join(batch) + '\n')
+            except OSError as err:
+                sys.stderr.write(f'In LogWriter: Failed to write {self.path}: {err}\n')
+            finally:
+                for _ in range(len(batch) - (1 if dropped else 0)):
+                    self.queue.task_done()
+
+
+def _reset_writers_after_fork():
+    """Restarts the writers of a forked child, the parent's writer threads do not exist in the child."""
+    for writer in list(LogWriter.INSTANCES):
+        writer.reset_after_fork()
+
+
+# Not available on Windows, where children are spawned
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_writers_after_fork)
+
+
+# Log levels, messages below the logger threshold are discarded before being formatted
+class LogLevel(IntEnum):
+    INFO = 10
+    SUCCESS = 20
+    WARNING = 30
+    ERROR = 40
+
+
+# Where log records are written
+class LogSink(Enum):
+    # All processes and accounts share LOGS_PATH
+    SHARED = 'shared'
+    # One file per server and account, e.g. execution.S1.user.log
+    ACCOUNT = 'account'
+    # One file per process, e.g. execution.1234.log
+    WORKER = 'worker'
+
+
+# Fields attached to every record logged by the current thread / task
+LOG_CONTEXT = ContextVar('LOG_CONTEXT', default={})
+
+
 # The logger used for the project
 class ProjectLogger:
     # Format for log timestamp
@@ -16,30 +193,152 @@ class ProjectLogger:
         BOLD = '\033[1m'
         UNDERLINE = '\033[4m'
 
+    # Written before the first message of a session
+    START_SESSION = '<' + 25 * '-' + 'STARTED NEW SESSION' + 25 * '-' + '>'
+
     def __init__(self):
         self.debugMode = False
-        START_SESSION = '<' + 25 * '-' + 'STARTED NEW SESSION' + 25 * '-' + '>'
-        # Print start message
-        self.success(START_SESSION)
+        self.level = LogLevel.INFO
+        # If True records are written as JSON lines
+        self.structured = False
+        self.sink = LogSink.SHARED
+        # Log file path linked to its LogWriter, start message is written on first use of each file
+        self.writers = {}
+        self.writersLock = threading.Lock()
 
     def turn_on_debugMode(self):
         """Turns on debug mode."""
         self.debugMode = True
 
-    def success(self, text : str):
+    def configure(self, level: LogLevel = None, structured: bool = None, sink: LogSink = None):
         """
-        Logs text to log file with a timestamp as success notification.
+        Changes logging settings, parameters left to None are unchanged.
+
+        Parameters:
+            - level (LogLevel): Minimum level of logged messages.
+            - structured (bool): If True records are written as JSON lines.
+            - sink (LogSink): Where records are written.
+        """
+        if level is not None:
+            self.level = level
+        if structured is not None:
+            self.structured = structured
+        if sink is not None:
+            self.sink = sink
+
+    def is_enabled_for(self, level: LogLevel):
+        """
+        Used to skip building expensive messages.
 
         Parameters:
+            - level (LogLevel): Level of the message.
+
+        Returns:
+            - True if messages of level are logged, False otherwise.
+        """
+        return level >= self.level
+
+    @contextmanager
+    def context(self, **fields):
+        """
+        Attaches fields (e.g. account, server, village) to every record logged inside the block.
+
+        Parameters:
+            - fields: Values to attach, None removes a field.
+        """
+        context = {**LOG_CONTEXT.get(), **fields}
+        token = LOG_CONTEXT.set({key: value for key, value in context.items() if value is not None})
+        try:
+            yield
+        finally:
+            LOG_CONTEXT.reset(token)
+
+    def flush(self):
+        """Blocks until every logged message is written to the log files."""
+        for writer in list(self.writers.values()):
+            writer.flush()
+
+    def __sink_path(self, context: dict):
+        """
+        Parameters:
+            - context (dict): Fields of the current record.
+
+        Returns:
+            - Path of the log file receiving the record.
+        """
+        path = CONST.LOGS_PATH
+        suffix = None
+        if self.sink is LogSink.ACCOUNT and 'account' in context:
+            suffix = [str(context[key]) for key in ('server', 'account') if key in context]
+        elif self.sink is LogSink.WORKER:
+            suffix = [str(os.getpid())]
+        if suffix:
+            root, ext = os.path.splitext(path)
+            path = '.'.join([root] + [re.sub('[^A-Za-z0-9_-]+', '_', part) for part in suffix]) + ext
+        return path
+
+    def __writer(self, path: str):
+        """
+        Parameters:
+            - path (str): Log file path.
+
+        Returns:
+            - LogWriter of path and True if it was just created.
+        """
+        writer, created = self.writers.get(path), False
+        if writer is None:
+            with self.writersLock:
+                writer = self.writers.get(path)
+                if writer is None:
+                    writer = self.writers[path] = LogWriter(path)
+                    created = True
+        return writer, created
+
+    def __format(self, level: LogLevel, text: str, context: dict):
+        """
+        Parameters:
+            - level (LogLevel): Level of the message.
             - text (str): Text to log.
+            - context (dict): Fields attached to the record.
+
+        Returns:
+            - Formatted record.
         """
         timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
-        message = '%s - SUCCESS: %s' % (timestamp, text)
-        terminal_message = self.TextColors.SUCCESS + message + self.TextColors.NORMAL
-        with open(CONST.LOGS_PATH, 'a+') as f:
-            f.write(f'{message}\n')
+        if self.structured:
+            message = json.dumps({'time': timestamp, 'level': level.name, **context, 'message': text})
+        else:
+            message = '%s - %s: %s' % (timestamp, level.name, text)
+        return message
+
+    def __log(self, level: LogLevel, text: str, color: str):
+        """
+        Logs text to the log file of the current context with a timestamp.
+
+        Parameters:
+            - level (LogLevel): Level of the message.
+            - text (str): Text to log.
+            - color (str): Color used in debug mode.
+        """
+        if level < self.level:
+            return
+        context = LOG_CONTEXT.get()
+        writer, created = self.__writer(self.__sink_path(context))
+        if created:
+            writer.write(self.__format(LogLevel.SUCCESS, self.START_SESSION, context))
+        message = self.__format(level, text, context)
+        writer.write(message)
         if self.debugMode:
-            print(terminal_message)
+            print(color + message + self.TextColors.NORMAL)
+
+    def success(self, text : str):
+        """
+        Logs text to log file with a timestamp as success notification.
+
+        Parameters:
+            - text (str): Text to log.
+        """
+        self.__log(LogLevel.SUCCESS, text, self.TextColors.SUCCESS)
 
     def info(self, text : str):
         """
@@ -48,13 +347,7 @@ class ProjectLogger:
         Parameters:
             - text (str): Text to log.
         """
-        timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
-        message = '%s - INFO: %s' % (timestamp, text)
-        terminal_message = self.TextColors.INFO + message + self.TextColors.NORMAL
-        with open(CONST.LOGS_PATH, 'a+') as f:
-            f.write(f'{message}\n')
-        if self.debugMode:
-            print(terminal_message)
+        self.__log(LogLevel.INFO, text, self.TextColors.INFO)
 
     def warning(self, text : str):
         """
@@ -63,13 +356,7 @@ class ProjectLogger:
         Parameters:
             - text (str): Text to log.
         """
-        timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
-        message = '%s - WARNING: %s' % (timestamp, text)
-        terminal_message = self.TextColors.WARNING + message + self.TextColors.NORMAL
-        with open(CONST.LOGS_PATH, 'a+') as f:
-            f.write(f'{message}\n')
-        if self.debugMode:
-            print(terminal_message)
+        self.__log(LogLevel.WARNING, text, self.TextColors.WARNING)
 
     def error(self, text : str):
         """
@@ -78,10 +365,4 @@ class ProjectLogger:
         Parameters:
             - text (str): Text to log.
         """
-        timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
-        message = '%s - ERROR: %s' % (timestamp, text)
-        terminal_message = self.TextColors.ERROR + message + self.TextColors.NORMAL
-        with open(CONST.LOGS_PATH, 'a+') as f:
-            f.write(f'{message}\n')
-        if self.debugMode:
-            print(terminal_message)
+        self.__log(LogLevel.ERROR, text, self.TextColors.ERROR)
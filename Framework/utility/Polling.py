@@ -0,0 +1,89 @@
+import threading
+import time
+
+
+# Poll name linked to its PollMetrics
+POLL_METRICS = {}
+POLL_METRICS_LOCK = threading.Lock()
+
+
+# Counters of a named poll, shared by all its calls
+class PollMetrics:
+    __slots__ = ('calls', 'iterations', 'successes', 'timeouts', 'waitTime')
+
+    def __init__(self):
+        self.calls = 0
+        self.iterations = 0
+        self.successes = 0
+        self.timeouts = 0
+        # Seconds spent sleeping between iterations
+        self.waitTime = 0
+
+    def __repr__(self):
+        return f'PollMetrics(calls={self.calls}, iterations={self.iterations}, successes={self.successes}, ' \
+            f'timeouts={self.timeouts}, waitTime={self.waitTime:.2f})'
+
+
+def get_poll_metrics(name : str = None):
+    """
+    Parameters:
+        - name (str): Identifies the poll, None by default.
+
+    Returns:
+        - PollMetrics of name if given, dictionary linking every poll name to its PollMetrics otherwise.
+    """
+    with POLL_METRICS_LOCK:
+        if name is not None:
+            return POLL_METRICS.setdefault(name, PollMetrics())
+        return dict(POLL_METRICS)
+
+
+def poll_until(predicate, timeout : float, initialDelay : float = 0.1, maxDelay : float = 1, factor : float = 2,
+            retryOn : tuple = (), name : str = None):
+    """
+    Calls predicate until it returns a truthy value or the deadline passes, sleeping between calls with exponential
+    backoff.
+
+    Predicate is always called at least once and once more right at the deadline.
+
+    Parameters:
+        - predicate (callable): Called without arguments, a truthy result ends the poll.
+        - timeout (float): Max seconds to poll.
+        - initialDelay (float): First sleep in seconds, 0.1 by default.
+        - maxDelay (float): Max sleep in seconds, 1 by default.
+        - factor (float): Sleep multiplier after each failed call, 2 by default.
+        - retryOn (tuple): Exceptions raised by predicate that count as a failed call, none by default.
+        - name (str): If given, iterations are counted in the PollMetrics of name, None by default.
+
+    Returns:
+        - Last result of predicate, None if it raised on the last call.
+    """
+    ret = None
+    iterations = 0
+    waitTime = 0
+    delay = initialDelay
+    endTime = time.time() + timeout
+    while True:
+        iterations += 1
+        try:
+            ret = predicate()
+        except retryOn:
+            ret = None
+        remaining = endTime - time.time()
+        if ret or remaining <= 0:
+            break
+        sleepTime = min(delay, remaining)
+        time.sleep(sleepTime)
+        waitTime += sleepTime
+        delay = min(delay * factor, maxDelay)
+    if name is not None:
+        metrics = get_poll_metrics(name)
+        with POLL_METRICS_LOCK:
+            metrics.calls += 1
+            metrics.iterations += iterations
+            metrics.waitTime += waitTime
+            if ret:
+                metrics.successes += 1
+            else:
+                metrics.timeouts += 1
+    return ret
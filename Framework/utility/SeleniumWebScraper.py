@@ -1,20 +1,65 @@
 from contextlib import contextmanager
 from enum import Enum
-import time
-from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException, InvalidSelectorException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.expected_conditions import staleness_of
-from selenium.webdriver.support.ui import WebDriverWait
 from Framework.utility.Constants import CHROME_DRIVER_PATH, get_projectLogger
+from Framework.utility.Logger import LogLevel
+from Framework.utility.Polling import poll_until
 
 
 # Project constants
 logger = get_projectLogger()
 
+# Selenium is imported by the first SWS, modules that only need the SWS type stay browser free
+webdriver = None
+NoSuchElementException = TimeoutException = StaleElementReferenceException = InvalidSelectorException = \
+    WebDriverException = None
+By = Command = EC = staleness_of = WebDriverWait = None
+# WebDriver commands loading a page
+PAGE_LOAD_COMMANDS = []
+
+
+def _load_selenium():
+    """Imports selenium on first use."""
+    global webdriver, NoSuchElementException, TimeoutException, StaleElementReferenceException, \
+        InvalidSelectorException, WebDriverException, By, Command, EC, staleness_of, WebDriverWait
+    if webdriver is None:
+        from selenium import webdriver as _webdriver
+        from selenium.common.exceptions import NoSuchElementException, TimeoutException, \
+            StaleElementReferenceException, InvalidSelectorException, WebDriverException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.remote.command import Command
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.expected_conditions import staleness_of
+        from selenium.webdriver.support.ui import WebDriverWait
+        PAGE_LOAD_COMMANDS[:] = [Command.GET, Command.REFRESH, Command.GO_BACK, Command.GO_FORWARD]
+        webdriver = _webdriver
+
+
 # Max time for a page to load
 MAX_PAGE_LOAD_TIME = 30
+# Evaluates several xpaths in one call, returning the requested attribute of the first match (null if missing)
+# Attribute is either shared by all keys or given per key
+SNAPSHOT_SCRIPT = '''
+var props = arguments[0], attrs = arguments[1], result = {};
+for (var key in props) {
+    var attr = typeof attrs === 'string' ? attrs : attrs[key];
+    var node = document.evaluate(props[key], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    result[key] = node ? (attr === 'text' ? node.innerText : node.getAttribute(attr)) : null;
+}
+return result;
+'''
+# Checks if the first node matching an xpath is rendered
+DISPLAYED_SCRIPT = '''
+var node = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return !!node && node.getClientRects().length > 0 && window.getComputedStyle(node).visibility !== 'hidden';
+'''
+# Removes all nodes matching an xpath, returning their count
+REMOVE_SCRIPT = '''
+var nodes = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+for (var i = 0; i < nodes.snapshotLength; i++) {
+    nodes.snapshotItem(i).remove();
+}
+return nodes.snapshotLength;
+'''
 
 
 # Attributes to be retrieved for a WebElement
@@ -30,6 +75,7 @@ class Attr(Enum):
 
 class SWS:
     def __init__(self, headless: bool):
+        _load_selenium()
         options = webdriver.ChromeOptions()
         if headless:  # Set headless = False in order to see the browser
             options.add_argument("--headless")
@@ -41,6 +87,29 @@ class SWS:
         options.add_argument("--disable-extensions")
         options.add_experimental_option('excludeSwitches', ['enable-logging'])
         self.driver = webdriver.Chrome(options=options, executable_path=CHROME_DRIVER_PATH)
+        # Usage counters
+        self.pageLoads = 0
+        self.driverCalls = 0
+        self.__countDriverCalls()
+
+    def __countDriverCalls(self):
+        """Wraps the WebDriver command executor to count every command and every page load."""
+        execute = self.driver.execute
+        def counted_execute(driverCommand, params=None):
+            self.driverCalls += 1
+            if driverCommand in PAGE_LOAD_COMMANDS:
+                self.pageLoads += 1
+            return execute(driverCommand, params)
+        self.driver.execute = counted_execute
+
+    def getUsage(self):
+        """
+        Gets the usage counters.
+
+        Returns:
+            - (pageLoads, driverCalls) issued since the driver was started.
+        """
+        return self.pageLoads, self.driverCalls
 
     def close(self):
         """Close WebDriver."""
@@ -48,6 +117,62 @@ class SWS:
             self.driver.quit()
         self.driver = None
 
+    def reset(self):
+        """
+        Brings the browser back to a clean state so the driver can be reused: closes all tabs but one,
+        loads a blank page and deletes all cookies.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        success = False
+        try:
+            handles = self.driver.window_handles
+            for handle in handles[1:]:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(handles[0])
+            self.driver.get('about:blank')
+            self.driver.delete_all_cookies()
+            success = True
+        except WebDriverException as err:
+            logger.error(f'In reset: Failed to clean browser: {err}')
+        return success
+
+    def getCookies(self):
+        """
+        Gets the cookies of the current page.
+
+        Returns:
+            - List of cookie dictionaries (name, value, domain, path, expiry, secure, httpOnly).
+        """
+        return self.driver.get_cookies()
+
+    def setCookies(self, cookies: list):
+        """
+        Sets cookies through Chrome DevTools, the cookie domains do not need to be loaded first.
+
+        Parameters:
+            - cookies (list): Cookie dictionaries as returned by getCookies().
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        success = False
+        cdpCookies = []
+        for cookie in cookies:
+            cdpCookie = {key: cookie[key] for key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly') \
+                if key in cookie}
+            if 'expiry' in cookie:
+                cdpCookie['expires'] = cookie['expiry']
+            cdpCookies.append(cdpCookie)
+        try:
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cdpCookies})
+            success = True
+        except WebDriverException as err:
+            logger.error(f'In setCookies: Failed to set cookies: {err}')
+        return success
+
     def __seleniumRefreshLock(func):
         """
         Used as decorator to avoid "StaleElementReferenceException" in SeleniumWebScraper functions.
@@ -59,20 +184,13 @@ class SWS:
             - A new function body for func. (Recalling func if StaleElementReferenceException is encountered). 
         """
         def inner_func(*args, **kwargs):
-            ret = None
-            stale = True
-            startTime = time.time()
-            endTime = startTime + MAX_PAGE_LOAD_TIME
-            while stale and startTime < endTime:
-                stale = False
-                startTime = time.time()
-                try:
-                    ret = func(*args, **kwargs)
-                except StaleElementReferenceException:
-                    stale = True
-            if startTime >= endTime:
+            # One element tuple, results of func may be falsy
+            ret = poll_until(lambda: (func(*args, **kwargs),), MAX_PAGE_LOAD_TIME, initialDelay=0.05,
+                maxDelay=0.5, retryOn=StaleElementReferenceException, name='stale element')
+            if ret is None:
                 logger.error(f'In __seleniumRefreshLock: {func.__name__} returned only stale results')
-            return ret
+                return None
+            return ret[0]
         return inner_func
 
     @__seleniumRefreshLock
@@ -97,7 +215,9 @@ class SWS:
         except TimeoutException:
             logger.error(f'In __findElement: Element {prop} generated a timeout')
         except NoSuchElementException:
-            logger.info(f'In __findElement: Element {prop} not found')
+            # Missing elements are expected by most callers, only format the message if it is logged
+            if logger.is_enabled_for(LogLevel.INFO):
+                logger.info(f'In __findElement: Element {prop} not found')
         return elem
 
     @__seleniumRefreshLock
@@ -210,16 +330,24 @@ class SWS:
             - True if operation was successful, False otherwise.
         """
         success = False
+        self.pageLoads += 1
+        initialHandles = set(self.driver.window_handles)
         self.driver.execute_script("window.open('" + URL +"');")
         if switchTo:
-            for handle in self.driver.window_handles:
-                self.driver.switch_to.window(handle)
-                # identify the new tab by URL
-                if URL in self.getCurrentUrl():
-                    success = True
-                    break
+            newHandles = [handle for handle in self.driver.window_handles if handle not in initialHandles]
+            # Identify the new tab by handle, several tabs may share the URL
+            if newHandles:
+                self.driver.switch_to.window(newHandles[0])
+                success = True
             else:
-                logger.error(f'In newTab: Failed to find a tab by identifier {URL}')
+                for handle in self.driver.window_handles:
+                    self.driver.switch_to.window(handle)
+                    # identify the new tab by URL
+                    if URL in self.getCurrentUrl():
+                        success = True
+                        break
+                else:
+                    logger.error(f'In newTab: Failed to find a tab by identifier {URL}')
         else:
             success = True
         return success
@@ -229,7 +357,7 @@ class SWS:
         Switches focus to a tab.
 
         Parameters:
-            - identifier (Int or String): Index of tab or URL.
+            - identifier (Int or String): Index of tab, tab handle or URL.
 
         Returns:
             - True if operation was successful, False otherwise.
@@ -238,6 +366,9 @@ class SWS:
         if isinstance(identifier, int) and identifier < len(self.driver.window_handles):
             self.driver.switch_to.window(self.driver.window_handles[identifier])
             success = True
+        elif isinstance(identifier, str) and identifier in self.driver.window_handles:
+            self.driver.switch_to.window(identifier)
+            success = True
         elif isinstance(identifier, str):
             for handle in self.driver.window_handles:
                 self.driver.switch_to.window(handle)
@@ -250,6 +381,33 @@ class SWS:
             logger.error('In switchToTab: Invalid parameter identifier')
         return success
 
+    def getTabHandle(self):
+        """
+        Returns:
+            - Handle of the current tab, usable with switchToTab.
+        """
+        return str(self.driver.current_window_handle)
+
+    def closeTab(self, identifier=None):
+        """
+        Closes a tab and switches to the first remaining one.
+
+        Parameters:
+            - identifier (Int or String): Index of tab, tab handle or URL, current tab by default.
+
+        Returns:
+            - True if operation was successful, False otherwise.
+        """
+        success = False
+        if identifier is None or self.switchToTab(identifier):
+            if len(self.driver.window_handles) > 1:
+                self.driver.close()
+                self.driver.switch_to.window(self.driver.window_handles[0])
+                success = True
+            else:
+                logger.error('In closeTab: Can not close the last tab')
+        return success
+
     def enter_iframe(self, frameIdentifier: str):
         """
         Enters a frame identified by string.
@@ -286,6 +444,50 @@ class SWS:
             logger.error('In isVisible: Invalid parameter prop')
         return success
 
+    def isDisplayed(self, prop):
+        """
+        Checks whether a WebElement is rendered, unlike isVisible() hidden elements do not count.
+
+        Parameters:
+            - prop (str or [str]): Property to search for.
+
+        Returns:
+            - True if the element is displayed, False otherwise.
+        """
+        success = False
+        if prop:
+            if isinstance(prop, list):
+                prop = ''.join(prop)
+            try:
+                success = bool(self.driver.execute_script(DISPLAYED_SCRIPT, prop))
+            except WebDriverException as err:
+                logger.error(f'In isDisplayed: Failed to evaluate {prop}: {err}')
+        else:
+            logger.error('In isDisplayed: Invalid parameter prop')
+        return success
+
+    def removeElements(self, prop):
+        """
+        Removes WebElements from the page, without reloading it.
+
+        Parameters:
+            - prop (str or [str]): Property to search for.
+
+        Returns:
+            - Number of removed elements, None if error occured.
+        """
+        ret = None
+        if prop:
+            if isinstance(prop, list):
+                prop = ''.join(prop)
+            try:
+                ret = int(self.driver.execute_script(REMOVE_SCRIPT, prop))
+            except WebDriverException as err:
+                logger.error(f'In removeElements: Failed to evaluate {prop}: {err}')
+        else:
+            logger.error('In removeElements: Invalid parameter prop')
+        return ret
+
     @__seleniumRefreshLock
     def getElementAttribute(self, prop, attr: Attr, waitFor: bool = False):
         """
@@ -389,6 +591,28 @@ class SWS:
             logger.error('In getElementsAttributes: Invalid parameter prop')
         return ret
 
+    def getSnapshot(self, props: dict, attr: Attr = Attr.TEXT):
+        """
+        Reads several WebElements at once, in a single WebDriver call.
+
+        Parameters:
+            - props (Dictionary): Links keys to property (str or [str]) to search for.
+            - attr (Attr or Dictionary): Attribute whose value is requested, or dictionary linking each key to its
+            Attr, Attr.TEXT by default.
+
+        Returns:
+            - Dictionary linking each key to the attribute value (None if element is missing), None if error occured.
+        """
+        ret = None
+        xpaths = {key: (''.join(prop) if isinstance(prop, list) else prop) for key, prop in props.items()}
+        attrs = {key: attr[key].value for key in xpaths} if isinstance(attr, dict) else attr.value
+        try:
+            values = self.driver.execute_script(SNAPSHOT_SCRIPT, xpaths, attrs)
+            ret = {key: (str(values[key]).strip() if values.get(key) is not None else None) for key in xpaths}
+        except WebDriverException as err:
+            logger.error(f'In getSnapshot: Failed to evaluate {list(xpaths)}: {err}')
+        return ret
+
     @__seleniumRefreshLock
     def clickElement(self, prop, refresh: bool = False, waitFor: bool = False,
                 scrollIntoView: bool =False, javaScriptClick=False):
@@ -414,6 +638,7 @@ class SWS:
                 if scrollIntoView:
                     self.driver.execute_script("arguments[0].scrollIntoView();", elem)
                 if refresh:
+                    self.pageLoads += 1
                     with self.__waitPageToLoad():
                         if javaScriptClick:
                             self.driver.execute_script("arguments[0].click();", elem)
@@ -7,7 +7,7 @@ sys.path.append('../')
 from Framework.military.academy import TROOPS
 from Framework.utility.SeleniumWebScraper import SWS, Attr
 from Framework.infrastructure.builder import enter_building
-from Framework.utility.Constants import BuildingType, Server, TroopType
+from Framework.utility.Constants import BuildingType, Server, TroopType, get_troop_type_by_name
 from Framework.account.Login import XPATH, login
 from Framework.military.troops_trainer import make_troops_by_amount, reduce_train_time, troop_max_amount
 from Framework.military.upgrade_troops import upgrade_troop_defense, upgrade_troop_offense
@@ -28,16 +28,6 @@ from Framework.military.heros_mansion import name_hero, train_hero
 # 		sws_generator.close()
 # 	sws = None
 
-def get_tpType_by_name(literalName : str):
-	tpType = None
-
-	for i in TroopType:
-		if TROOPS[i].name == literalName:
-			tpType = i
-			break
-	
-	return tpType
-
 class Test_01_military:
 	def test_01_military_01(self):
 		"""
@@ -64,7 +54,7 @@ class Test_01_military:
 
 				for i in range(len(troops)):
 					#S3: Get the maximum amount.
-					max = troop_max_amount(sws, get_tpType_by_name(troops[i]))
+					max = troop_max_amount(sws, get_troop_type_by_name(troops[i]))
 
 					#S4: Sometimes, go in other building than the one where you can train troops
 					if i % 2 == 0:
@@ -72,7 +62,7 @@ class Test_01_military:
 
 					#S5: Call make_troops_by_amount() for every troop.
 					#O5: make_troops_by_amount() should return only True
-					assert make_troops_by_amount(sws, get_tpType_by_name(troops[i]), max % 1000)
+					assert make_troops_by_amount(sws, get_troop_type_by_name(troops[i]), max % 1000)
 
 	# reduce train time button should be available in order to run successfully this test
 	def test_01_military_02(self):
@@ -101,10 +91,10 @@ class Test_01_military:
 				troops = sws.getElementsAttribute('//table[@class="build_details"]//*[@class="tit"]//a', Attr.TEXT)
 
 				for i in troops:
-					max = troop_max_amount(sws, get_tpType_by_name(i))
+					max = troop_max_amount(sws, get_troop_type_by_name(i))
 
 					#S2: Call make_troops_by_amount() for every troop.
-					assert make_troops_by_amount(sws, get_tpType_by_name(i), max % 1000)
+					assert make_troops_by_amount(sws, get_troop_type_by_name(i), max % 1000)
 
 
 				#S3: Call reduce_train_time() before leaving a building.
@@ -139,10 +129,10 @@ class Test_01_military:
 				troops = sws.getElementsAttribute('//table[@class="build_details"]//*[@class="tit"]//a', Attr.TEXT)
 
 				for i in troops:
-					max = troop_max_amount(sws, get_tpType_by_name(i))
+					max = troop_max_amount(sws, get_troop_type_by_name(i))
 
 					#S2: Call make_troops_by_amount() for every troop.
-					assert make_troops_by_amount(sws, get_tpType_by_name(i), int(max % 1000))
+					assert make_troops_by_amount(sws, get_troop_type_by_name(i), int(max % 1000))
 
 
 				#S3: Call reduce_train_time() before leaving a building.
@@ -182,7 +172,7 @@ class Test_01_military:
 						break
 
 				if index != -1:
-					troop = get_tpType_by_name(troopsName[index])
+					troop = get_troop_type_by_name(troopsName[index])
 					currentLevel = sws.getElementAttribute(f'//*[@class="build_details"]\
 															//tr[{index + 1}]//*[@class="info"]', Attr.TEXT)
 					currentLevel = currentLevel.split()
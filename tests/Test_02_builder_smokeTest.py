@@ -7,8 +7,8 @@ sys.path.append(os.path.join(sys.path[0], '../'))
 
 from Framework.account.Login import Login
 from Framework.utility.SeleniumWebScraper import SWS
-from Framework.infrastructure.builder import BuildingError, RESOURCE_FIELDS, construct_building, demolish_building_at, find_building, \
-    level_up_building_at
+from Framework.infrastructure.builder import BuildingError, RESOURCE_FIELDS, construct_building, construct_many, \
+    demolish_building_at, find_building, level_up_building_at
 from Framework.infrastructure.buildings import get_village_data
 from Framework.utility.Constants import BuildingType, Server
 
@@ -121,8 +121,7 @@ class Test_02_builder_smokeTest:
             # S4. Construct all no requirements buildings.
             expected_buildings = [BuildingType.MainBuilding, BuildingType.RallyPoint, BuildingType.Wall, \
                 BuildingType.Cranny]
-            for bd in expected_buildings:
-                construct_building(sws, bd, True, True)
+            construct_many(sws, [(bd, 1) for bd in expected_buildings], True, True)
             # O4. Only buildings in village:
             # - Main Building
             # - Rally Point
@@ -0,0 +1,67 @@
+import pytest
+import sys
+import os
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+np = pytest.importorskip('numpy')
+from Framework.infrastructure.costs import BuildingCosts, get_cost_table
+from Framework.infrastructure.simulator import evaluate_build_orders, random_build_orders, required_steps
+from Framework.utility.Constants import BuildingType
+
+
+@pytest.fixture
+def learned_costs():
+    """Fills the learned cost table in memory with linear costs and restores it afterwards."""
+    costTable = get_cost_table()
+    backup = dict(costTable)
+    for bdType in BuildingType:
+        costTable[bdType] = {level: BuildingCosts(40 * level, 50 * level, 30 * level, 20 * level, 1, 60 * level) \
+            for level in range(1, 21)}
+    yield costTable
+    costTable.clear()
+    costTable.update(backup)
+
+
+class Test_03_simulator:
+    def test_03_simulator_01(self, learned_costs):
+        """
+        Id: 01
+        Description: Test if random build orders for a goal are all evaluated and reach the goal.
+        Steps:
+            1. Generate 500 random build orders for a goal.
+            2. Evaluate the build orders.
+        Objectives:
+            1. Each build order should contain exactly the required steps.
+            2. Every strategy should reach the goal and the best one should have the lowest time.
+        """
+        goal = {BuildingType.Woodcutter: 1, BuildingType.MainBuilding: 3, BuildingType.Warehouse: 1}
+        # S1. Generate 500 random build orders for a goal.
+        orders = random_build_orders(goal, 500, seed=0)
+        # O1. Each build order should contain exactly the required steps.
+        assert orders.shape == (500, len(required_steps(goal)))
+        assert all(sorted(row) == sorted(int(bd) for bd in required_steps(goal)) for row in orders.tolist())
+
+        # S2. Evaluate the build orders.
+        report = evaluate_build_orders(orders, goal)
+        # O2. Every strategy should reach the goal and the best one should have the lowest time.
+        assert report.reached.all()
+        assert report.timeToGoal[report.best] == np.min(report.timeToGoal)
+
+    def test_03_simulator_02(self, learned_costs):
+        """
+        Id: 02
+        Description: Test if invalid build orders are reported as failing.
+        Steps:
+            1. Evaluate a build order breaking requirements and one with missing costs.
+        Objectives:
+            1. Neither strategy should reach the goal, the second one should be marked with unknown costs.
+        """
+        goal = {BuildingType.Sawmill: 1}
+        del learned_costs[BuildingType.Cranny]
+        # S1. Evaluate a build order breaking requirements and one with missing costs.
+        report = evaluate_build_orders([[BuildingType.Sawmill], [BuildingType.Cranny, BuildingType.Sawmill]], goal)
+        # O1. Neither strategy should reach the goal, the second one should be marked with unknown costs.
+        assert not report.reached.any()
+        assert report.unknownCosts.tolist() == [False, True]
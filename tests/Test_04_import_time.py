@@ -0,0 +1,51 @@
+import pytest
+import sys
+import os
+import subprocess
+
+# Path to root
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT_PATH)
+
+from Framework.utility.Constants import LOGS_PATH
+
+
+# Modules imported by a worker that never opens a browser
+MODULES = ['Framework.account.AccountLibraryManager', 'Framework.infrastructure.builder',
+    'Framework.military.troops_trainer']
+# Generous budget, a regression to eager initialisation shows up in the side effects first
+MAX_IMPORT_TIME = 1.0
+IMPORT_SCRIPT = '''
+import sys, time
+startTime = time.perf_counter()
+%s
+print(time.perf_counter() - startTime)
+print('selenium' in sys.modules)
+from Framework.utility import Constants
+print(Constants.BUILDINGS_DATA_Instance is None)
+''' % '\n'.join(f'import {module}' for module in MODULES)
+
+
+class Test_04_import_time:
+    def test_04_import_time_01(self):
+        """
+        Id: 01
+        Description: Test if importing the framework is fast and free of side effects.
+        Steps:
+            1. Import browser-free modules in a fresh interpreter.
+        Objectives:
+            1. Import should take less than MAX_IMPORT_TIME seconds.
+            2. Selenium and game data should not be loaded and the log file should be untouched.
+        """
+        logSize = os.path.getsize(LOGS_PATH) if os.path.exists(LOGS_PATH) else None
+        # S1. Import browser-free modules in a fresh interpreter.
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], cwd=ROOT_PATH, capture_output=True,
+            text=True, env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)})
+        assert output.returncode == 0, output.stderr
+        elapsed, seleniumLoaded, dataMissing = output.stdout.split()
+        # O1. Import should take less than MAX_IMPORT_TIME seconds.
+        assert float(elapsed) < MAX_IMPORT_TIME
+        # O2. Selenium and game data should not be loaded and the log file should be untouched.
+        assert seleniumLoaded == 'False'
+        assert dataMissing == 'True'
+        assert logSize == (os.path.getsize(LOGS_PATH) if os.path.exists(LOGS_PATH) else None)
@@ -0,0 +1,103 @@
+import pytest
+import sys
+import os
+import json
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+import Framework.utility.Constants as CONST
+from Framework.utility.Logger import LogLevel, LogSink, LogWriter, ProjectLogger
+
+
+class Test_05_logger:
+    def test_05_logger_01(self, tmp_path):
+        """
+        Id: 01
+        Description: Test if queued log lines are written in order and the log file is rotated.
+        Steps:
+            1. Write lines through a LogWriter with a small max log size.
+            2. Flush the writer.
+        Objectives:
+            1. Writing should never block or drop lines while the queue has room.
+            2. Every line should be written in order across the log file and its backups.
+        """
+        path = str(tmp_path / 'execution.log')
+        writer = LogWriter(path)
+        writer.MAX_LOG_SIZE = 1000
+        lines = [f'line {index:05d}' for index in range(5000)]
+        # S1. Write lines through a LogWriter with a small max log size.
+        queued = [writer.write(line) for line in lines]
+        # O1. Writing should never block or drop lines while the queue has room.
+        assert all(queued)
+
+        # S2. Flush the writer.
+        writer.flush()
+        # O2. Every line should be written in order across the log file and its backups.
+        files = [f'{path}.{index}' for index in range(writer.BACKUP_COUNT, 0, -1)] + [path]
+        assert all(os.path.exists(file) for file in files)
+        written = []
+        for file in files:
+            with open(file, 'r') as f:
+                written += f.read().splitlines()
+        assert written == lines[-len(written):]
+        assert os.path.getsize(path) < writer.MAX_LOG_SIZE + LogWriter.BATCH_SIZE * len(lines[0])
+
+    def test_05_logger_02(self, tmp_path, monkeypatch):
+        """
+        Id: 02
+        Description: Test if records are filtered by level and routed to per-account JSON-lines files.
+        Steps:
+            1. Log messages of every level with a WARNING threshold, inside and outside an account context.
+        Objectives:
+            1. Only warnings and errors should be written.
+            2. Account records should go to their own file and carry the account fields.
+        """
+        monkeypatch.setattr(CONST, 'LOGS_PATH', str(tmp_path / 'execution.log'))
+        logger = ProjectLogger()
+        logger.configure(level=LogLevel.WARNING, structured=True, sink=LogSink.ACCOUNT)
+        # S1. Log messages of every level with a WARNING threshold, inside and outside an account context.
+        with logger.context(server='S1', account='user'):
+            for log in [logger.info, logger.success, logger.warning, logger.error]:
+                log('account message')
+        logger.error('shared message')
+        logger.flush()
+        # O1. Only warnings and errors should be written.
+        # First record of each file is the start message
+        with open(tmp_path / 'execution.S1.user.log', 'r') as f:
+            records = [json.loads(line) for line in f.read().splitlines()][1:]
+        assert [record['level'] for record in records] == ['WARNING', 'ERROR']
+        # O2. Account records should go to their own file and carry the account fields.
+        assert all(record['server'] == 'S1' and record['account'] == 'user' for record in records)
+        with open(tmp_path / 'execution.log', 'r') as f:
+            records = [json.loads(line) for line in f.read().splitlines()][1:]
+        assert [record['message'] for record in records] == ['shared message']
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requires fork')
+    def test_05_logger_03(self, tmp_path, monkeypatch):
+        """
+        Id: 03
+        Description: Test if a forked child logs through its own writer.
+        Steps:
+            1. Log in the parent, fork, log and flush in the child.
+        Objectives:
+            1. Flushing in the child should return and the lines of both processes should be written.
+        """
+        monkeypatch.setattr(CONST, 'LOGS_PATH', str(tmp_path / 'execution.log'))
+        logger = ProjectLogger()
+        # S1. Log in the parent, fork, log and flush in the child.
+        logger.error('parent message')
+        logger.flush()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                logger.error('child message')
+                logger.flush()
+            finally:
+                os._exit(0)
+        # O1. Flushing in the child should return and the lines of both processes should be written.
+        _, status = os.waitpid(pid, 0)
+        assert status == 0
+        with open(tmp_path / 'execution.log', 'r') as f:
+            lines = f.read().splitlines()
+        assert [line.split(': ', 1)[1] for line in lines[1:]] == ['parent message', 'child message']
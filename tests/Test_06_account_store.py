@@ -0,0 +1,192 @@
+import pytest
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+from Framework.account.AccountStore import JsonAccountStore, SqliteAccountStore, export_json_library, \
+    import_json_library
+from Framework.utility.Constants import ACCOUNT_LIBRARY_PATH, Server
+
+
+def append_accounts(path : str, worker : int, count : int):
+    """Appends count accounts from a separate process."""
+    store = JsonAccountStore(path)
+    return all(store.append(Server.S1, f'worker{worker}_{index}', 'pwd') for index in range(count))
+
+
+def reserve_numbers(path : str, count : int):
+    """Reserves count generic numbers one by one from a separate process."""
+    store = JsonAccountStore(path) if path.endswith('.json') else SqliteAccountStore(path)
+    return [store.reserve_numbers(Server.S1, 'DocanuMani')[0] for _ in range(count)]
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    """SQLite account store in a temporary file."""
+    store = SqliteAccountStore(str(tmp_path / 'accounts.sqlite3'))
+    yield store
+    store.close()
+
+
+class Test_06_account_store:
+    def test_06_account_store_01(self, sqlite_store):
+        """
+        Id: 01
+        Description: Test if accounts are stored and retrieved from a SQLite store.
+        Steps:
+            1. Append accounts with a generic prefix and a duplicate to each server.
+            2. Reset one server.
+        Objectives:
+            1. Lookups should return the inserted data and the duplicate should be ignored.
+            2. Only the reset server should be empty.
+        """
+        GEN = 'DocanuMani'
+        usernames = [GEN + str(index) for index in range(3)]
+        # S1. Append accounts with a generic prefix and a duplicate to each server.
+        for sv in Server:
+            assert sqlite_store.append(sv, 'other', 'other')
+            for user in usernames:
+                assert sqlite_store.append(sv, user, user)
+            assert sqlite_store.append(sv, usernames[0], 'changed')
+        # O1. Lookups should return the inserted data and the duplicate should be ignored.
+        for sv in Server:
+            assert sqlite_store.get_usernames(sv, GEN) == usernames
+            assert sqlite_store.get_password(sv, usernames[0]) == usernames[0]
+            assert sqlite_store.get_last_account(sv) == (usernames[-1], usernames[-1])
+            assert sqlite_store.get_password(sv, 'missing') is None
+
+        # S2. Reset one server.
+        assert sqlite_store.reset(Server.S1)
+        # O2. Only the reset server should be empty.
+        assert sqlite_store.get_last_account(Server.S1) is None
+        assert all(sqlite_store.get_usernames(sv) for sv in Server if sv is not Server.S1)
+
+    def test_06_account_store_02(self, sqlite_store, tmp_path):
+        """
+        Id: 02
+        Description: Test if `account_library.json` survives an import / export round trip.
+        Steps:
+            1. Import `account_library.json` into a SQLite store.
+            2. Export the store to a new JSON file.
+        Objectives:
+            2. The exported library should match the original one.
+        """
+        # S1. Import `account_library.json` into a SQLite store.
+        assert import_json_library(sqlite_store, ACCOUNT_LIBRARY_PATH)
+
+        # S2. Export the store to a new JSON file.
+        exportPath = str(tmp_path / 'account_library.json')
+        assert export_json_library(sqlite_store, exportPath)
+        # O2. The exported library should match the original one.
+        assert JsonAccountStore(exportPath).export_library() == JsonAccountStore(ACCOUNT_LIBRARY_PATH).export_library()
+
+    def test_06_account_store_03(self, tmp_path):
+        """
+        Id: 03
+        Description: Test if the JSON store cache follows changes made by other processes.
+        Steps:
+            1. Look up an account through a JSON store.
+            2. Append an account to the same file through another store.
+        Objectives:
+            1. The account should be found.
+            2. The first store should see the new account.
+        """
+        path = str(tmp_path / 'account_library.json')
+        assert export_json_library(JsonAccountStore(ACCOUNT_LIBRARY_PATH), path)
+        store, otherStore = JsonAccountStore(path), JsonAccountStore(path)
+        # S1. Look up an account through a JSON store.
+        assert store.append(Server.S1, 'cached', 'cached')
+        # O1. The account should be found.
+        assert store.get_password(Server.S1, 'cached') == 'cached'
+
+        # S2. Append an account to the same file through another store.
+        assert otherStore.append(Server.S1, 'external', 'external')
+        # O2. The first store should see the new account.
+        assert store.get_password(Server.S1, 'external') == 'external'
+        assert store.get_last_account(Server.S1) == ('external', 'external')
+
+    def test_06_account_store_04(self, tmp_path):
+        """
+        Id: 04
+        Description: Test if concurrent appends from several processes are all kept.
+        Steps:
+            1. Append accounts to the same JSON library from 4 processes at once.
+        Objectives:
+            1. Every account should be in the library, which should stay valid.
+        """
+        WORKERS, COUNT = 4, 60
+        path = str(tmp_path / 'account_library.json')
+        assert export_json_library(JsonAccountStore(ACCOUNT_LIBRARY_PATH), path)
+        # S1. Append accounts to the same JSON library from 4 processes at once.
+        with ProcessPoolExecutor(WORKERS) as executor:
+            results = list(executor.map(append_accounts, [path] * WORKERS, range(WORKERS), [COUNT] * WORKERS))
+        assert all(results)
+        # O1. Every account should be in the library, which should stay valid.
+        store = JsonAccountStore(path)
+        assert store.compact()
+        usernames = store.get_usernames(Server.S1, 'worker')
+        assert sorted(usernames) == sorted(f'worker{worker}_{index}' for worker in range(WORKERS) \
+            for index in range(COUNT))
+
+    @pytest.mark.parametrize('fileName', ['account_library.json', 'accounts.sqlite3'])
+    def test_06_account_store_05(self, tmp_path, fileName):
+        """
+        Id: 05
+        Description: Test if generic usernames reserved concurrently are unique and follow existing accounts.
+        Steps:
+            1. Add generic accounts up to number 7.
+            2. Reserve numbers from 4 processes at once, then a batch of 5.
+        Objectives:
+            2. Numbers should be unique and consecutive, starting after 7.
+        """
+        WORKERS, COUNT = 4, 10
+        path = str(tmp_path / fileName)
+        store = JsonAccountStore(path) if fileName.endswith('.json') else SqliteAccountStore(path)
+        # S1. Add generic accounts up to number 7.
+        assert import_json_library(store, ACCOUNT_LIBRARY_PATH)
+        for user in ['DocanuMani2', 'DocanuMani7', 'DocanuManiX']:
+            assert store.append(Server.S1, user, user)
+
+        # S2. Reserve numbers from 4 processes at once, then a batch of 5.
+        with ProcessPoolExecutor(WORKERS) as executor:
+            results = list(executor.map(reserve_numbers, [path] * WORKERS, [COUNT] * WORKERS))
+        batch = store.reserve_numbers(Server.S1, 'DocanuMani', 5)
+        # O2. Numbers should be unique and consecutive, starting after 7.
+        numbers = sorted(number for result in results for number in result)
+        assert numbers == list(range(8, 8 + WORKERS * COUNT))
+        assert batch == list(range(8 + WORKERS * COUNT, 13 + WORKERS * COUNT))
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requires fork')
+    def test_06_account_store_06(self, sqlite_store):
+        """
+        Id: 06
+        Description: Test if forked children write through a SQLite store opened by their parent.
+        Steps:
+            1. Use the store in the parent, fork 4 children appending accounts and reserving numbers through it.
+        Objectives:
+            1. Every child should succeed on its own connection, its accounts and numbers should be seen by the parent.
+        """
+        WORKERS, COUNT = 4, 20
+        # S1. Use the store in the parent, fork 4 children appending accounts and reserving numbers through it.
+        assert sqlite_store.reserve_numbers(Server.S1, 'DocanuMani') == [1]
+        parentConnection = sqlite_store.connection
+        pids = []
+        for worker in range(WORKERS):
+            pid = os.fork()
+            if pid == 0:
+                status = 1
+                try:
+                    appended = all(sqlite_store.append(Server.S1, f'worker{worker}_{index}', 'pwd') \
+                        for index in range(COUNT))
+                    reserved = sqlite_store.reserve_numbers(Server.S1, 'DocanuMani')
+                    status = 0 if appended and reserved and sqlite_store.connection is not parentConnection else 1
+                finally:
+                    os._exit(status)
+            pids.append(pid)
+        # O1. Every child should succeed on its own connection, its accounts and numbers should be seen by the parent.
+        assert all(os.waitpid(pid, 0)[1] == 0 for pid in pids)
+        assert len(sqlite_store.get_usernames(Server.S1, 'worker')) == WORKERS * COUNT
+        assert sqlite_store.reserve_numbers(Server.S1, 'DocanuMani') == [WORKERS + 2]
@@ -0,0 +1,290 @@
+import pytest
+import sys
+import os
+import re
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from functools import partial
+from urllib.parse import parse_qs, urlsplit
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+import Framework.utility.Constants as CONST
+from Framework.account.AccountFarm import AccountFarm, DriverPool, create_account_job, set_driver_pool
+from Framework.account.AccountStore import JsonAccountStore, export_json_library, get_account_store, \
+    set_account_store
+from Framework.account.Mailbox import LocalSMTPMailbox
+from Framework.utility.Constants import ACCOUNT_LIBRARY_PATH, Server, get_projectLogger
+from fakes import FakeBrowser, FakeHandler
+
+
+logger = get_projectLogger()
+# Seconds spent by the stand-in job in each stage
+STAGE_TIME = 0.2
+# Times `Skip tasks` is pressed before the missions are refused
+SKIP_COUNT = 3
+REGISTER_PAGE = '''<html><body><form action="register.php" method="post">
+<input id="name" name="name" type="text">
+<input id="pw1" name="pw1" type="password"><input id="pw2" name="pw2" type="password">
+<input id="mail" name="email" type="text"><input id="mail2" name="email2" type="text">
+<input id="vid1" name="vid" type="radio" value="1"><label for="vid1">Roman</label>
+<input id="vid2" name="vid" type="radio" value="2"><label for="vid2">Teuton</label>
+<input id="vid3" name="vid" type="radio" value="3"><label for="vid3">Gaul</label>
+<input id="kid1" name="kid" type="radio" value="1"><label for="kid1">+|+</label>
+<input id="kid2" name="kid" type="radio" value="2"><label for="kid2">-|-</label>
+<input id="chk" name="agb" type="checkbox" value="1">
+<input type="submit" value="Continue">
+</form></body></html>'''
+STATUS_PAGE = '<html><body><fieldset><legend>{}</legend><div>{}</div></fieldset></body></html>'
+LOGIN_PAGE = '''<html><body><form action="login.php" method="post">
+<input id="name" name="user" type="text"><input id="pass" name="pw" type="password">
+<input type="submit" value="Log in">
+</form></body></html>'''
+
+
+def fake_create_account(job, stageTimes):
+    """Stand-in for a browser job, fails for usernames ending in 3 and raises for usernames ending in 4."""
+    for stage in ['email', 'registration', 'activation']:
+        time.sleep(STAGE_TIME)
+        stageTimes[stage] = STAGE_TIME
+    logger.info(f'In fake_create_account: Finished job of {job.username}')
+    if job.username.endswith('4'):
+        raise RuntimeError('Browser crashed')
+    return not job.username.endswith('3')
+
+
+def village_page(account : dict, dialog : bool):
+    """
+    Returns:
+        - Village page of account, with the mission dialog if dialog is set.
+    """
+    body = '<div id="side_info">Village</div>'
+    if account['skips'] < SKIP_COUNT:
+        body += '<a id="qgei" href="village1.php?quest">Tasks</a>'
+    elif not account['setup']:
+        body += '<a href="village1.php?continue">Continue</a>'
+    if dialog:
+        body += '<div class="popup3 quest"><div id="qstd"><h1>Welcome to Zravian!</h1>'
+        if account['skips'] < SKIP_COUNT:
+            body += '<a href="village1.php?skip">Skip tasks</a>'
+        body += '</div><a class="popup4" href="village1.php">Close</a></div>'
+    return f'<html><body>{body}</body></html>'
+
+
+# Stand-in for the registration, activation and login flows of a Zravian server, activation mails go over SMTP
+class FakeZravianHandler(FakeHandler):
+    def logged_account(self):
+        sessionRe = re.search(r'sid=sid-(\w+)', self.headers.get('Cookie', ''))
+        return self.server.accounts.get(sessionRe.group(1)) if sessionRe else None
+
+    def send_activation_mail(self, username : str, address : str, code : str):
+        message = EmailMessage()
+        message['From'] = 'noreply@zravian.com'
+        message['To'] = address
+        message['Subject'] = 'Zravian account activation'
+        message.set_content(f'Activate your account:\n{self.server.url}activate.php?name={username}&code={code}\n')
+        with smtplib.SMTP(*self.server.smtpAddress, timeout=5) as smtp:
+            smtp.send_message(message)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == '/register.php':
+            self.reply(200, REGISTER_PAGE)
+        elif url.path == '/activate.php':
+            account = self.server.accounts.get(query.get('name', [''])[0])
+            if account and query.get('code') == [account['code']]:
+                account['active'] = True
+                self.reply(200, STATUS_PAGE.format('Success', 'Account activated'))
+            else:
+                self.reply(200, STATUS_PAGE.format('Error', 'Wrong activation code'))
+        elif url.path == '/village1.php':
+            account = self.logged_account()
+            if account is None:
+                self.reply(302, headers={'Location': '/'})
+            else:
+                if url.query == 'skip':
+                    account['skips'] += 1
+                elif url.query == 'continue':
+                    account['setup'] = account['skips'] >= SKIP_COUNT
+                self.reply(200, village_page(account, url.query in ('quest', 'skip')))
+        else:
+            self.reply(200, LOGIN_PAGE)
+
+    def do_POST(self):
+        fields = {name: values[0] for name, values in \
+            parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode()).items()}
+        if self.path == '/register.php':
+            username = fields.get('name')
+            with self.server.lock:
+                nameInUse = username in self.server.accounts
+                if not nameInUse:
+                    account = {'password': fields.get('pw1'), 'code': f'code-{username}', 'active': False,
+                        'skips': 0, 'setup': False, 'fields': fields}
+                    self.server.accounts[username] = account
+            if nameInUse:
+                self.reply(200, STATUS_PAGE.format('Error', 'Name in use!'))
+            elif fields.get('pw1') != fields.get('pw2') or fields.get('email') != fields.get('email2') or \
+                    not all(fields.get(name) for name in ('vid', 'kid', 'agb')):
+                self.reply(200, STATUS_PAGE.format('Error', 'Invalid form'))
+            else:
+                self.send_activation_mail(username, fields['email'], account['code'])
+                self.reply(200, STATUS_PAGE.format('Success', 'Registration successful'))
+        elif self.path == '/login.php':
+            account = self.server.accounts.get(fields.get('user'))
+            if account and account['active'] and account['password'] == fields.get('pw'):
+                self.reply(302, headers={'Location': '/village1.php',
+                    'Set-Cookie': f'sid=sid-{fields["user"]}; Path=/; HttpOnly'})
+            else:
+                self.reply(200, LOGIN_PAGE)
+        else:
+            self.reply(404)
+
+
+# Driver whose browser can never be cleaned
+class BrokenDriver:
+    def __init__(self, headless : bool):
+        self.driver = True
+
+    def reset(self):
+        return False
+
+    def close(self):
+        self.driver = None
+
+
+@pytest.fixture
+def account_store(tmp_path):
+    """Copy of `account_library.json` used as account store."""
+    path = str(tmp_path / 'account_library.json')
+    assert export_json_library(JsonAccountStore(ACCOUNT_LIBRARY_PATH), path)
+    previousStore = get_account_store()
+    set_account_store(JsonAccountStore(path))
+    yield get_account_store()
+    set_account_store(previousStore)
+
+
+@pytest.fixture
+def mailbox():
+    """Local SMTP mailbox on a free port."""
+    with LocalSMTPMailbox() as mailbox:
+        yield mailbox
+
+
+@pytest.fixture
+def zravian_server(mailbox, session_store, start_fake_server):
+    """Fake server sending its mails to mailbox, sessions are stored in a temporary session store."""
+    server = start_fake_server(FakeZravianHandler)
+    server.smtpAddress = (mailbox.host, mailbox.port)
+    server.accounts = {}
+    server.lock = threading.Lock()
+    return server
+
+
+@pytest.fixture
+def driver_pool(zravian_server):
+    """Driver pool of the farm, opening browser stand-ins of the fake server."""
+    driverPool = DriverPool(1, driverFactory=lambda headless: FakeBrowser(zravian_server.url))
+    set_driver_pool(driverPool)
+    yield driverPool
+    driverPool.close()
+    set_driver_pool(None)
+
+
+class Test_07_account_farm:
+    @pytest.mark.parametrize('useProcesses', [False, True])
+    def test_07_account_farm_01(self, account_store, tmp_path, monkeypatch, useProcesses):
+        """
+        Id: 01
+        Description: Test if the farm creates accounts concurrently with unique usernames and reports failures.
+        Steps:
+            1. Run a farm of 4 workers creating 8 accounts with a stand-in job.
+        Objectives:
+            1. Every username should be unique and every job should be reported.
+            2. Failed and crashed jobs should be reported with their error.
+            3. Jobs should run concurrently and stage latencies should be reported.
+            4. Log lines of every job should be written, also from worker processes.
+        """
+        WORKERS, COUNT = 4, 8
+        monkeypatch.setattr(CONST, 'LOGS_PATH', str(tmp_path / 'execution.log'))
+        # S1. Run a farm of 4 workers creating 8 accounts with a stand-in job.
+        farm = AccountFarm(WORKERS, useProcesses, fake_create_account)
+        report = farm.run(COUNT, Server.S1)
+        # O1. Every username should be unique and every job should be reported.
+        usernames = [result.username for result in report.results]
+        assert len(set(usernames)) == COUNT
+        # O2. Failed and crashed jobs should be reported with their error.
+        failed = [result for result in report.results if not result.success]
+        assert report.failed == len(failed) and report.created == COUNT - len(failed)
+        assert all(result.error for result in failed)
+        assert any('Browser crashed' in result.error for result in failed) == any(name.endswith('4') for name in usernames)
+        # O3. Jobs should run concurrently and stage latencies should be reported.
+        assert report.duration < COUNT * 3 * STAGE_TIME / 2
+        assert set(report.stageLatencies) == {'email', 'registration', 'activation'}
+        # O4. Log lines of every job should be written, also from worker processes.
+        logger.flush()
+        with open(tmp_path / 'execution.log', 'r') as f:
+            logs = f.read()
+        assert all(f'Finished job of {username}' in logs for username in usernames)
+
+    def test_07_account_farm_02(self, account_store, mailbox, zravian_server, driver_pool):
+        """
+        Id: 02
+        Description: Test if the default job registers, activates and sets up accounts with pooled drivers.
+        Steps:
+            1. Run a farm of 2 workers creating 4 accounts on a fake server, activation mails going to a local
+            SMTP mailbox.
+        Objectives:
+            1. Every account should be registered with the form data, activated, set up and stored.
+            2. Jobs should share the pooled drivers and every stage should be reported.
+        """
+        WORKERS, COUNT = 2, 4
+        # S1. Run a farm of 2 workers creating 4 accounts on a fake server, activation mails going to a local
+        # SMTP mailbox.
+        farm = AccountFarm(WORKERS, createFunction=partial(create_account_job, mailbox=mailbox))
+        report = farm.run(COUNT, Server.S1, doTasks=False)
+        # O1. Every account should be registered with the form data, activated, set up and stored.
+        assert report.created == COUNT, [result.error for result in report.results]
+        for result in report.results:
+            account = zravian_server.accounts[result.username]
+            assert account['active'] and account['setup']
+            assert account['fields']['vid'] == '2' and account['fields']['kid'] == '1'
+            assert account['fields']['email'].endswith(f'@{mailbox.domain}')
+            assert account_store.get_password(Server.S1, result.username) == result.username
+        # O2. Jobs should share the pooled drivers and every stage should be reported.
+        assert 0 < driver_pool.opened <= WORKERS and len(driver_pool.idle) == driver_pool.opened
+        assert set(report.stageLatencies) == {'email', 'registration', 'activation', 'login', 'setup'}
+
+    def test_07_account_farm_03(self):
+        """
+        Id: 03
+        Description: Test if a caller waiting for a driver gets a new one when the lent driver can not be cleaned.
+        Steps:
+            1. Borrow the only driver of a pool and wait for a driver from another thread.
+            2. Return the borrowed driver, its reset fails.
+        Objectives:
+            1. The other thread should wait while the driver is lent.
+            2. The broken driver should be closed and the other thread should get a new driver.
+        """
+        driverPool = DriverPool(1, driverFactory=BrokenDriver)
+        lent = []
+
+        def borrow():
+            with driverPool.driver():
+                lent.append(driverPool.opened)
+        waiter = threading.Thread(target=borrow, daemon=True)
+        # S1. Borrow the only driver of a pool and wait for a driver from another thread.
+        with driverPool.driver() as sws:
+            waiter.start()
+            waiter.join(0.2)
+            # O1. The other thread should wait while the driver is lent.
+            assert waiter.is_alive() and not lent
+        # S2. Return the borrowed driver, its reset fails.
+        waiter.join(5)
+        # O2. The broken driver should be closed and the other thread should get a new driver.
+        assert not waiter.is_alive()
+        assert sws.driver is None
+        assert lent == [1]
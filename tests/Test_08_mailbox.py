@@ -0,0 +1,85 @@
+import pytest
+import sys
+import os
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+from Framework.account.Mailbox import LocalSMTPMailbox, extract_activation_link
+
+
+ACTIVATION_LINK = 'https://zravian.com/activate.php?id=1234&code=abcd'
+
+
+def send_activation_mail(mailbox : LocalSMTPMailbox, address : str):
+    """Sends an activation mail to address through the SMTP server of mailbox."""
+    message = EmailMessage()
+    message['From'] = 'noreply@zravian.com'
+    message['To'] = address
+    message['Subject'] = 'Zravian account activation'
+    message.set_content(f'Welcome!\n.\nActivate your account:\n{ACTIVATION_LINK}\n')
+    with smtplib.SMTP(mailbox.host, mailbox.port, timeout=5) as smtp:
+        smtp.send_message(message)
+
+
+@pytest.fixture
+def mailbox():
+    """Local SMTP mailbox on a free port."""
+    with LocalSMTPMailbox() as mailbox:
+        yield mailbox
+
+
+class Test_08_mailbox:
+    def test_08_mailbox_01(self, mailbox):
+        """
+        Id: 01
+        Description: Test if a waiter is woken up by the activation mail sent to its address.
+        Steps:
+            1. Create two addresses and wait for the first one from another thread.
+            2. Send the activation mail to the first address.
+        Objectives:
+            1. No activation link should be available yet.
+            2. The waiter should get the link as soon as the mail arrives, the other address should stay empty.
+        """
+        # S1. Create two addresses and wait for the first one from another thread.
+        address, otherAddress = mailbox.new_address(), mailbox.new_address()
+        result = {}
+        waiter = threading.Thread(target=lambda: result.update(link=mailbox.wait_for_link(address, 10)))
+        waiter.start()
+        # O1. No activation link should be available yet.
+        assert address != otherAddress
+        assert mailbox.poll_link(address) is None
+
+        # S2. Send the activation mail to the first address.
+        startTime = time.time()
+        send_activation_mail(mailbox, address)
+        waiter.join()
+        # O2. The waiter should get the link as soon as the mail arrives, the other address should stay empty.
+        assert result['link'] == ACTIVATION_LINK
+        assert time.time() - startTime < 1
+        assert mailbox.poll_link(address) == ACTIVATION_LINK
+        assert mailbox.poll_link(otherAddress) is None
+        assert mailbox.wait_for_link(otherAddress, 0.1) is None
+
+    def test_08_mailbox_02(self, mailbox):
+        """
+        Id: 02
+        Description: Test if mails of released or unknown addresses are ignored.
+        Steps:
+            1. Release an address and send mails to it and to an unknown address.
+        Objectives:
+            1. Neither address should have an activation link.
+        """
+        address = mailbox.new_address()
+        # S1. Release an address and send mails to it and to an unknown address.
+        mailbox.release(address)
+        send_activation_mail(mailbox, address)
+        send_activation_mail(mailbox, f'unknown@{mailbox.domain}')
+        # O1. Neither address should have an activation link.
+        assert mailbox.poll_link(address) is None
+        assert mailbox.poll_link(f'unknown@{mailbox.domain}') is None
+        assert extract_activation_link('No link here') is None
@@ -0,0 +1,49 @@
+import pytest
+import sys
+import os
+import time
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+from Framework.utility.Polling import get_poll_metrics, poll_until
+
+
+class Test_09_polling:
+    def test_09_polling_01(self):
+        """
+        Id: 01
+        Description: Test if polling backs off, exits early on success and respects its deadline.
+        Steps:
+            1. Poll a predicate that raises once then succeeds on its fourth call.
+            2. Poll a predicate that never succeeds for 0.5 seconds.
+        Objectives:
+            1. The result should be returned after 4 calls with growing sleeps.
+            2. None should be returned at the deadline after a few calls, and both polls should be counted.
+        """
+        NAME = 'test poll'
+        calls = []
+
+        def predicate():
+            calls.append(time.time())
+            if len(calls) == 1:
+                raise LookupError
+            return 'done' if len(calls) == 4 else None
+        # S1. Poll a predicate that raises once then succeeds on its fourth call.
+        ret = poll_until(predicate, 5, initialDelay=0.02, maxDelay=1, retryOn=LookupError, name=NAME)
+        # O1. The result should be returned after 4 calls with growing sleeps.
+        assert ret == 'done'
+        assert len(calls) == 4
+        delays = [after - before for before, after in zip(calls, calls[1:])]
+        assert delays == sorted(delays)
+
+        # S2. Poll a predicate that never succeeds for 0.5 seconds.
+        startTime = time.time()
+        ret = poll_until(lambda: calls.append(time.time()), 0.5, initialDelay=0.02, maxDelay=0.2, name=NAME)
+        # O2. None should be returned at the deadline after a few calls, and both polls should be counted.
+        assert ret is None
+        assert 0.5 <= time.time() - startTime < 0.7
+        assert len(calls) - 4 < 10
+        metrics = get_poll_metrics(NAME)
+        assert (metrics.calls, metrics.successes, metrics.timeouts) == (2, 1, 1)
+        assert metrics.iterations == len(calls)
@@ -0,0 +1,52 @@
+import pytest
+import sys
+import os
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+# Sessions are encrypted with cryptography, an optional dependency
+pytest.importorskip('cryptography')
+
+from Framework.account.SessionStore import SessionStore
+from Framework.utility.Constants import Server
+
+
+COOKIES = [{'name': 'PHPSESSID', 'value': 'secret-session-id', 'domain': 'zravian.com', 'path': '/',
+    'secure': False, 'httpOnly': True, 'expiry': 2000000000}]
+
+
+class Test_10_session_store:
+    def test_10_session_store_01(self, tmp_path):
+        """
+        Id: 01
+        Description: Test if sessions are stored encrypted and restored only with the right key.
+        Steps:
+            1. Save the session of an account.
+            2. Load it from a new store with the same key and from a store with another key.
+            3. Discard the session.
+        Objectives:
+            1. The sessions file should not contain the cookie value.
+            2. Only the store with the same key should restore the cookies, for the right account only.
+            3. The session should no longer be restored.
+        """
+        path, keyPath = str(tmp_path / 'sessions.bin'), str(tmp_path / 'session.key')
+        # S1. Save the session of an account.
+        assert SessionStore(path, keyPath).save(Server.S1, 'user', COOKIES)
+        # O1. The sessions file should not contain the cookie value.
+        with open(path, 'r') as f:
+            assert 'secret-session-id' not in f.read()
+
+        # S2. Load it from a new store with the same key and from a store with another key.
+        store = SessionStore(path, keyPath)
+        otherKeyStore = SessionStore(path, str(tmp_path / 'other.key'))
+        # O2. Only the store with the same key should restore the cookies, for the right account only.
+        assert store.load(Server.S1, 'user') == COOKIES
+        assert store.load(Server.S1, 'other') is None
+        assert store.load(Server.S10k, 'user') is None
+        assert otherKeyStore.load(Server.S1, 'user') is None
+
+        # S3. Discard the session.
+        assert store.discard(Server.S1, 'user')
+        # O3. The session should no longer be restored.
+        assert SessionStore(path, keyPath).load(Server.S1, 'user') is None
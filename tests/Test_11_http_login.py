@@ -0,0 +1,143 @@
+import pytest
+import sys
+import os
+from urllib.parse import parse_qs
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+pytest.importorskip('requests')
+
+import Framework.account.Login as LoginModule
+from Framework.account.HttpSession import HttpSession
+from Framework.account.Login import Login, LoginMode
+from Framework.account.SessionStore import get_session_store
+from Framework.utility.Constants import Server, get_XPATH
+from fakes import FakeBrowser, FakeHandler
+
+
+USERNAME, PASSWORD, SESSION_ID = 'user', 'password', 'session-id'
+LOGIN_PAGE = '''<html><body><form action="login.php" method="post">
+<input type="hidden" name="w" value="token">
+<input id="name" name="user" type="text"><input id="pass" name="pw" type="password">
+<input type="checkbox" name="lowRes"><input type="submit" value="Log in">
+</form></body></html>'''
+VILLAGE_PAGE = '<html><body><div id="side_info">Village</div></body></html>'
+XPATH = get_XPATH()
+
+
+# Stand-in for the login flow of a Zravian server
+class FakeServerHandler(FakeHandler):
+    def do_GET(self):
+        if self.path == '/village1.php':
+            if f'sid={SESSION_ID}' in self.headers.get('Cookie', ''):
+                self.reply(200, VILLAGE_PAGE)
+            else:
+                self.reply(302, headers={'Location': '/'})
+        else:
+            self.reply(200, LOGIN_PAGE)
+
+    def do_POST(self):
+        self.server.posts += 1
+        fields = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        if fields == {'w': ['token'], 'user': [USERNAME], 'pw': [PASSWORD]}:
+            self.reply(302, headers={'Location': '/village1.php', 'Set-Cookie': f'sid={SESSION_ID}; Path=/; HttpOnly'})
+        else:
+            self.reply(200, LOGIN_PAGE)
+
+
+@pytest.fixture
+def fake_server(start_fake_server):
+    """Fake server counting the posted login forms."""
+    server = start_fake_server(FakeServerHandler)
+    server.posts = 0
+    return server
+
+
+@pytest.fixture
+def server_url(fake_server):
+    """URL of the fake server."""
+    return fake_server.url
+
+
+@pytest.fixture
+def login_server(fake_server, session_store, monkeypatch):
+    """Fake server reached by Login for every Server, sessions are stored in a temporary session store."""
+    pytest.importorskip('cryptography')
+    monkeypatch.setattr(LoginModule, 'HttpSession', lambda baseURL: HttpSession(fake_server.url))
+    return fake_server
+
+
+class Test_11_http_login:
+    def test_11_http_login_01(self, server_url):
+        """
+        Id: 01
+        Description: Test if the login form is posted over HTTP and the session cookies can be reused.
+        Steps:
+            1. Login with a wrong password, then with the right one.
+            2. Hand the cookies to a new session.
+        Objectives:
+            1. Only the right password should log in, with the hidden fields of the form posted.
+            2. The new session should be logged in without posting the form.
+        """
+        session = HttpSession(server_url)
+        # S1. Login with a wrong password, then with the right one.
+        # O1. Only the right password should log in, with the hidden fields of the form posted.
+        assert not session.login(USERNAME, 'wrong')
+        assert not session.is_logged_in()
+        assert session.login(USERNAME, PASSWORD)
+        assert session.is_logged_in()
+        cookies = session.getCookies()
+        assert [(cookie['name'], cookie['value'], cookie['httpOnly']) for cookie in cookies] == \
+            [('sid', SESSION_ID, True)]
+
+        # S2. Hand the cookies to a new session.
+        otherSession = HttpSession(server_url)
+        otherSession.setCookies(cookies)
+        # O2. The new session should be logged in without posting the form.
+        assert otherSession.is_logged_in()
+        otherSession.close()
+        assert not otherSession.is_logged_in()
+
+    def test_11_http_login_02(self, login_server):
+        """
+        Id: 02
+        Description: Test if Login posts the form over HTTP, hands the session to the browser and restores it.
+        Steps:
+            1. Login in HTTP mode with a browser, storing the session.
+            2. Login again in HTTP mode with another browser.
+            3. Login in HTTP_ONLY mode, with the stored session and after it became stale.
+        Objectives:
+            1. The form should be posted once, the browser should get the cookies and load the village.
+            2. The stored session should be handed to the browser without posting the form.
+            3. The stored session should be restored, a stale one should be replaced by posting the form.
+        """
+        browser = FakeBrowser(login_server.url)
+        # S1. Login in HTTP mode with a browser, storing the session.
+        with Login(Server.S1, USERNAME, PASSWORD, sws=browser, useSession=True, mode=LoginMode.HTTP) as sws:
+            # O1. The form should be posted once, the browser should get the cookies and load the village.
+            assert sws is browser
+            assert login_server.posts == 1
+            assert [(cookie['name'], cookie['value']) for cookie in browser.getCookies()] == [('sid', SESSION_ID)]
+            assert browser.getCurrentUrl().endswith('village1.php') and not browser.isVisible(XPATH.LOGIN_USER_INPUT)
+        assert browser.getCookies() == []
+
+        # S2. Login again in HTTP mode with another browser.
+        otherBrowser = FakeBrowser(login_server.url)
+        with Login(Server.S1, USERNAME, sws=otherBrowser, useSession=True, mode=LoginMode.HTTP) as sws:
+            # O2. The stored session should be handed to the browser without posting the form.
+            assert sws is otherBrowser
+            assert login_server.posts == 1
+            assert otherBrowser.getCurrentUrl().endswith('village1.php')
+
+        # S3. Login in HTTP_ONLY mode, with the stored session and after it became stale.
+        # O3. The stored session should be restored, a stale one should be replaced by posting the form.
+        with Login(Server.S1, USERNAME, useSession=True, mode=LoginMode.HTTP_ONLY) as http:
+            assert isinstance(http, HttpSession) and http.is_logged_in()
+            assert login_server.posts == 1
+        staleCookies = [{'name': 'sid', 'value': 'stale', 'domain': '127.0.0.1', 'path': '/'}]
+        assert get_session_store().save(Server.S1, USERNAME, staleCookies)
+        with Login(Server.S1, USERNAME, PASSWORD, useSession=True, mode=LoginMode.HTTP_ONLY) as http:
+            assert http.is_logged_in()
+            assert login_server.posts == 2
+        assert [cookie['value'] for cookie in get_session_store().load(Server.S1, USERNAME)] == [SESSION_ID]
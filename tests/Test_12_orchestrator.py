@@ -0,0 +1,80 @@
+import pytest
+import sys
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+from Framework.account.Orchestrator import AccountTask, Orchestrator
+from Framework.utility.Constants import Server
+
+
+# Seconds spent by the stand-in task
+TASK_TIME = 0.05
+
+
+# Stand-in for Login, records the sessions
+class FakeSessions:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = set()
+        self.maxActive = 0
+        self.order = []
+
+    @contextmanager
+    def session(self, server, username):
+        with self.lock:
+            # An account is never served by two workers at once
+            assert username not in self.active
+            self.active.add(username)
+            self.maxActive = max(self.maxActive, len(self.active))
+            self.order.append(username)
+        try:
+            if username == 'locked':
+                raise RuntimeError('Login failed')
+            yield {'username': username}
+        finally:
+            with self.lock:
+                self.active.discard(username)
+
+
+def fake_task(backend):
+    """Stand-in for a browser task, fails for account `unlucky`."""
+    time.sleep(TASK_TIME)
+    return backend['username'] != 'unlucky'
+
+
+class Test_12_orchestrator:
+    def test_12_orchestrator_01(self):
+        """
+        Id: 01
+        Description: Test if accounts are served fairly by a bounded pool of workers.
+        Steps:
+            1. Run 2 recurring tasks and a one-off task for 10 accounts over 3 workers for 2 rounds.
+        Objectives:
+            1. No more sessions than workers should run at once, and each session should run all due tasks.
+            2. Every account should be served once before any is served twice.
+            3. Failed tasks and failed logins should be counted.
+        """
+        WORKERS, ROUNDS = 3, 2
+        usernames = [f'user{index}' for index in range(8)] + ['unlucky', 'locked']
+        sessions = FakeSessions()
+        tasks = [AccountTask('reports', fake_task, 0), AccountTask('build', fake_task, 0)]
+        orchestrator = Orchestrator([(Server.S1, username) for username in usernames], tasks, WORKERS,
+            sessionFunction=sessions.session)
+        # S1. Run 2 recurring tasks and a one-off task for 10 accounts over 3 workers for 2 rounds.
+        assert orchestrator.submit(Server.S1, 'user0', AccountTask('gold', fake_task, 60))
+        assert not orchestrator.submit(Server.S1, 'missing', AccountTask('gold', fake_task, None))
+        stats = orchestrator.run(duration=10, rounds=ROUNDS)
+        # O1. No more sessions than workers should run at once, and each session should run all due tasks.
+        assert sessions.maxActive == WORKERS
+        assert len(sessions.order) == len(usernames) * ROUNDS
+        assert stats['reports'].runs == stats['build'].runs == len(usernames) * ROUNDS
+        assert stats['gold'].runs == 1
+        # O2. Every account should be served once before any is served twice.
+        assert sorted(sessions.order[:len(usernames)]) == sorted(usernames)
+        # O3. Failed tasks and failed logins should be counted.
+        assert stats['reports'].failures == stats['build'].failures == 2 * ROUNDS
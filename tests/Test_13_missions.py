@@ -0,0 +1,261 @@
+import json
+import pytest
+import sys
+import os
+import threading
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+from Framework.infrastructure import costs
+import Framework.screen.Dialog as Dialog
+from Framework.screen.Dialog import MissionNum, close_mission_dialog, instructions_get_costs, open_mission_dialog, \
+    parse_mission_title
+from Framework.screen.Missions import MISSION_PLANS, MissionEngine, MissionStatus, solve_missions
+from Framework.utility.Constants import BuildingType, get_XPATH
+
+
+XPATH = get_XPATH()
+
+
+# Stand-in for SWS, shows the mission dialog of a list of titles
+class FakeMissionPage:
+    def __init__(self, titles):
+        self.titles = list(titles)
+        self.dialogOpen = False
+        # Text of the headline node, None if there is no node
+        self.headline = None
+        # Polls left before the next mission is rendered
+        self.renderDelay = 0
+        self.dialogOpens = 0
+        self.refreshes = 0
+        # Set to make the close button useless
+        self.stuck = False
+        # Set to show the popup without its content until the page is refreshed
+        self.empty = False
+        self.taskMaster = True
+
+    def refresh(self, hardRefesh=False):
+        self.refreshes += 1
+        self.dialogOpen = self.empty = False
+        self.headline = None
+
+    def isDisplayed(self, xpath):
+        return self.dialogOpen and xpath == XPATH.MISSION_DIALOG
+
+    def removeElements(self, xpath):
+        removed = int(xpath == XPATH.MISSION_NAME and self.headline is not None)
+        if removed:
+            self.headline = None
+        return removed
+
+    def isVisible(self, xpath, waitFor=False):
+        if xpath == XPATH.MISSION_NAME and self.renderDelay:
+            self.renderDelay -= 1
+            if not self.renderDelay:
+                self.headline = self.titles[0] if self.titles else None
+        return xpath == XPATH.TASK_MASTER and self.taskMaster or self.dialogOpen and (xpath in (XPATH.ACCOMPLISH_MISSION,
+            XPATH.MISSION_CLOSE_BTN) or xpath == XPATH.MISSION_NAME and self.headline is not None)
+
+    def clickElement(self, xpath, **kwargs):
+        if xpath == XPATH.TASK_MASTER:
+            self.dialogOpen = True
+            self.dialogOpens += 1
+            if not self.empty:
+                self.headline = self.titles[0]
+        elif xpath == XPATH.ACCOMPLISH_MISSION:
+            # Next mission is rendered on the second poll
+            self.titles.pop(0)
+            self.renderDelay = 2
+        elif xpath == XPATH.MISSION_CLOSE_BTN and not self.stuck:
+            self.dialogOpen = False
+        return True
+
+    def getElementAttribute(self, xpath, attr, **kwargs):
+        return self.headline if self.dialogOpen else None
+
+
+# Stand-in for SWS, shows the instructions of one building
+class FakeInstructionsPage:
+    def __init__(self, costsText):
+        self.costsText = costsText
+        self.clicks = 0
+
+    def clickElement(self, xpath, **kwargs):
+        self.clicks += 1
+        return True
+
+    def isVisible(self, xpath):
+        return True
+
+    def enter_iframe(self, frameIdentifier):
+        pass
+
+    def exit_iframe(self):
+        pass
+
+    def getElementAttribute(self, xpath, attr, **kwargs):
+        return self.costsText
+
+
+class Test_13_missions:
+    def test_13_missions_01(self):
+        """
+        Id: 01
+        Description: Test if missions sharing a number are told apart and every mission has a plan entry.
+        Steps:
+            1. Parse mission titles.
+        Objectives:
+            1. Missions 20 and 21 should be identified by their title.
+            2. Every MissionNum should be in MISSION_PLANS.
+        """
+        # S1. Parse mission titles.
+        # O1. Missions 20 and 21 should be identified by their title.
+        assert parse_mission_title('1. Woodcutter') is MissionNum.M1
+        assert parse_mission_title('20. Barracks') is MissionNum.M20M
+        assert parse_mission_title('20. Warehouse') is MissionNum.M20E
+        assert parse_mission_title('21. Train troops') is MissionNum.M21M
+        assert parse_mission_title('21. Marketplace') is MissionNum.M21E
+        assert parse_mission_title('20. Unknown') is None
+        assert parse_mission_title('Welcome to Zravian!') is None
+        # O2. Every MissionNum should be in MISSION_PLANS.
+        assert set(MissionNum) == set(MISSION_PLANS)
+
+    def test_13_missions_02(self):
+        """
+        Id: 02
+        Description: Test if the engine runs the plan of each mission and reads the next one from the open dialog.
+        Steps:
+            1. Run the engine over 2 missions with a plan followed by one without.
+        Objectives:
+            1. The steps of both missions should run once, in order.
+            2. The dialog should be opened once to identify the first mission and once to accomplish each.
+        """
+        page = FakeMissionPage(['1. Woodcutter', '2. Crop', '3. Your village\'s name'])
+        calls = []
+        plans = {MissionNum.M1: [lambda sws: calls.append('M1') or True],
+            MissionNum.M2: [lambda sws: calls.append('M2a') or True, lambda sws: calls.append('M2b') or True]}
+        # S1. Run the engine over 2 missions with a plan followed by one without.
+        engine = MissionEngine(page, plans)
+        assert engine.run() == [MissionNum.M1, MissionNum.M2]
+        # O1. The steps of both missions should run once, in order.
+        assert calls == ['M1', 'M2a', 'M2b']
+        assert engine.current() is MissionNum.M3 and engine.status is MissionStatus.FOUND
+        # O2. The dialog should be opened once to identify the first mission and once to accomplish each.
+        assert page.dialogOpens == 3
+        assert page.refreshes == 0
+
+    def test_13_missions_03(self, monkeypatch):
+        """
+        Id: 03
+        Description: Test if the mission dialog is closed in page and opened with fresh content.
+        Steps:
+            1. Close the open dialog.
+            2. Close a dialog ignoring the close button.
+            3. Open a dialog whose content is not loaded.
+        Objectives:
+            1. The dialog should be closed without refreshing.
+            2. The page should be refreshed.
+            3. The headline of the previous open should not be read, the page should be refreshed once.
+        """
+        monkeypatch.setattr(Dialog, 'MAX_POLLING_TIME', 0.5)
+        page = FakeMissionPage(['1. Woodcutter'])
+        # S1. Close the open dialog.
+        assert open_mission_dialog(page)
+        # O1. The dialog should be closed without refreshing.
+        assert close_mission_dialog(page) and not page.dialogOpen
+        assert close_mission_dialog(page)
+        assert page.refreshes == 0
+        # S2. Close a dialog ignoring the close button.
+        page.stuck = True
+        assert open_mission_dialog(page)
+        # O2. The page should be refreshed.
+        assert close_mission_dialog(page) and page.refreshes == 1
+        # S3. Open a dialog whose content is not loaded.
+        page.stuck = False
+        assert open_mission_dialog(page)
+        assert close_mission_dialog(page) and page.refreshes == 1
+        page.empty = True
+        # O3. The headline of the previous open should not be read, the page should be refreshed once.
+        assert open_mission_dialog(page)
+        assert page.refreshes == 2 and page.headline == '1. Woodcutter'
+
+    def test_13_missions_04(self, tmp_path, monkeypatch):
+        """
+        Id: 04
+        Description: Test if instructions costs are answered locally and learned on first lookup.
+        Steps:
+            1. Look up the costs of a troop.
+            2. Look up the costs of a building twice.
+        Objectives:
+            1. Troop costs should be answered from data.json without using the page.
+            2. Building costs should be read from instructions once, then answered from the learned table.
+        """
+        monkeypatch.setattr(costs, 'BUILDING_COSTS_PATH', str(tmp_path / 'building_costs.json'))
+        monkeypatch.setattr(costs, 'COST_TABLE_Instance', None)
+        # S1. Look up the costs of a troop.
+        # O1. Troop costs should be answered from data.json without using the page.
+        assert instructions_get_costs(None, ['Troops', 'Legionnaire']) == ['120', '100', '180', '40', '1']
+        # S2. Look up the costs of a building twice.
+        page = FakeInstructionsPage('Costs\n130|160|90|40|1|0:33:20')
+        # O2. Building costs should be read from instructions once, then answered from the learned table.
+        assert instructions_get_costs(page, ['Buildings', 'Warehouse']) == ['130', '160', '90', '40', '1']
+        clicks = page.clicks
+        assert instructions_get_costs(page, ['Buildings', 'Warehouse']) == ['130', '160', '90', '40', '1']
+        assert page.clicks == clicks
+        assert (tmp_path / 'building_costs.json').exists()
+
+    def test_13_missions_05(self, monkeypatch):
+        """
+        Id: 05
+        Description: Test if solving missions tells finished missions apart from an unreadable dialog.
+        Steps:
+            1. Solve missions on a page without task master.
+            2. Solve missions on a page whose dialog can not be identified.
+        Objectives:
+            1. Solving should succeed, no mission is left.
+            2. Solving should fail.
+        """
+        monkeypatch.setattr(Dialog, 'MAX_POLLING_TIME', 0.5)
+        # S1. Solve missions on a page without task master.
+        page = FakeMissionPage([])
+        page.taskMaster = False
+        # O1. Solving should succeed, no mission is left.
+        assert solve_missions(page)
+        # S2. Solve missions on a page whose dialog can not be identified.
+        page = FakeMissionPage(['Unexpected headline'])
+        # O2. Solving should fail.
+        assert not solve_missions(page)
+        page.empty = True
+        assert not solve_missions(page)
+
+    def test_13_missions_06(self, tmp_path, monkeypatch):
+        """
+        Id: 06
+        Description: Test if costs recorded concurrently are all kept in the cost file.
+        Steps:
+            1. Store costs learned by another process in the cost file.
+            2. Record costs of several levels from concurrent threads.
+        Objectives:
+            1. The cost file should be valid json holding every recorded level.
+            2. Costs learned by the other process should be kept.
+        """
+        costsPath = tmp_path / 'building_costs.json'
+        monkeypatch.setattr(costs, 'BUILDING_COSTS_PATH', str(costsPath))
+        monkeypatch.setattr(costs, 'COST_TABLE_Instance', None)
+        # S1. Store costs learned by another process in the cost file.
+        costs.get_cost_table()
+        costsPath.write_text(json.dumps({'Warehouse': {'1': [130, 160, 90, 40, 1, 2000]}}))
+        # S2. Record costs of several levels from concurrent threads.
+        threads = [threading.Thread(target=costs.record_building_costs,
+            args=(BuildingType.Woodcutter, level, costs.BuildingCosts(level, level, level, level, 1, level)))
+            for level in range(1, 11)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # O1. The cost file should be valid json holding every recorded level.
+        jsonData = json.loads(costsPath.read_text())
+        assert sorted(jsonData['Woodcutter'], key=int) == [str(level) for level in range(1, 11)]
+        # O2. Costs learned by the other process should be kept.
+        assert jsonData['Warehouse'] == {'1': [130, 160, 90, 40, 1, 2000]}
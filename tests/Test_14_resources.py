@@ -0,0 +1,59 @@
+import pytest
+import sys
+import os
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+from Framework.screen.OVillage import RESOURCE_BAR, get_production, get_resources, get_storage
+from Framework.utility.Constants import ResourceType
+from Framework.utility.SeleniumWebScraper import Attr
+
+
+# Resource bar as displayed: (storage/capacity, hourly production)
+RESOURCE_BAR_TEXT = {
+    ResourceType.LUMBER: ('750/800', '60'),
+    ResourceType.CLAY: ('500/800', '40'),
+    ResourceType.IRON: ('250/800', '30'),
+    ResourceType.CROP: ('100/800', '-10'),
+}
+
+
+# Stand-in for SWS, counts the extractions
+class FakeResourcePage:
+    def __init__(self):
+        self.snapshots = 0
+
+    def getSnapshot(self, props, attr=Attr.TEXT):
+        self.snapshots += 1
+        texts = {xpath: RESOURCE_BAR_TEXT[resource] for resource, xpath in RESOURCE_BAR.items()}
+        return {key: texts[xpath][attr[key] is Attr.TITLE] for key, xpath in props.items()}
+
+
+class Test_14_resources:
+    def test_14_resources_01(self):
+        """
+        Id: 01
+        Description: Test if the resource bar is read in a single extraction.
+        Steps:
+            1. Read the resources, storage and production.
+            2. Estimate storage 2 hours after reading.
+        Objectives:
+            1. Each read should take one extraction and return all 4 resources.
+            2. Storage should grow with production, capped by capacity and never negative.
+        """
+        page = FakeResourcePage()
+        # S1. Read the resources, storage and production.
+        snapshot = get_resources(page)
+        # O1. Each read should take one extraction and return all 4 resources.
+        assert page.snapshots == 1
+        assert snapshot.storage[ResourceType.CLAY] == 500 and snapshot.capacity[ResourceType.CLAY] == 800
+        assert get_storage(page)[ResourceType.IRON] == (250, 800)
+        assert get_production(page) == {ResourceType.LUMBER: 60, ResourceType.CLAY: 40, ResourceType.IRON: 30,
+            ResourceType.CROP: -10}
+        assert page.snapshots == 3
+        # S2. Estimate storage 2 hours after reading.
+        estimate = snapshot.estimate(snapshot.timestamp + 2 * 3600)
+        # O2. Storage should grow with production, capped by capacity and never negative.
+        assert estimate == {ResourceType.LUMBER: 800, ResourceType.CLAY: 580, ResourceType.IRON: 310,
+            ResourceType.CROP: 80}
@@ -0,0 +1,87 @@
+import pytest
+import sys
+import os
+import sched
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+from Framework.infrastructure.builder import DemolitionQueue
+
+
+# Stand-in for SWS on the Main Building page, shows one demolition timer per read
+class FakeMainBuilding:
+    def __init__(self, timers):
+        self.timers = list(timers)
+
+    def get(self, url):
+        return True
+
+    def isVisible(self, xpath, waitFor=False):
+        return True
+
+    def clickElement(self, xpath, **kwargs):
+        return True
+
+    def getElementAttribute(self, xpath, attr, waitFor=False):
+        return self.timers.pop(0) if self.timers else None
+
+
+# Time that only moves when the scheduler sleeps
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class Test_15_demolition:
+    def test_15_demolition_01(self):
+        """
+        Id: 01
+        Description: Test if a demolition is completed only once its timer is gone.
+        Steps:
+            1. Demolish a building whose timer jams when it should end.
+        Objectives:
+            1. The demolition should be completed after the timer is read again without the jam.
+        """
+        # Free Main Building, timer after start, jammed timer, no timer
+        page = FakeMainBuilding([None, '0:00:05', '0:00:0?', None])
+        clock = FakeClock()
+        completed = []
+        queue = DemolitionQueue(page, onComplete=completed.append)
+        queue.mainBuildingURL = 'build.php?id=26'
+        queue.scheduler = sched.scheduler(clock.time, clock.sleep)
+        # S1. Demolish a building whose timer jams when it should end.
+        queue.add(19)
+        assert queue.run()
+        # O1. The demolition should be completed after the timer is read again without the jam.
+        assert completed == [19] and not page.timers
+        assert clock.now == 5 + 1
+
+    def test_15_demolition_02(self):
+        """
+        Id: 02
+        Description: Test if a timer that stays jammed is read again less and less often.
+        Steps:
+            1. Demolish two buildings, the timer of the first one stays jammed for several reads.
+        Objectives:
+            1. The wait between reads should double on each jammed read and start over for the next demolition.
+        """
+        # Free Main Building, timer after start, 5 jammed timers, no timer, then one jammed timer for the next building
+        page = FakeMainBuilding([None, '0:00:05'] + ['0:00:0?'] * 5 + [None] + [None, '0:00:05', '0:00:0?', None])
+        clock = FakeClock()
+        completed = []
+        queue = DemolitionQueue(page, onComplete=completed.append)
+        queue.mainBuildingURL = 'build.php?id=26'
+        queue.scheduler = sched.scheduler(clock.time, clock.sleep)
+        # S1. Demolish two buildings, the timer of the first one stays jammed for several reads.
+        queue.add([19, 20])
+        assert queue.run()
+        # O1. The wait between reads should double on each jammed read and start over for the next demolition.
+        assert completed == [19, 20] and not page.timers
+        assert clock.now == (5 + 1 + 2 + 4 + 8 + 16) + (5 + 1)
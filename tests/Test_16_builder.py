@@ -0,0 +1,228 @@
+import pytest
+import sys
+import os
+
+# Path to root
+sys.path.append(os.path.join(sys.path[0], '../'))
+
+from Framework.infrastructure import builder, costs
+from Framework.infrastructure.builder import BuildingError, construct_many, evaluate_build_page, level_up_building_at, \
+    level_up_many
+from Framework.utility.Constants import Building, BuildingType, get_XPATH, get_building_info
+
+
+XPATH = get_XPATH()
+COSTS_TEXT = '130|160|90|40|1|0:33:20'
+
+
+# Stand-in for SWS on the building pages of a village, upgrades are queued and never finish
+class FakeVillagePage:
+    def __init__(self, sites):
+        # Site id linked to [BuildingType, level]
+        self.sites = {siteId: list(site) for siteId, site in sites.items()}
+        # Site id linked to the upgrades queued on it
+        self.queued = {}
+        # Texts shown on every building page, by snapshot key
+        self.texts = {}
+        self.site = None
+        self.scans = 0
+        self.snapshots = 0
+        self.clicks = []
+
+    def scan(self):
+        self.scans += 1
+        village = {}
+        for siteId, (bdType, level) in sorted(self.sites.items()):
+            village.setdefault(bdType, []).append(Building(siteId, level))
+        for lst in village.values():
+            lst.sort(key=lambda e: (int(e[1]), -int(e[0])))
+        return village
+
+    def enter(self, index):
+        self.site = index
+        return True
+
+    def getSnapshot(self, props):
+        self.snapshots += 1
+        bdType, level = self.sites[self.site]
+        page = {key: self.texts.get(key) for key in props}
+        if bdType is BuildingType.EmptyPlace:
+            page['empty'] = 'Construct new building'
+            if 'constructCosts' in props:
+                page['constructCosts'] = COSTS_TEXT
+        else:
+            nextLevel = level + self.queued.get(self.site, 0) + 1
+            page['title'] = f'{get_building_info(bdType).name} level {level}'
+            page['levelUpCosts'] = f'Costs for upgrading to level {nextLevel}:\n{COSTS_TEXT}'
+            if nextLevel > get_building_info(bdType).maxLevel:
+                page['maxLevel'] = 'Building is already at max level'
+        return page
+
+    def getCurrentUrl(self):
+        return f'build.php?id={self.site}'
+
+    def clickElement(self, propList, **kwargs):
+        bdType = self.sites[self.site][0]
+        if bdType is BuildingType.EmptyPlace:
+            bdType = next(bdType for bdType in BuildingType \
+                if propList[0] == XPATH.CONSTRUCT_BUILDING_NAME % get_building_info(bdType).name)
+            self.sites[self.site] = [bdType, 0]
+        self.queued[self.site] = self.queued.get(self.site, 0) + 1
+        self.clicks.append((self.site, bdType))
+        return True
+
+    def getUsage(self):
+        return self.snapshots, len(self.clicks)
+
+
+@pytest.fixture
+def village_page(tmp_path, monkeypatch):
+    """Returns a factory of FakeVillagePage, used in place of the scan and navigation of the builder."""
+    monkeypatch.setattr(costs, 'BUILDING_COSTS_PATH', str(tmp_path / 'building_costs.json'))
+    monkeypatch.setattr(costs, 'COST_TABLE_Instance', None)
+
+    def create(sites):
+        page = FakeVillagePage(sites)
+        monkeypatch.setattr(builder, 'scan_village', lambda sws: sws.scan())
+        monkeypatch.setattr(builder, 'enter_building_site', lambda sws, index, direct=False: sws.enter(index))
+        monkeypatch.setattr(builder, 'move_to_village', lambda sws, forced=False: True)
+        return page
+    return create
+
+
+class Test_16_builder:
+    def test_16_builder_01(self, village_page):
+        """
+        Id: 01
+        Description: Test if the building page verdict reports errors in the order of the sequential checks.
+        Steps:
+            1. Read a page showing every level up error, then remove them one at a time.
+            2. Read the page of a building with an upgrade queued.
+            3. Read a page whose title can not be identified.
+        Objectives:
+            1. The errors should be max level, storage, resources, busy workers, then none.
+            2. The target level should be the one the costs name, not the title level + 1.
+            3. The verdict should be a fatal error.
+        """
+        page = village_page({19: (BuildingType.Warehouse, 20)})
+        page.enter(19)
+        page.texts = {
+            'levelUpGranary': 'Upgrade your granary first',
+            'levelUpResources': '0:10:00',
+            'busyWorkers': 'The workers are already at work',
+        }
+        # S1. Read a page showing every level up error, then remove them one at a time.
+        # O1. The errors should be max level, storage, resources, busy workers, then none.
+        verdict = evaluate_build_page(page)
+        assert verdict.error is BuildingError.MAX_LEVEL_ALREADY and verdict.bdType is BuildingType.Warehouse
+        page.sites[19][1] = 5
+        verdict = evaluate_build_page(page)
+        assert verdict.error is BuildingError.STORAGE and verdict.storageType is BuildingType.Granary
+        del page.texts['levelUpGranary']
+        verdict = evaluate_build_page(page)
+        assert verdict.error is BuildingError.RESOURCES and verdict.resourcesTimer == 600
+        del page.texts['levelUpResources']
+        assert evaluate_build_page(page).error is BuildingError.BUSY_WORKERS
+        del page.texts['busyWorkers']
+        verdict = evaluate_build_page(page)
+        assert verdict.error is BuildingError.OK and (verdict.level, verdict.targetLevel) == (5, 6)
+        # S2. Read the page of a building with an upgrade queued.
+        page.queued[19] = 2
+        verdict = evaluate_build_page(page)
+        # O2. The target level should be the one the costs name, not the title level + 1.
+        assert (verdict.level, verdict.targetLevel) == (5, 8)
+        assert costs.get_building_costs(BuildingType.Warehouse, 8) is not None
+        # S3. Read a page whose title can not be identified.
+        original = page.getSnapshot
+        page.getSnapshot = lambda props: {**original(props), 'title': 'Unknown building level 1'}
+        # O3. The verdict should be a fatal error.
+        assert evaluate_build_page(page).error is BuildingError.FATAL_ERROR
+
+    def test_16_builder_02(self, village_page):
+        """
+        Id: 02
+        Description: Test if leveling up a building reports its site and target level.
+        Steps:
+            1. Level up a building with an upgrade queued.
+            2. Level up an empty place.
+        Objectives:
+            1. The result should be successful, for the site and the level the costs name.
+            2. The result should be a failure, equal to its error.
+        """
+        page = village_page({19: (BuildingType.MainBuilding, 3), 20: (BuildingType.EmptyPlace, 0)})
+        page.queued[19] = 1
+        # S1. Level up a building with an upgrade queued.
+        result = level_up_building_at(page, 19)
+        # O1. The result should be successful, for the site and the level the costs name.
+        assert result and result == BuildingError.OK
+        assert (result.siteId, result.targetLevel) == (19, 5)
+        assert result.finishTime is not None and result.driverCalls == 1
+        assert page.clicks == [(19, BuildingType.MainBuilding)]
+        # S2. Level up an empty place.
+        result = level_up_building_at(page, 20)
+        # O2. The result should be a failure, equal to its error.
+        assert not result and result == BuildingError.CANT_LEVEL_EMPTY_PLACE
+        assert result != BuildingError.OK and result.targetLevel is None
+        assert len(page.clicks) == 1
+
+    def test_16_builder_03(self, village_page):
+        """
+        Id: 03
+        Description: Test if leveling up many buildings keeps the village model up to date.
+        Steps:
+            1. Level up a site, a building type, an empty place, a building at max level and a missing type.
+        Objectives:
+            1. The village should be scanned once and each target should get its own result.
+            2. Only the sites below their target level should be upgraded, once per level.
+        """
+        page = village_page({
+            19: (BuildingType.MainBuilding, 1),
+            20: (BuildingType.Warehouse, 1),
+            21: (BuildingType.Warehouse, 2),
+            22: (BuildingType.EmptyPlace, 0),
+            23: (BuildingType.Cranny, 10),
+        })
+        targets = [(19, 3), (BuildingType.Warehouse, 4), (22, 1), (23, 11), (BuildingType.Granary, 1), (19, 2)]
+        # S1. Level up a site, a building type, an empty place, a building at max level and a missing type.
+        results = level_up_many(page, targets)
+        # O1. The village should be scanned once and each target should get its own result.
+        assert page.scans == 1
+        assert [(result.target, result.level, result.error) for result in results] == [
+            (19, 3, BuildingError.OK),
+            (BuildingType.Warehouse, 4, BuildingError.OK),
+            (22, 1, BuildingError.CANT_LEVEL_EMPTY_PLACE),
+            (23, 11, BuildingError.MAX_LEVEL_ALREADY),
+            (BuildingType.Granary, 1, BuildingError.CANT_LEVEL_EMPTY_PLACE),
+            (19, 2, BuildingError.OK),
+        ]
+        # O2. Only the sites below their target level should be upgraded, once per level.
+        assert page.queued == {19: 2, 21: 2}
+
+    def test_16_builder_04(self, village_page):
+        """
+        Id: 04
+        Description: Test if constructing many buildings keeps the village model up to date.
+        Steps:
+            1. Construct a building twice, then one whose requirements are not met.
+            2. Construct a building in a full village.
+        Objectives:
+            1. A building should be constructed and leveled up on an empty place, then the existing one leveled up.
+            2. Requirements should be reported without constructing.
+            3. The village should be reported full.
+        """
+        page = village_page({19: (BuildingType.MainBuilding, 1), 20: (BuildingType.EmptyPlace, 0),
+            21: (BuildingType.EmptyPlace, 0)})
+        # S1. Construct a building twice, then one whose requirements are not met.
+        results = construct_many(page, [(BuildingType.MainBuilding, 1), (BuildingType.Granary, 2),
+            (BuildingType.Granary, 3), (BuildingType.Barracks, 1)])
+        # O1. A building should be constructed and leveled up on an empty place, then the existing one leveled up.
+        assert [result.error for result in results[:3]] == [BuildingError.OK] * 3
+        assert page.clicks == [(20, BuildingType.Granary)] * 3
+        assert page.sites[21] == [BuildingType.EmptyPlace, 0]
+        # O2. Requirements should be reported without constructing.
+        assert results[3].error is BuildingError.REQUIREMENTS
+        # S2. Construct a building in a full village.
+        page = village_page({19: (BuildingType.MainBuilding, 1), 20: (BuildingType.Cranny, 1)})
+        results = construct_many(page, [(BuildingType.Warehouse, 1)])
+        # O3. The village should be reported full.
+        assert [result.error for result in results] == [BuildingError.FULL_VILLAGE] and not page.clicks
@@ -0,0 +1,41 @@
+import pytest
+import sys
+import os
+import threading
+from http.server import ThreadingHTTPServer
+
+# Path to root
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+
+import Framework.account.SessionStore as SessionStoreModule
+from Framework.account.SessionStore import SessionStore
+
+
+@pytest.fixture
+def start_fake_server():
+    """
+    Starts fake servers in threads and stops them on teardown.
+
+    Returns:
+        - Function called with a handler class, returns the server with its `url`.
+    """
+    servers = []
+
+    def start(handlerClass):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handlerClass)
+        server.url = f'http://127.0.0.1:{server.server_address[1]}/'
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def session_store(tmp_path, monkeypatch):
+    """Session store in tmp_path used by Login."""
+    store = SessionStore(str(tmp_path / 'sessions.bin'), str(tmp_path / 'session.key'))
+    monkeypatch.setattr(SessionStoreModule, 'SESSION_STORE_Instance', store)
+    return store
@@ -0,0 +1,246 @@
+import sys
+import os
+import http.cookiejar
+import re
+import urllib.request
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlencode, urljoin
+
+# Path to root
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+
+from Framework.utility.Constants import Server
+from Framework.utility.SeleniumWebScraper import Attr
+
+
+# Base of the fake servers, replies without logging requests
+class FakeHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, code : int, body : str = '', headers : dict = {}):
+        self.send_response(code)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+
+# Node of a parsed page
+class Element:
+    def __init__(self, tag : str, attrs : dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        # Strings and child elements in document order
+        self.content = []
+
+    def children(self):
+        return [node for node in self.content if isinstance(node, Element)]
+
+    def descendants(self):
+        for child in self.children():
+            yield child
+            yield from child.descendants()
+
+    def own_text(self):
+        return ''.join(node for node in self.content if isinstance(node, str))
+
+    def text(self):
+        return ''.join(node if isinstance(node, str) else node.text() for node in self.content)
+
+
+class PageParser(HTMLParser):
+    VOID_TAGS = {'br', 'hr', 'img', 'input', 'link', 'meta'}
+
+    def __init__(self):
+        super().__init__()
+        self.root = self.current = Element('#document', {})
+
+    def handle_starttag(self, tag, attrs):
+        element = Element(tag, {name: value or '' for name, value in attrs}, self.current)
+        self.current.content.append(element)
+        if tag not in self.VOID_TAGS:
+            self.current = element
+
+    def handle_endtag(self, tag):
+        node = self.current
+        while node.parent and node.tag != tag:
+            node = node.parent
+        if node.parent:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.content.append(data)
+
+
+# Subset of XPath used by the framework: tag or `*` steps, `..`, attribute and text predicates
+STEP_RE = re.compile(r'(//?)(\*|\.\.|\w+)((?:\[[^\]]*\])*)')
+PREDICATE_RE = re.compile(r'\[(?:@(\w+)="([^"]*)"|contains\(text\(\), "([^"]*)"\)|text\(\)="([^"]*)")\]')
+
+
+def find_elements(root : Element, xpath : str):
+    """
+    Returns:
+        - List of elements matching xpath, in document order.
+    """
+    steps = STEP_RE.findall(xpath)
+    assert ''.join(''.join(step) for step in steps) == xpath, f'Unsupported xpath {xpath}'
+    nodes = [root]
+    for axis, name, predicates in steps:
+        if name == '..':
+            candidates = [node.parent for node in nodes if node.parent]
+        else:
+            candidates = [element for node in nodes \
+                for element in (node.descendants() if axis == '//' else node.children()) \
+                if name in ('*', element.tag)]
+        for attr, value, contained, text in PREDICATE_RE.findall(predicates):
+            if attr:
+                candidates = [element for element in candidates if element.attrs.get(attr) == value]
+            elif contained:
+                candidates = [element for element in candidates if contained in element.own_text()]
+            else:
+                candidates = [element for element in candidates if element.own_text().strip() == text]
+        nodes = list({id(element): element for element in candidates}.values())
+    return nodes
+
+
+# Stand-in for SWS loading the pages of a fake server over HTTP, clicks follow links and submit forms
+class FakeBrowser:
+    def __init__(self, serverURL : str):
+        self.serverURL = serverURL
+        self.cookies = http.cookiejar.CookieJar()
+        self.driver = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.tabCount = 0
+        # Tab handle linked to [url, root element]
+        self.tabs = {}
+        self.tab = self.__blank_tab()
+
+    def __blank_tab(self):
+        self.tabCount += 1
+        handle = f'tab-{self.tabCount}'
+        self.tabs[handle] = ['about:blank', Element('#document', {})]
+        return handle
+
+    def __load(self, url : str, fields : dict = None):
+        for server in Server:
+            if url.startswith(server.value):
+                url = self.serverURL + url[len(server.value):]
+        data = urlencode(fields).encode() if fields is not None else None
+        try:
+            with self.driver.open(url, data=data, timeout=5) as response:
+                parser = PageParser()
+                parser.feed(response.read().decode())
+                self.tabs[self.tab] = [response.geturl(), parser.root]
+        except OSError:
+            return False
+        return True
+
+    def __find(self, prop):
+        return find_elements(self.tabs[self.tab][1], prop)
+
+    def close(self):
+        self.driver = None
+
+    def reset(self):
+        self.cookies.clear()
+        self.tabs = {}
+        self.tab = self.__blank_tab()
+        return True
+
+    def getCookies(self):
+        return [{'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path,
+            'secure': bool(cookie.secure), 'httpOnly': cookie.has_nonstandard_attr('HttpOnly')} \
+            for cookie in self.cookies]
+
+    def setCookies(self, cookies : list):
+        for cookie in cookies:
+            self.cookies.set_cookie(http.cookiejar.Cookie(0, cookie['name'], cookie['value'], None, False,
+                cookie['domain'], True, cookie['domain'].startswith('.'), cookie['path'], True, cookie['secure'],
+                cookie.get('expiry'), False, None, None, {'HttpOnly': None} if cookie['httpOnly'] else {}))
+        return True
+
+    def get(self, URL : str, checkURL : bool = True):
+        return self.__load(URL)
+
+    def getCurrentUrl(self):
+        return self.tabs[self.tab][0]
+
+    def refresh(self, hardRefesh : bool = False):
+        return self.__load(self.getCurrentUrl())
+
+    def newTab(self, URL : str, switchTo : bool = False):
+        previousTab, self.tab = self.tab, self.__blank_tab()
+        ret = self.__load(URL)
+        if not switchTo:
+            self.tab = previousTab
+        return ret
+
+    def switchToTab(self, identifier):
+        ret = identifier in self.tabs
+        if ret:
+            self.tab = identifier
+        return ret
+
+    def getTabHandle(self):
+        return self.tab
+
+    def closeTab(self, identifier=None):
+        self.tabs.pop(identifier or self.tab, None)
+        if self.tab not in self.tabs:
+            self.tab = list(self.tabs)[-1] if self.tabs else self.__blank_tab()
+        return True
+
+    def isVisible(self, prop, waitFor : bool = False):
+        return bool(self.__find(prop))
+
+    def isDisplayed(self, prop):
+        return bool(self.__find(prop))
+
+    def removeElements(self, prop):
+        elements = self.__find(prop)
+        for element in elements:
+            element.parent.content.remove(element)
+        return len(elements)
+
+    def getElementAttribute(self, prop, attr : Attr, waitFor : bool = False):
+        elements = self.__find(prop)
+        if not elements:
+            return None
+        return elements[0].text().strip() if attr is Attr.TEXT else elements[0].attrs.get(attr.value)
+
+    def sendKeys(self, prop, text : str, waitFor : bool = False):
+        elements = self.__find(prop)
+        if elements:
+            elements[0].attrs['value'] = text
+        return bool(elements)
+
+    def clickElement(self, prop, refresh : bool = False, waitFor : bool = False, scrollIntoView : bool = False,
+                javaScriptClick=False):
+        elements = self.__find(prop)
+        if not elements:
+            return False
+        element, root = elements[0], self.tabs[self.tab][1]
+        if element.tag == 'a':
+            return self.__load(urljoin(self.getCurrentUrl(), element.attrs['href']))
+        if element.tag == 'label':
+            element = find_elements(root, f'//*[@id="{element.attrs["for"]}"]')[0]
+        inputType = element.attrs.get('type')
+        if inputType == 'radio':
+            for radio in find_elements(root, f'//input[@name="{element.attrs["name"]}"]'):
+                radio.attrs.pop('checked', None)
+            element.attrs['checked'] = ''
+        elif inputType == 'checkbox':
+            if element.attrs.pop('checked', None) is None:
+                element.attrs['checked'] = ''
+        elif inputType == 'submit':
+            form = element.parent
+            while form.tag != 'form':
+                form = form.parent
+            fields = {field.attrs['name']: field.attrs.get('value', '') for field in form.descendants() \
+                if field.tag == 'input' and field.attrs.get('name') and \
+                (field.attrs.get('type') not in ('radio', 'checkbox') or 'checked' in field.attrs)}
+            return self.__load(urljoin(self.getCurrentUrl(), form.attrs['action']), fields)
+        return True